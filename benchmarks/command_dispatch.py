@@ -0,0 +1,87 @@
+"""
+Бенчмарк диспетчеризации команд: цепочка роутеров против таблицы команд.
+
+Запуск из корня проекта:
+    python -m benchmarks.command_dispatch [число апдейтов на команду]
+
+Апдейты подаются в Dispatcher.feed_update с фейковой HTTP-сессией бота,
+поэтому замер включает разбор апдейта, фильтры и вызов обработчика,
+но не сеть. "Цепочка" — таблица выключена (command_table=None).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message, Update, User
+
+from src.bot.config import BotConfig
+from src.bot.routers import get_main_router
+from src.bot.services.history import HistorySettings, InMemoryChatHistoryRepository
+from src.bot.utils.commands import CommandDispatchTable
+
+DEFAULT_ITERATIONS = 2000
+# Команды без внешних зависимостей (ответ — статичный текст или профиль)
+COMMANDS = ("start", "profile", "premium", "language", "help")
+
+USER = User(id=1, is_bot=False, first_name="Bench")
+CHAT = Chat(id=1, type="private")
+
+
+class NullSession(BaseSession):
+    """Сессия бота, которая отвечает на sendMessage без обращения к сети."""
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None
+    ) -> Any:
+        return Message(message_id=1, date=0, chat=CHAT, text="ok")
+
+    async def stream_content(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return
+
+
+def make_update(update_id: int, text: str) -> Update:
+    message = Message(message_id=update_id, date=0, chat=CHAT, from_user=USER, text=text)
+    return Update(update_id=update_id, message=message)
+
+
+async def measure(dp: Dispatcher, bot: Bot, text: str, iterations: int) -> float:
+    """Среднее время обработки одного апдейта в микросекундах."""
+    updates = [make_update(i, text) for i in range(iterations)]
+    for update in updates[:100]:  # Прогрев
+        await dp.feed_update(bot, update)
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+async def main(iterations: int) -> None:
+    bot = Bot(token="42:BENCH", session=NullSession())
+    dp = Dispatcher()
+    dp["config"] = BotConfig(bot_token="42:BENCH")
+    dp["history_repo"] = InMemoryChatHistoryRepository(HistorySettings())
+    main_router = get_main_router()
+    dp.include_router(main_router)
+    table = CommandDispatchTable.compile(main_router)
+
+    print(f"{'команда':<12}{'цепочка, мкс':>16}{'таблица, мкс':>16}")
+    for name in COMMANDS:
+        dp["command_table"] = None
+        chain = await measure(dp, bot, f"/{name}", iterations)
+        dp["command_table"] = table
+        compiled = await measure(dp, bot, f"/{name}", iterations)
+        print(f"/{name:<11}{chain:>16.1f}{compiled:>16.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITERATIONS))
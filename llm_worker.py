@@ -0,0 +1,14 @@
+"""
+Точка входа для пула воркеров очереди LLM.
+
+Запускается отдельно от бота при LLM_QUEUE_ENABLED=true:
+python llm_worker.py (число процессов — LLM_WORKERS).
+"""
+
+from src.bot.llm_worker import run_llm_workers
+
+if __name__ == "__main__":
+    try:
+        run_llm_workers()
+    except KeyboardInterrupt:
+        print("Воркеры LLM остановлены.")
@@ -0,0 +1,229 @@
+"""
+Сборка ботов и общего диспетчера.
+
+Один процесс может обслуживать несколько ботов (EXTRA_BOTS): у каждого
+свой Bot с очередью исходящих сообщений, история диалогов в своём
+пространстве имён, реестр запросов к LLM и метрики с префиксом bot_<имя>_.
+Диспетчер с роутерами общий, как и остальные сервисы
+(src.bot.services_factory).
+
+При выходе приложение останавливается по порядку: новые апдейты больше
+не принимаются, начатые дорабатываются (не дольше SHUTDOWN_TIMEOUT_SEC,
+остальные отменяются), исходящие сообщения отправляются, и только потом
+закрываются сессии Telegram, пул LLM, история и прочие хранилища.
+
+bot_application() собирает одного бота и используется воркерами
+супервизора (src.bot.supervisor).
+"""
+
+from __future__ import annotations
+
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator
+
+from aiogram import Bot, Dispatcher
+
+from src.bot.config import PRIMARY_BOT_NAME, BotConfig
+from src.bot.middlewares.bot_context import BotContextMiddleware
+from src.bot.middlewares.debounce import MessageBurstMiddleware
+from src.bot.middlewares.dedup import UpdateDedupMiddleware
+from src.bot.middlewares.ordering import ChatOrderingMiddleware
+from src.bot.middlewares.outbound import OutboundRequestMiddleware
+from src.bot.middlewares.shutdown import InFlightUpdatesMiddleware
+from src.bot.middlewares.supersede import SupersedeMiddleware
+from src.bot.middlewares.throttling import ALL_BUCKETS, ThrottlingMiddleware
+from src.bot.routers import get_main_router
+from src.bot.services.debounce import MessageDebouncer
+from src.bot.services.history import HistorySettings, build_history_repository
+from src.bot.services.llm_requests import InFlightRequests
+from src.bot.services.outbound import OutboundQueue
+from src.bot.services.throttling import BUCKET_LLM
+from src.bot.services.typing import TypingTicker
+from src.bot.services_factory import SharedServices, shared_services
+from src.bot.utils.commands import CommandDispatchTable
+
+
+@asynccontextmanager
+async def bot_instance(
+    config: BotConfig,
+    shared: SharedServices,
+    token: str,
+    name: str = "",
+) -> AsyncIterator[tuple[Bot, dict[str, Any]]]:
+    """
+    Собирает бота и его собственные сервисы поверх общих.
+
+    Args:
+        token: Токен бота
+        name: Имя бота среди нескольких: пространство имён истории
+            и префикс метрик. Пустое — единственный (основной) бот.
+
+    Yields:
+        Бота и данные обработчиков, свои у каждого бота (см. BotContextMiddleware)
+    """
+    metrics = shared.metrics.scoped(f"bot_{name}_") if name else shared.metrics
+    history_repo = build_history_repository(
+        backend=config.chat_history_backend,
+        settings=HistorySettings(
+            max_messages=config.history_max_messages,
+            ttl_seconds=config.history_ttl_sec,
+        ),
+        redis_url=config.redis_url,
+        session_cache_ttl_seconds=config.session_cache_ttl_sec,
+        namespace=name,
+        redis=shared.history_redis,
+    )
+
+    bot = Bot(token=token)
+    # Ответы обработчиков уходят через очередь с лимитами Telegram и повтором после 429
+    outbound_queue = OutboundQueue(
+        global_rate=config.outbound_global_rate,
+        chat_burst=config.outbound_chat_burst,
+        metrics=metrics,
+    )
+    if config.outbound_queue_enabled:
+        bot.session.middleware(OutboundRequestMiddleware(outbound_queue))
+    # Один таймер индикатора "печатает" на все чаты, ждущие ответа LLM
+    typing = TypingTicker(
+        lambda chat_id: bot.send_chat_action(chat_id=chat_id, action="typing"),
+        grace_seconds=config.typing_grace_ms / 1000,
+        metrics=metrics,
+    )
+    try:
+        yield bot, {
+            "history_repo": history_repo,
+            "llm_requests": InFlightRequests(metrics),
+            "typing": typing,
+        }
+    finally:
+        # Ответы, уже поставленные в очередь, отправляем до закрытия сессии
+        await outbound_queue.drain(shared.shutdown.remaining())
+        await history_repo.aclose()
+        await typing.aclose()
+        await outbound_queue.aclose()
+        await bot.session.close()
+
+
+def build_dispatcher(
+    config: BotConfig,
+    shared: SharedServices,
+    bots: dict[Bot, dict[str, Any]],
+) -> Dispatcher:
+    """
+    Собирает диспетчер, общий для всех ботов процесса.
+
+    Данные первого бота попадают в workflow_data; при нескольких ботах
+    BotContextMiddleware подменяет их данными бота, получившего апдейт.
+    """
+    primary = next(iter(bots.values()))
+    dp = Dispatcher(storage=shared.fsm_storage)
+    # Передаём конфигурацию через workflow_data для доступа из роутеров
+    dp["config"] = config
+    dp["llm_client"] = shared.llm_client
+    dp["currency_service"] = shared.currency_service
+    dp["rate_history"] = shared.rate_history
+    dp["metrics"] = shared.metrics
+    dp["llm_queue"] = shared.llm_queue
+    dp["admission"] = shared.admission
+    dp["prompt_cache"] = shared.prompt_cache
+    dp["entitlements"] = shared.entitlements
+    dp["usage"] = shared.usage
+    dp["shutdown"] = shared.shutdown
+    for key, value in primary.items():
+        dp[key] = value
+
+    # Каждый апдейт учтён до конца обработки, чтобы остановка его дождалась
+    dp.update.outer_middleware(InFlightUpdatesMiddleware(shared.updates))
+    if len(bots) > 1:
+        dp.update.outer_middleware(
+            BotContextMiddleware({bot.id: data for bot, data in bots.items()})
+        )
+    # Повторно доставленные апдейты отбрасываются раньше всего остального
+    if config.update_dedup_enabled:
+        dp.update.outer_middleware(UpdateDedupMiddleware(shared.deduplicator, shared.metrics))
+    # Флуд отсекается до отмены запросов и склейки сообщений; ведро LLM при склейке
+    # проверяется уже после неё, чтобы серия расходовала один токен
+    debounce = config.chat_debounce_ms > 0
+    if config.throttle_enabled:
+        dp.update.outer_middleware(
+            ThrottlingMiddleware(
+                shared.throttler,
+                shared.entitlements,
+                primary["history_repo"],
+                buckets=ALL_BUCKETS - {BUCKET_LLM} if debounce else ALL_BUCKETS,
+            )
+        )
+    # /stop и новые сообщения отменяют запрос к LLM до постановки в очередь чата
+    dp.update.outer_middleware(
+        SupersedeMiddleware(primary["llm_requests"], latest_wins=config.llm_latest_wins)
+    )
+    # Серии быстрых сообщений склеиваются вне очереди чата, иначе не дождались бы друг друга
+    if debounce:
+        debouncer = MessageDebouncer(
+            window_seconds=config.chat_debounce_ms / 1000,
+            max_window_seconds=config.chat_debounce_max_ms / 1000,
+            max_messages=config.chat_debounce_max_messages,
+            metrics=shared.metrics,
+        )
+        dp.update.outer_middleware(
+            MessageBurstMiddleware(debouncer, primary["history_repo"])
+        )
+        if config.throttle_enabled:
+            dp.update.outer_middleware(
+                ThrottlingMiddleware(
+                    shared.throttler,
+                    shared.entitlements,
+                    primary["history_repo"],
+                    buckets=frozenset({BUCKET_LLM}),
+                )
+            )
+    # Апдейты одного чата обрабатываются по очереди, разных чатов — параллельно
+    dp.update.outer_middleware(
+        ChatOrderingMiddleware(
+            max_concurrency=config.update_concurrency_limit,
+            metrics=shared.metrics,
+        )
+    )
+
+    # Подключаем корневой роутер со всеми обработчиками
+    main_router = get_main_router()
+    dp.include_router(main_router)
+    # Команды из COMMANDS_SPEC находят обработчик по словарю, без перебора фильтров
+    dp["command_table"] = CommandDispatchTable.compile(main_router)
+    return dp
+
+
+@asynccontextmanager
+async def multi_bot_application(
+    config: BotConfig,
+) -> AsyncIterator[tuple[dict[str, Bot], Dispatcher]]:
+    """Собирает основного и дополнительных ботов (EXTRA_BOTS) с одним диспетчером."""
+    tokens = {PRIMARY_BOT_NAME: config.bot_token, **dict(config.extra_bots)}
+    async with shared_services(config) as shared, AsyncExitStack() as stack:
+        bots: dict[str, Bot] = {}
+        contexts: dict[Bot, dict[str, Any]] = {}
+        for name, token in tokens.items():
+            # Основной бот хранит историю в прежних ключах и пишет метрики без префикса
+            scope = "" if name == PRIMARY_BOT_NAME else name
+            bot, data = await stack.enter_async_context(
+                bot_instance(config, shared, token, name=scope)
+            )
+            bots[name] = bot
+            contexts[bot] = data
+        try:
+            yield bots, build_dispatcher(config, shared, contexts)
+        finally:
+            await shared.updates.drain(shared.shutdown.remaining())
+
+
+@asynccontextmanager
+async def bot_application(
+    config: BotConfig, writes_rate_history: bool = True
+) -> AsyncIterator[tuple[Bot, Dispatcher]]:
+    """Собирает единственного (основного) бота вместе с общими сервисами."""
+    async with shared_services(config, writes_rate_history) as shared:
+        async with bot_instance(config, shared, config.bot_token) as (bot, data):
+            try:
+                yield bot, build_dispatcher(config, shared, {bot: data})
+            finally:
+                await shared.updates.drain(shared.shutdown.remaining())
@@ -6,6 +6,7 @@
 """
 
 import os
+import re
 from dataclasses import dataclass
 
 from dotenv import load_dotenv
@@ -14,6 +15,20 @@ from dotenv import load_dotenv
 # Модель LLM по умолчанию для OpenRouter
 DEFAULT_LLM_MODEL = "mistralai/mistral-7b-instruct:free"
 
+# Режимы получения апдейтов
+BOT_MODE_POLLING = "polling"
+BOT_MODE_WEBHOOK = "webhook"
+
+# Имя основного бота (TELEGRAM_BOT_TOKEN) среди нескольких в одном процессе
+PRIMARY_BOT_NAME = "main"
+_BOT_NAME_PATTERN = re.compile(r"^[a-z0-9_]+$")
+
+# Путь к снимку курсов валют на постоянном томе Amvera (/data)
+DEFAULT_RATES_SNAPSHOT_PATH = "/data/rates_snapshot.json"
+
+# Каталог истории курсов валют на постоянном томе
+DEFAULT_RATES_HISTORY_DIR = "/data/rates_history"
+
 
 @dataclass
 class BotConfig:
@@ -26,11 +41,100 @@ class BotConfig:
     llm_timeout_sec: float = 20.0
     llm_retries: int = 3
     llm_referer: str | None = None
+    # Выбор модели под запрос: off | shadow | on; правила "модель=chars:200,messages:6"
+    llm_routing_mode: str = "off"
+    llm_routes: tuple[str, ...] = ()
+    # Кэш ответов на похожие первые вопросы (SimHash, в памяти процесса)
+    prompt_cache_enabled: bool = False
+    prompt_cache_similarity: float = 0.95
+    prompt_cache_max_entries: int = 10_000
+    prompt_cache_ttl_sec: int = 60 * 60 * 24
 
     chat_history_backend: str = "memory"  # memory | redis
     redis_url: str | None = None
     history_max_messages: int = 20
     history_ttl_sec: int = 60 * 60 * 24
+    # Сколько процесс помнит, что пользователь не в режиме ChatGPT (0 — без кэша)
+    session_cache_ttl_sec: float = 300.0
+    # Хранилище состояний FSM (/convert): memory | redis; TTL брошенного диалога
+    fsm_storage_backend: str = "memory"
+    fsm_state_ttl_sec: int = 30 * 60
+
+    rates_snapshot_path: str | None = DEFAULT_RATES_SNAPSHOT_PATH
+    rates_cache_ttl_sec: int = 60 * 60
+    rates_history_dir: str | None = DEFAULT_RATES_HISTORY_DIR
+    # Упорядоченный список провайдеров курсов: open_er_api | http(s)://... | file:/path
+    rate_providers: tuple[str, ...] = ("open_er_api",)
+    rate_provider_timeout_sec: float = 5.0
+    inline_cache_time_sec: int = 60
+
+    # Пользователи с Premium (выдаются администратором)
+    premium_user_ids: frozenset[int] = frozenset()
+    # Ограничение частоты запросов: memory | redis
+    throttle_enabled: bool = True
+    throttle_backend: str = "memory"
+    throttle_notice_cooldown_sec: float = 10.0
+    # Суточные квоты запросов к LLM: memory | redis; 0 — без предела
+    usage_enabled: bool = True
+    usage_backend: str = "memory"
+    usage_daily_limit_free: int = 20
+    usage_daily_limit_premium: int = 200
+
+    # Новое сообщение отменяет ещё не завершённый запрос к LLM
+    llm_latest_wins: bool = True
+
+    # Контроль допуска к LLM: предел одновременных запросов и ожидания места
+    admission_enabled: bool = True
+    llm_max_in_flight: int = 50
+    llm_max_wait_sec: float = 20.0
+    llm_premium_reserve: float = 0.2
+    # Через сколько секунд ожидания запрос обслуживается вне очереди
+    llm_scheduler_aging_sec: float = 10.0
+
+    # Очередь заданий LLM в Redis Streams и пул воркеров (llm_worker.py)
+    llm_queue_enabled: bool = False
+    llm_queue_max_backlog: int = 1000
+    llm_queue_max_attempts: int = 3
+    llm_workers: int = 1
+    llm_worker_concurrency: int = 20
+
+    # Склейка быстрых сообщений в режиме ChatGPT (0 — выключена)
+    chat_debounce_ms: int = 800
+    chat_debounce_max_ms: int = 3000
+    chat_debounce_max_messages: int = 10
+    # Индикатор "печатает" не отправляется, если ответ LLM пришёл быстрее
+    typing_grace_ms: int = 1000
+
+    # Сколько апдейтов обрабатывается одновременно (внутри чата — по очереди)
+    update_concurrency_limit: int = 100
+    # Отсев повторных апдейтов: memory | redis (общий для реплик)
+    update_dedup_enabled: bool = True
+    update_dedup_backend: str = "memory"
+    update_dedup_ttl_sec: int = 60 * 60 * 24
+
+    # Очередь исходящих сообщений с лимитами Telegram
+    outbound_queue_enabled: bool = True
+    outbound_global_rate: float = 30.0
+    outbound_chat_burst: int = 3
+
+    # Дополнительные боты в том же процессе: ((имя, токен), ...)
+    extra_bots: tuple[tuple[str, str], ...] = ()
+
+    bot_mode: str = BOT_MODE_POLLING  # polling | webhook
+    webhook_base_url: str | None = None  # Публичный адрес, например https://bot.example.com
+    webhook_path: str = "/webhook"
+    webhook_secret: str | None = None
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 80
+    # Сколько ждать начатые апдейты и исходящие сообщения при остановке
+    shutdown_timeout_sec: float = 25.0
+    # Число процессов-воркеров для supervisor.py (общий порт через SO_REUSEPORT)
+    webhook_workers: int = 1
+
+    @property
+    def webhook_url(self) -> str:
+        """Полный URL webhook, который регистрируется в Telegram."""
+        return f"{(self.webhook_base_url or '').rstrip('/')}{self.webhook_path}"
 
 
 def load_config() -> BotConfig:
@@ -59,11 +163,107 @@ def load_config() -> BotConfig:
         "OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions"
     )
     llm_referer = os.getenv("LLM_REFERER")
+    llm_routing_mode = os.getenv("LLM_ROUTING_MODE", "off")
+    llm_routes = tuple(
+        spec.strip() for spec in os.getenv("LLM_ROUTES", "").split(";") if spec.strip()
+    )
+    prompt_cache_enabled = _env_flag("PROMPT_CACHE_ENABLED", default=False)
+    prompt_cache_similarity = min(1.0, float(os.getenv("PROMPT_CACHE_SIMILARITY", "0.95")))
+    prompt_cache_max_entries = max(1, int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "10000")))
+    prompt_cache_ttl_sec = int(os.getenv("PROMPT_CACHE_TTL_SEC", str(60 * 60 * 24)))
 
     chat_history_backend = os.getenv("CHAT_HISTORY_BACKEND", "memory")
     redis_url = os.getenv("REDIS_URL")
     history_max_messages = int(os.getenv("HISTORY_MAX_MESSAGES", "20"))
     history_ttl_sec = int(os.getenv("HISTORY_TTL_SEC", str(60 * 60 * 24)))
+    session_cache_ttl_sec = float(os.getenv("SESSION_CACHE_TTL_SEC", "300"))
+    fsm_storage_backend = os.getenv("FSM_STORAGE_BACKEND", "memory")
+    fsm_state_ttl_sec = max(0, int(os.getenv("FSM_STATE_TTL_SEC", str(30 * 60))))
+
+    # Пустое значение RATES_SNAPSHOT_PATH отключает снимок курсов
+    rates_snapshot_path = (
+        os.getenv("RATES_SNAPSHOT_PATH", DEFAULT_RATES_SNAPSHOT_PATH) or None
+    )
+    rates_cache_ttl_sec = int(os.getenv("RATES_CACHE_TTL_SEC", str(60 * 60)))
+    # Пустое значение RATES_HISTORY_DIR отключает историю курсов
+    rates_history_dir = (
+        os.getenv("RATES_HISTORY_DIR", DEFAULT_RATES_HISTORY_DIR) or None
+    )
+    rate_providers = tuple(
+        spec.strip()
+        for spec in os.getenv("EXCHANGE_RATE_PROVIDERS", "open_er_api").split(",")
+        if spec.strip()
+    )
+    rate_provider_timeout_sec = float(os.getenv("RATE_PROVIDER_TIMEOUT_SEC", "5"))
+    inline_cache_time_sec = int(os.getenv("INLINE_CACHE_TIME_SEC", "60"))
+
+    premium_user_ids = frozenset(
+        int(user_id)
+        for user_id in os.getenv("PREMIUM_USER_IDS", "").split(",")
+        if user_id.strip()
+    )
+    throttle_enabled = _env_flag("THROTTLE_ENABLED", default=True)
+    throttle_backend = os.getenv("THROTTLE_BACKEND", "memory")
+    throttle_notice_cooldown_sec = float(os.getenv("THROTTLE_NOTICE_COOLDOWN_SEC", "10"))
+    usage_enabled = _env_flag("USAGE_ENABLED", default=True)
+    usage_backend = os.getenv("USAGE_BACKEND", "memory")
+    usage_daily_limit_free = max(0, int(os.getenv("USAGE_DAILY_LIMIT_FREE", "20")))
+    usage_daily_limit_premium = max(0, int(os.getenv("USAGE_DAILY_LIMIT_PREMIUM", "200")))
+    llm_latest_wins = _env_flag("LLM_LATEST_WINS", default=True)
+    admission_enabled = _env_flag("ADMISSION_ENABLED", default=True)
+    llm_max_in_flight = max(1, int(os.getenv("LLM_MAX_IN_FLIGHT", "50")))
+    llm_max_wait_sec = float(os.getenv("LLM_MAX_WAIT_SEC", "20"))
+    llm_premium_reserve = min(1.0, max(0.0, float(os.getenv("LLM_PREMIUM_RESERVE", "0.2"))))
+    llm_scheduler_aging_sec = float(os.getenv("LLM_SCHEDULER_AGING_SEC", "10"))
+    llm_queue_enabled = _env_flag("LLM_QUEUE_ENABLED", default=False)
+    if llm_queue_enabled and not (chat_history_backend == "redis" and redis_url):
+        raise RuntimeError(
+            "Для LLM_QUEUE_ENABLED нужна общая история: CHAT_HISTORY_BACKEND=redis и REDIS_URL"
+        )
+    llm_queue_max_backlog = max(1, int(os.getenv("LLM_QUEUE_MAX_BACKLOG", "1000")))
+    llm_queue_max_attempts = max(1, int(os.getenv("LLM_QUEUE_MAX_ATTEMPTS", "3")))
+    llm_workers = max(1, int(os.getenv("LLM_WORKERS", "1")))
+    llm_worker_concurrency = max(1, int(os.getenv("LLM_WORKER_CONCURRENCY", "20")))
+    chat_debounce_ms = max(0, int(os.getenv("CHAT_DEBOUNCE_MS", "800")))
+    chat_debounce_max_ms = int(os.getenv("CHAT_DEBOUNCE_MAX_MS", "3000"))
+    chat_debounce_max_messages = int(os.getenv("CHAT_DEBOUNCE_MAX_MESSAGES", "10"))
+    typing_grace_ms = max(0, int(os.getenv("TYPING_GRACE_MS", "1000")))
+    update_concurrency_limit = max(1, int(os.getenv("UPDATE_CONCURRENCY_LIMIT", "100")))
+    update_dedup_enabled = _env_flag("UPDATE_DEDUP_ENABLED", default=True)
+    update_dedup_backend = os.getenv("UPDATE_DEDUP_BACKEND", "memory")
+    update_dedup_ttl_sec = max(1, int(os.getenv("UPDATE_DEDUP_TTL_SEC", str(60 * 60 * 24))))
+    outbound_queue_enabled = _env_flag("OUTBOUND_QUEUE_ENABLED", default=True)
+    outbound_global_rate = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+    outbound_chat_burst = max(1, int(os.getenv("OUTBOUND_CHAT_BURST", "3")))
+
+    bot_mode = os.getenv("BOT_MODE", BOT_MODE_POLLING).lower()
+    if bot_mode not in (BOT_MODE_POLLING, BOT_MODE_WEBHOOK):
+        raise RuntimeError(f"Неизвестный BOT_MODE: {bot_mode}. Используйте polling или webhook")
+    webhook_base_url = os.getenv("WEBHOOK_BASE_URL")
+    if bot_mode == BOT_MODE_WEBHOOK and not webhook_base_url:
+        raise RuntimeError(
+            "Для BOT_MODE=webhook нужен публичный адрес: WEBHOOK_BASE_URL=https://..."
+        )
+    webhook_path = os.getenv("WEBHOOK_PATH", "/webhook")
+    webhook_secret = os.getenv("WEBHOOK_SECRET")
+    # Без секрета заголовок не проверяется и поддельный апдейт примет любой, кто знает URL
+    if bot_mode == BOT_MODE_WEBHOOK and not webhook_secret:
+        raise RuntimeError(
+            "Для BOT_MODE=webhook нужен WEBHOOK_SECRET (случайная строка из A-Z, a-z, 0-9, _ и -)"
+        )
+    webhook_host = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+    webhook_port = int(os.getenv("WEBHOOK_PORT", "80"))
+    # WEBHOOK_SHUTDOWN_TIMEOUT_SEC — прежнее имя, когда ожидание было только у webhook
+    shutdown_timeout_sec = float(
+        os.getenv("SHUTDOWN_TIMEOUT_SEC", os.getenv("WEBHOOK_SHUTDOWN_TIMEOUT_SEC", "25"))
+    )
+    webhook_workers = max(1, int(os.getenv("WEBHOOK_WORKERS", "1")))
+
+    extra_bots = _parse_extra_bots(os.getenv("EXTRA_BOTS", ""))
+    if extra_bots and llm_queue_enabled:
+        raise RuntimeError("EXTRA_BOTS пока несовместим с LLM_QUEUE_ENABLED")
+    if extra_bots and webhook_workers > 1:
+        raise RuntimeError("EXTRA_BOTS пока несовместим с WEBHOOK_WORKERS>1")
 
     return BotConfig(
         bot_token=token,
@@ -73,10 +273,91 @@ def load_config() -> BotConfig:
         llm_timeout_sec=llm_timeout,
         llm_retries=llm_retries,
         llm_referer=llm_referer,
+        llm_routing_mode=llm_routing_mode,
+        llm_routes=llm_routes,
+        prompt_cache_enabled=prompt_cache_enabled,
+        prompt_cache_similarity=prompt_cache_similarity,
+        prompt_cache_max_entries=prompt_cache_max_entries,
+        prompt_cache_ttl_sec=prompt_cache_ttl_sec,
         chat_history_backend=chat_history_backend,
         redis_url=redis_url,
         history_max_messages=history_max_messages,
         history_ttl_sec=history_ttl_sec,
+        session_cache_ttl_sec=session_cache_ttl_sec,
+        fsm_storage_backend=fsm_storage_backend,
+        fsm_state_ttl_sec=fsm_state_ttl_sec,
+        rates_snapshot_path=rates_snapshot_path,
+        rates_cache_ttl_sec=rates_cache_ttl_sec,
+        rates_history_dir=rates_history_dir,
+        rate_providers=rate_providers,
+        rate_provider_timeout_sec=rate_provider_timeout_sec,
+        inline_cache_time_sec=inline_cache_time_sec,
+        premium_user_ids=premium_user_ids,
+        throttle_enabled=throttle_enabled,
+        throttle_backend=throttle_backend,
+        throttle_notice_cooldown_sec=throttle_notice_cooldown_sec,
+        usage_enabled=usage_enabled,
+        usage_backend=usage_backend,
+        usage_daily_limit_free=usage_daily_limit_free,
+        usage_daily_limit_premium=usage_daily_limit_premium,
+        llm_latest_wins=llm_latest_wins,
+        admission_enabled=admission_enabled,
+        llm_max_in_flight=llm_max_in_flight,
+        llm_max_wait_sec=llm_max_wait_sec,
+        llm_premium_reserve=llm_premium_reserve,
+        llm_scheduler_aging_sec=llm_scheduler_aging_sec,
+        llm_queue_enabled=llm_queue_enabled,
+        llm_queue_max_backlog=llm_queue_max_backlog,
+        llm_queue_max_attempts=llm_queue_max_attempts,
+        llm_workers=llm_workers,
+        llm_worker_concurrency=llm_worker_concurrency,
+        chat_debounce_ms=chat_debounce_ms,
+        chat_debounce_max_ms=chat_debounce_max_ms,
+        chat_debounce_max_messages=chat_debounce_max_messages,
+        typing_grace_ms=typing_grace_ms,
+        update_concurrency_limit=update_concurrency_limit,
+        update_dedup_enabled=update_dedup_enabled,
+        update_dedup_backend=update_dedup_backend,
+        update_dedup_ttl_sec=update_dedup_ttl_sec,
+        outbound_queue_enabled=outbound_queue_enabled,
+        outbound_global_rate=outbound_global_rate,
+        outbound_chat_burst=outbound_chat_burst,
+        bot_mode=bot_mode,
+        webhook_base_url=webhook_base_url,
+        webhook_path=webhook_path,
+        webhook_secret=webhook_secret,
+        webhook_host=webhook_host,
+        webhook_port=webhook_port,
+        shutdown_timeout_sec=shutdown_timeout_sec,
+        webhook_workers=webhook_workers,
+        extra_bots=extra_bots,
     )
 
 
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Читает булев флаг из окружения: 1/true/yes/on или 0/false/no/off."""
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_extra_bots(value: str) -> tuple[tuple[str, str], ...]:
+    """Разбирает EXTRA_BOTS вида "brand2=123:AAA,brand3=456:BBB"."""
+    bots: list[tuple[str, str]] = []
+    names = {PRIMARY_BOT_NAME}
+    for spec in filter(None, (part.strip() for part in value.split(","))):
+        name, _, token = spec.partition("=")
+        name, token = name.strip(), token.strip()
+        if not _BOT_NAME_PATTERN.match(name) or not token:
+            raise RuntimeError(
+                f"Неверная запись EXTRA_BOTS: {name or spec!r}. "
+                "Ожидается имя=токен, имя из строчных латинских букв, цифр и _"
+            )
+        if name in names:
+            raise RuntimeError(f"Имя бота {name!r} в EXTRA_BOTS повторяется")
+        names.add(name)
+        bots.append((name, token))
+    return tuple(bots)
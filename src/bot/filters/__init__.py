@@ -0,0 +1 @@
+"""Фильтры aiogram, используемые роутерами."""
@@ -0,0 +1,32 @@
+"""
+Фильтр команд по таблице диспетчеризации.
+
+Команда разбирается один раз, обработчик находится по словарю; в данные
+обработчика передаются command_handler и command (CommandObject).
+"""
+
+from typing import Any
+
+from aiogram import Bot
+from aiogram.filters import Filter
+from aiogram.types import Message
+
+from src.bot.utils.commands import CommandDispatchTable
+
+
+class TableCommand(Filter):
+    """Пропускает команды, найденные в таблице command_table (из workflow_data)."""
+
+    async def __call__(
+        self,
+        message: Message,
+        bot: Bot,
+        command_table: CommandDispatchTable | None = None,
+    ) -> bool | dict[str, Any]:
+        if command_table is None:
+            return False
+        resolved = await command_table.resolve(message, bot)
+        if resolved is None:
+            return False
+        handler, command = resolved
+        return {"command_handler": handler, "command": command}
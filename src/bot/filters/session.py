@@ -0,0 +1,20 @@
+"""
+Фильтр активной сессии ChatGPT.
+
+Проверка идёт через history_repo.is_active, которая для Redis-хранилища
+отвечает из локального кэша сессий, поэтому обычные сообщения
+проходят мимо обработчика ChatGPT без обращения к сети.
+"""
+
+from aiogram.filters import Filter
+from aiogram.types import Message
+
+from src.bot.services.history import ChatHistoryRepository
+
+
+class ActiveChatSession(Filter):
+    """Пропускает сообщения пользователей в режиме ChatGPT."""
+
+    async def __call__(self, message: Message, history_repo: ChatHistoryRepository) -> bool:
+        user = message.from_user
+        return user is not None and await history_repo.is_active(user.id)
@@ -0,0 +1 @@
+"""Клавиатуры и другие UI-компоненты бота."""
@@ -0,0 +1,90 @@
+"""
+Клавиатуры выбора валюты для /convert.
+
+Страницы каталога строятся один раз при смене каталога и дальше
+отдаются из кэша, без пересборки кнопок на каждый вызов.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from src.bot.services.currency_catalog import CurrencyCatalog, CurrencyInfo
+
+# Размер страницы каталога и число кнопок в ряду
+CURRENCIES_PER_PAGE = 10
+BUTTONS_PER_ROW = 2
+
+# Префиксы callback_data
+CURRENCY_CALLBACK_PREFIX = "currency:"
+PAGE_CALLBACK_PREFIX = "currency_page:"
+NOOP_CALLBACK = "noop"
+
+
+def _currency_rows(currencies: Sequence[CurrencyInfo]) -> list[list[InlineKeyboardButton]]:
+    buttons = [
+        InlineKeyboardButton(
+            text=f"{info.code} - {info.label}",
+            callback_data=f"{CURRENCY_CALLBACK_PREFIX}{info.code}",
+        )
+        for info in currencies
+    ]
+    return [
+        buttons[i : i + BUTTONS_PER_ROW] for i in range(0, len(buttons), BUTTONS_PER_ROW)
+    ]
+
+
+def build_search_keyboard(currencies: Sequence[CurrencyInfo]) -> InlineKeyboardMarkup:
+    """Строит клавиатуру из результатов поиска валют."""
+    return InlineKeyboardMarkup(inline_keyboard=_currency_rows(currencies))
+
+
+class CurrencyKeyboards:
+    """Кэш постраничных клавиатур каталога валют."""
+
+    def __init__(self, per_page: int = CURRENCIES_PER_PAGE) -> None:
+        self._per_page = per_page
+        self._catalog: CurrencyCatalog | None = None
+        self._pages: tuple[InlineKeyboardMarkup, ...] = ()
+
+    def page_count(self, catalog: CurrencyCatalog) -> int:
+        self._ensure(catalog)
+        return len(self._pages)
+
+    def page(self, catalog: CurrencyCatalog, page: int) -> InlineKeyboardMarkup:
+        """Возвращает клавиатуру страницы (номер приводится к допустимому диапазону)."""
+        self._ensure(catalog)
+        return self._pages[min(max(page, 0), len(self._pages) - 1)]
+
+    def _ensure(self, catalog: CurrencyCatalog) -> None:
+        if catalog is self._catalog:
+            return
+        items = catalog.items
+        chunks = [
+            items[i : i + self._per_page] for i in range(0, len(items), self._per_page)
+        ] or [()]
+        total = len(chunks)
+        pages = []
+        for number, chunk in enumerate(chunks):
+            rows = _currency_rows(chunk)
+            if total > 1:
+                rows.append(self._navigation_row(number, total))
+            pages.append(InlineKeyboardMarkup(inline_keyboard=rows))
+        self._pages = tuple(pages)
+        self._catalog = catalog
+
+    @staticmethod
+    def _navigation_row(number: int, total: int) -> list[InlineKeyboardButton]:
+        previous_page = (number - 1) % total
+        next_page = (number + 1) % total
+        return [
+            InlineKeyboardButton(
+                text="◀️", callback_data=f"{PAGE_CALLBACK_PREFIX}{previous_page}"
+            ),
+            InlineKeyboardButton(text=f"{number + 1}/{total}", callback_data=NOOP_CALLBACK),
+            InlineKeyboardButton(
+                text="▶️", callback_data=f"{PAGE_CALLBACK_PREFIX}{next_page}"
+            ),
+        ]
@@ -0,0 +1,242 @@
+"""
+Процессы-воркеры очереди LLM (LLM_QUEUE_ENABLED=true).
+
+Процесс, принявший апдейт, только ставит задание в Redis Stream
+(src.bot.services.llm_queue); здесь задания выполняются: воркер берёт
+историю диалога из Redis, вызывает LLMClient и отправляет ответ в чат.
+Долгие запросы к провайдеру не занимают диспетчер, а задания,
+не подтверждённые упавшим или перезапущенным воркером, выполняет другой.
+
+Пул процессов держит тот же WorkerSupervisor, что и webhook-воркеры.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from contextlib import suppress
+
+from aiogram import Bot
+
+from src.bot.config import BotConfig, load_config
+from src.bot.middlewares.outbound import OutboundRequestMiddleware
+from src.bot.services.history import ChatHistoryRepository, HistorySettings, build_history_repository
+from src.bot.services.llm import LLMClient, ModelNotFoundError, RateLimitError
+from src.bot.services.llm_consumer import LLMJobConsumer
+from src.bot.services.llm_queue import LLMJob, build_llm_queue
+from src.bot.services.model_router import build_model_router
+from src.bot.services.outbound import OutboundQueue
+from src.bot.services.text import make_delivery_error_message, make_llm_error_message
+from src.bot.services.typing import TypingTicker
+from src.bot.services.usage import UsageAccounting, build_usage_backend
+from src.bot.supervisor import WorkerSupervisor
+from src.bot.utils.logging import setup_logging
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+# Сколько дорабатывать начатые задания при остановке воркера
+DRAIN_TIMEOUT_SEC = 60.0
+
+
+class LLMJobHandler:
+    """Выполняет задание очереди: запрос к LLM и отправка ответа в чат."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        config: BotConfig,
+        history_repo: ChatHistoryRepository,
+        llm_client: LLMClient,
+        typing: TypingTicker | None = None,
+        usage: UsageAccounting | None = None,
+    ) -> None:
+        self._bot = bot
+        self._config = config
+        self._history_repo = history_repo
+        self._llm_client = llm_client
+        self._typing = typing
+        self._usage = usage
+
+    async def __call__(self, job: LLMJob) -> None:
+        if not job.response:
+            response_text = await self._generate(job)
+            if response_text is None:
+                return
+            # Если отправка не удастся, повтор задания только перешлёт этот ответ
+            job.response = response_text
+        await self._bot.send_message(job.chat_id, job.response)
+
+    async def _generate(self, job: LLMJob) -> str | None:
+        """Получает ответ модели и записывает его в историю; None — отвечать не нужно."""
+        # Пользователь вышел из режима, пока задание ждало в очереди:
+        # модель не вызывалась, запрос не расходует квоту
+        if not await self._history_repo.is_active(job.user_id):
+            await self._refund(job)
+            return None
+        history = await self._history_repo.get_history(job.user_id)
+        # На последние реплики уже ответило более раннее задание того же пользователя
+        if not history or history[-1].get("role") != "user":
+            await self._refund(job)
+            return None
+
+        if self._typing is not None:
+            self._typing.start(job.chat_id)
+        try:
+            response_text = await self._llm_client.get_response(
+                api_key=self._config.openrouter_api_key or "",
+                messages=history,
+                model=self._config.llm_model,
+            )
+        except (RateLimitError, ModelNotFoundError) as e:
+            # Повтор не поможет: сообщаем сразу и подтверждаем задание
+            logger.warning("Задание LLM пользователя %s отклонено: %s", job.user_id, e)
+            await self._refund(job)
+            await self._bot.send_message(job.chat_id, make_llm_error_message(e))
+            return None
+        finally:
+            if self._typing is not None:
+                self._typing.stop(job.chat_id)
+
+        if not await self._history_repo.is_active(job.user_id):
+            return None
+        await self._history_repo.add_assistant_message(job.user_id, response_text)
+        # Квоту списал процесс, принявший сообщение; здесь учитывается объём
+        if self._usage is not None:
+            await self._usage.record(
+                job.user_id, history, response_text, job.usage_day or None
+            )
+        return response_text
+
+    async def on_dead_letter(self, job: LLMJob, error: Exception) -> None:
+        """
+        Попытки кончились: сообщаем пользователю об ошибке.
+
+        Если модель так и не ответила, запрос возвращается в квоту. Если ответ
+        уже получен (и записан в историю и учёт), не удалась только отправка:
+        квота израсходована, а пользователю сообщаем о сбое доставки.
+        """
+        if job.response:
+            text = make_delivery_error_message()
+        else:
+            await self._refund(job)
+            text = make_llm_error_message(error)
+        with suppress(Exception):
+            await self._bot.send_message(job.chat_id, text)
+
+    async def _refund(self, job: LLMJob) -> None:
+        # Квоту списал процесс, принявший сообщение, — в сутках из задания
+        if self._usage is not None and job.usage_day:
+            await self._usage.refund(job.user_id, job.usage_day)
+
+
+def run_llm_workers() -> None:
+    """Точка входа пула воркеров LLM (см. llm_worker.py в корне проекта)."""
+    setup_logging()
+    config = load_config()
+    if not config.llm_queue_enabled:
+        raise RuntimeError("Воркеры LLM нужны только при LLM_QUEUE_ENABLED=true")
+
+    context = multiprocessing.get_context("spawn")
+    supervisor = WorkerSupervisor(
+        workers=config.llm_workers,
+        spawn=lambda index: context.Process(
+            target=_llm_worker_main, args=(index,), name=f"llm-worker-{index}"
+        ),
+        stop_timeout=DRAIN_TIMEOUT_SEC + 5,
+    )
+    signal.signal(signal.SIGINT, lambda *_: supervisor.request_stop())
+    signal.signal(signal.SIGTERM, lambda *_: supervisor.request_stop())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: supervisor.request_restart())
+
+    logger.info("Пул воркеров LLM запущен: %s процессов", config.llm_workers)
+    supervisor.run()
+    logger.info("Пул воркеров LLM остановлен")
+
+
+def _llm_worker_main(index: int) -> None:
+    """Точка входа процесса-воркера LLM (запускается через spawn)."""
+    setup_logging()
+    config = load_config()
+    with suppress(KeyboardInterrupt):
+        asyncio.run(_run_llm_worker(config, index))
+
+
+async def _run_llm_worker(config: BotConfig, index: int) -> None:
+    metrics = MetricsRegistry()
+    history_repo = build_history_repository(
+        backend=config.chat_history_backend,
+        settings=HistorySettings(
+            max_messages=config.history_max_messages,
+            ttl_seconds=config.history_ttl_sec,
+        ),
+        redis_url=config.redis_url,
+        session_cache_ttl_seconds=config.session_cache_ttl_sec,
+    )
+    llm_client = LLMClient(
+        api_url=config.openrouter_api_url,
+        referer=config.llm_referer,
+        timeout_seconds=config.llm_timeout_sec,
+        retries=config.llm_retries,
+        router=build_model_router(config.llm_routing_mode, config.llm_routes, metrics),
+    )
+    queue = build_llm_queue(
+        config.redis_url or "",
+        max_backlog=config.llm_queue_max_backlog,
+        max_attempts=config.llm_queue_max_attempts,
+        metrics=metrics,
+    )
+
+    bot = Bot(token=config.bot_token)
+    outbound_queue = OutboundQueue(
+        global_rate=config.outbound_global_rate,
+        chat_burst=config.outbound_chat_burst,
+        metrics=metrics,
+    )
+    if config.outbound_queue_enabled:
+        bot.session.middleware(OutboundRequestMiddleware(outbound_queue))
+    typing = TypingTicker(
+        lambda chat_id: bot.send_chat_action(chat_id=chat_id, action="typing"),
+        grace_seconds=config.typing_grace_ms / 1000,
+        metrics=metrics,
+    )
+
+    usage = (
+        UsageAccounting(build_usage_backend(config.usage_backend, redis_url=config.redis_url))
+        if config.usage_enabled
+        else None
+    )
+
+    handler = LLMJobHandler(bot, config, history_repo, llm_client, typing, usage)
+    consumer = LLMJobConsumer(
+        queue,
+        handler,
+        consumer=f"{socket.gethostname()}-{os.getpid()}",
+        concurrency=config.llm_worker_concurrency,
+        # Задание считается брошенным, если не подтверждено дольше всех ретраев LLMClient
+        claim_idle_seconds=config.llm_timeout_sec * (config.llm_retries + 1) + 60,
+        on_dead_letter=handler.on_dead_letter,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, consumer.stop)
+
+    logger.info("Воркер LLM %s готов брать задания", index)
+    try:
+        await consumer.run(drain_timeout=DRAIN_TIMEOUT_SEC)
+    finally:
+        await typing.aclose()
+        if usage is not None:
+            await usage.aclose()
+        await outbound_queue.aclose()
+        await llm_client.aclose()
+        await queue.aclose()
+        await history_repo.aclose()
+        await bot.session.close()
+        logger.info("Воркер LLM %s остановлен", index)
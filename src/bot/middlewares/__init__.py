@@ -0,0 +1 @@
+"""Middleware бота: сквозная обработка апдейтов до роутеров."""
@@ -0,0 +1,33 @@
+"""
+Данные обработчиков, свои у каждого бота процесса.
+
+Несколько ботов (EXTRA_BOTS) обслуживает один диспетчер с общими
+сервисами, но история диалогов, реестр запросов к LLM и индикатор
+"печатает" у каждого бота свои. Middleware регистрируется первым
+и подставляет их в data по id бота, получившего апдейт.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import TelegramObject
+
+
+class BotContextMiddleware(BaseMiddleware):
+    """Outer-middleware апдейтов: подменяет данные обработчиков данными бота."""
+
+    def __init__(self, contexts: dict[int, dict[str, Any]]) -> None:
+        self._contexts = contexts
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        bot: Bot | None = data.get("bot")
+        if bot is not None:
+            data.update(self._contexts.get(bot.id, {}))
+        return await handler(event, data)
@@ -0,0 +1,61 @@
+"""
+Склейка серий сообщений в режиме ChatGPT до постановки в очередь чата.
+
+Ожидание окна тишины должно идти вне очереди чата: иначе следующие
+сообщения серии ждали бы в очереди и не могли к ней присоединиться.
+Апдейт, начавший серию, идёт дальше с текстами серии в data["burst_texts"],
+остальные апдейты серии на этом завершаются.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.bot.services.debounce import MessageDebouncer
+from src.bot.services.history import ChatHistoryRepository
+
+
+class MessageBurstMiddleware(BaseMiddleware):
+    """
+    Outer-middleware апдейтов: склеивает сообщения пользователя в режиме ChatGPT.
+
+    Склеиваются только текстовые сообщения (не команды) пользователей
+    в активной сессии ChatGPT и без состояния FSM (например, ввода суммы
+    в /convert) — остальные апдейты проходят без задержки.
+    """
+
+    def __init__(
+        self, debouncer: MessageDebouncer, history_repo: ChatHistoryRepository
+    ) -> None:
+        self._debouncer = debouncer
+        self._history_repo = history_repo
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        message = event.message if isinstance(event, Update) else None
+        user = data.get("event_from_user")
+        history_repo = data.get("history_repo", self._history_repo)
+        if (
+            message is None
+            or user is None
+            or not message.text
+            or message.text.startswith("/")
+            or data.get("raw_state") is not None
+            or not await history_repo.is_active(user.id)
+        ):
+            return await handler(event, data)
+
+        texts = await self._debouncer.submit((message.chat.id, user.id), message.text)
+        if texts is None:
+            # Сообщение присоединено к серии, её отправит первый апдейт
+            return None
+        if len(texts) > 1:
+            data["burst_texts"] = texts
+        return await handler(event, data)
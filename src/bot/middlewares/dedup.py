@@ -0,0 +1,45 @@
+"""
+Отсев повторно доставленных апдейтов до всех остальных middleware и роутеров.
+
+Апдейт отмечается обработанным при получении: если процесс упадёт посреди
+обработки, повтор от Telegram уже не пройдёт (лучше потерять ответ,
+чем дважды вызвать LLM и задвоить историю).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.bot.services.dedup import UpdateDeduplicator
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+
+class UpdateDedupMiddleware(BaseMiddleware):
+    """Outer-middleware апдейтов: отбрасывает уже виденные update_id."""
+
+    def __init__(
+        self, deduplicator: UpdateDeduplicator, metrics: MetricsRegistry | None = None
+    ) -> None:
+        self._deduplicator = deduplicator
+        self._duplicates = (metrics or MetricsRegistry()).counter("updates_duplicate")
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        bot = data.get("bot")
+        if isinstance(event, Update) and await self._deduplicator.is_duplicate(
+            bot.id if bot is not None else 0, event.update_id
+        ):
+            self._duplicates.inc()
+            logger.info("Повторный апдейт %s отброшен", event.update_id)
+            return None
+        return await handler(event, data)
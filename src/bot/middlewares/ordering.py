@@ -0,0 +1,142 @@
+"""
+Планировщик апдейтов: порядок внутри чата, параллельность между чатами.
+
+aiogram обрабатывает каждый апдейт отдельной задачей, поэтому два быстрых
+сообщения одного пользователя могут одновременно менять историю диалога.
+Middleware пропускает апдейты одного чата строго по очереди, а разные
+чаты — параллельно, но не больше заданного общего лимита.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Chat, TelegramObject, User
+
+from src.bot.utils.metrics import MetricsRegistry
+
+UpdateHandler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+# Общий лимит одновременно обрабатываемых апдейтов по умолчанию
+DEFAULT_UPDATE_CONCURRENCY = 100
+
+
+class _ChatQueue:
+    """Очередь одного чата: FIFO-блокировка и число ожидающих апдейтов."""
+
+    __slots__ = ("lock", "pending")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.pending = 0
+
+
+class ChatOrderingMiddleware(BaseMiddleware):
+    """
+    Outer-middleware апдейтов: последовательная обработка внутри чата.
+
+    Очередь чата создаётся при первом апдейте и удаляется, как только
+    в ней не осталось ожидающих, поэтому память не растёт с числом чатов.
+    Апдейты без чата и пользователя (например, опросы) идут только
+    через общий лимит.
+
+    Метрики:
+        scheduler_queue_depth — апдейты, ожидающие своей очереди или слота;
+        scheduler_chat_queues — чаты с непустой очередью;
+        scheduler_in_flight — апдейты в обработке;
+        scheduler_wait_seconds — время ожидания перед обработкой.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_UPDATE_CONCURRENCY,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self._queues: dict[Hashable, _ChatQueue] = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._accepted = 0
+        self._running = 0
+        metrics = metrics or MetricsRegistry()
+        self._depth = metrics.gauge("scheduler_queue_depth")
+        self._chat_queues = metrics.gauge("scheduler_chat_queues")
+        self._in_flight = metrics.gauge("scheduler_in_flight")
+        self._wait = metrics.timing("scheduler_wait_seconds")
+
+    async def __call__(
+        self,
+        handler: UpdateHandler,
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        key = ordering_key(data.get("event_chat"), data.get("event_from_user"))
+        enqueued_at = time.monotonic()
+        self._accepted += 1
+        self._update_depth()
+        try:
+            if key is None:
+                return await self._run(handler, event, data, enqueued_at)
+            return await self._run_in_queue(key, handler, event, data, enqueued_at)
+        finally:
+            self._accepted -= 1
+            self._update_depth()
+
+    @property
+    def active_queues(self) -> int:
+        return len(self._queues)
+
+    async def _run_in_queue(
+        self,
+        key: Hashable,
+        handler: UpdateHandler,
+        event: TelegramObject,
+        data: dict[str, Any],
+        enqueued_at: float,
+    ) -> Any:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _ChatQueue()
+            self._chat_queues.set(len(self._queues))
+        queue.pending += 1
+        try:
+            async with queue.lock:
+                return await self._run(handler, event, data, enqueued_at)
+        finally:
+            queue.pending -= 1
+            if queue.pending == 0:
+                # Очередь опустела: освобождаем её, новый апдейт создаст заново
+                del self._queues[key]
+                self._chat_queues.set(len(self._queues))
+
+    async def _run(
+        self,
+        handler: UpdateHandler,
+        event: TelegramObject,
+        data: dict[str, Any],
+        enqueued_at: float,
+    ) -> Any:
+        async with self._slots:
+            self._wait.observe(time.monotonic() - enqueued_at)
+            self._running += 1
+            self._update_depth()
+            try:
+                return await handler(event, data)
+            finally:
+                self._running -= 1
+                self._update_depth()
+
+    def _update_depth(self) -> None:
+        # Ожидающие = принятые, но ещё не запущенные апдейты
+        self._depth.set(self._accepted - self._running)
+        self._in_flight.set(self._running)
+
+
+def ordering_key(chat: Chat | None, user: User | None) -> Hashable | None:
+    """Ключ очереди: чат, а для апдейтов без чата (inline) — пользователь."""
+    if chat is not None:
+        return ("chat", chat.id)
+    if user is not None:
+        return ("user", user.id)
+    return None
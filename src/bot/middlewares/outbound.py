@@ -0,0 +1,64 @@
+"""
+Middleware сессии бота: исходящие запросы к Bot API идут через очередь.
+
+Обработчики по-прежнему вызывают message.answer и bot.send_chat_action,
+а запрос встаёт в OutboundQueue и уходит, когда позволяют лимиты Telegram.
+Через очередь идут только отправка и редактирование сообщений в чатах;
+ответы на callback и inline-запросы и служебные методы идут напрямую.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendChatAction
+from aiogram.methods.base import TelegramType
+
+from src.bot.services.outbound import PRIORITY_HIGH, PRIORITY_LOW, OutboundQueue, RetryLater
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+
+# Методы Bot API, на которые действуют лимиты отправки в чат
+QUEUED_METHOD_PREFIXES = ("send", "edit", "copy", "forward")
+
+
+class OutboundRequestMiddleware(BaseRequestMiddleware):
+    """Ставит отправку сообщений в очередь с лимитами и повтором после 429."""
+
+    def __init__(self, queue: OutboundQueue) -> None:
+        self._queue = queue
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        # Строковый chat_id (@channel) не сопоставить с чатом апдейтов — отправляем сразу
+        if not isinstance(chat_id, int) or not method.__api_method__.startswith(
+            QUEUED_METHOD_PREFIXES
+        ):
+            return await make_request(bot, method)
+
+        async def send() -> Response[TelegramType]:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                raise RetryLater(e.retry_after) from e
+
+        if isinstance(method, SendChatAction):
+            return await self._queue.submit(
+                chat_id,
+                send,
+                priority=PRIORITY_LOW,
+                coalesce_key=(chat_id, method.action, method.message_thread_id),
+            )
+        return await self._queue.submit(chat_id, send, priority=PRIORITY_HIGH)
@@ -0,0 +1,46 @@
+"""
+Учёт обрабатываемых апдейтов для корректной остановки.
+
+Middleware регистрируется первым: каждый апдейт от начала до конца
+обработки учтён в InFlightTracker, и при остановке приложение дожидается
+их, прежде чем закрывать сессии и пулы. Апдейты, пришедшие уже во время
+остановки, не обрабатываются.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.bot.services.shutdown import InFlightTracker
+
+logger = logging.getLogger("bot")
+
+
+class InFlightUpdatesMiddleware(BaseMiddleware):
+    """Outer-middleware апдейтов: учитывает обработку, во время остановки отклоняет новые."""
+
+    def __init__(self, tracker: InFlightTracker) -> None:
+        self._tracker = tracker
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        task = asyncio.current_task()
+        if task is None:
+            return await handler(event, data)
+        if not self._tracker.track(task):
+            update_id = event.update_id if isinstance(event, Update) else None
+            logger.info("Апдейт %s пришёл во время остановки и отброшен", update_id)
+            return None
+        try:
+            return await handler(event, data)
+        finally:
+            self._tracker.untrack(task)
@@ -0,0 +1,62 @@
+"""
+Отмена устаревших запросов к LLM до постановки апдейта в очередь чата.
+
+Апдейты одного чата обрабатываются по очереди, поэтому /stop или новое
+сообщение иначе ждали бы, пока закончится текущий запрос к LLM.
+Middleware регистрируется перед планировщиком и отменяет запрос сразу.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.bot.services.llm_requests import InFlightRequests
+
+logger = logging.getLogger("bot")
+
+STOP_COMMAND = "/stop"
+
+
+class SupersedeMiddleware(BaseMiddleware):
+    """
+    Outer-middleware апдейтов: отменяет текущий запрос пользователя к LLM.
+
+    Args:
+        requests: Реестр выполняющихся запросов
+        latest_wins: Отменять запрос при любом новом текстовом сообщении
+            (не только при /stop)
+    """
+
+    def __init__(self, requests: InFlightRequests, latest_wins: bool = True) -> None:
+        self._requests = requests
+        self._latest_wins = latest_wins
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        message = event.message if isinstance(event, Update) else None
+        user = data.get("event_from_user")
+        requests = data.get("llm_requests", self._requests)
+        if message is not None and message.text and user is not None:
+            if self._supersedes(message.text) and requests.cancel(user.id):
+                logger.info("Запрос к LLM пользователя %s отменён новым вводом", user.id)
+        return await handler(event, data)
+
+    def _supersedes(self, text: str) -> bool:
+        if is_stop_command(text):
+            return True
+        # Прочие команды не относятся к диалогу и не прерывают его
+        return self._latest_wins and not text.startswith("/")
+
+
+def is_stop_command(text: str) -> bool:
+    """Проверяет, что текст — команда /stop (в том числе /stop@имя_бота)."""
+    command = text.split(maxsplit=1)[0] if text.strip() else ""
+    return command.split("@", 1)[0] == STOP_COMMAND
@@ -0,0 +1,111 @@
+"""
+Защита от флуда: ограничение частоты апдейтов каждого пользователя.
+
+Апдейт относится к одному из вёдер (LLM, конвертер, дешёвые команды);
+при исчерпании ведра апдейт отбрасывается, а пользователь получает
+одно предупреждение за период охлаждения, чтобы само ограничение
+не превращалось в поток ответов.
+
+При склейке серий сообщений (CHAT_DEBOUNCE_MS) ведро LLM проверяет
+отдельный экземпляр после MessageBurstMiddleware: серия — один запрос
+к LLM и расходует один токен, а не по токену на каждый фрагмент.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.bot.services.entitlements import Entitlements
+from src.bot.services.history import ChatHistoryRepository
+from src.bot.services.throttling import (
+    BUCKET_COMMAND,
+    BUCKET_CONVERT,
+    BUCKET_LLM,
+    Throttler,
+    format_retry_after,
+)
+from src.bot.utils.commands import parse_command
+
+logger = logging.getLogger("bot")
+
+# Команды, которые расходуют ведро конвертера
+CONVERT_COMMANDS = frozenset({"convert", "rates"})
+ALL_BUCKETS = frozenset({BUCKET_LLM, BUCKET_CONVERT, BUCKET_COMMAND})
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Outer-middleware апдейтов: token bucket на пользователя и вид нагрузки."""
+
+    def __init__(
+        self,
+        throttler: Throttler,
+        entitlements: Entitlements,
+        history_repo: ChatHistoryRepository,
+        buckets: frozenset[str] = ALL_BUCKETS,
+    ) -> None:
+        self._throttler = throttler
+        # Вёдра, которые проверяет этот экземпляр; остальные апдейты проходят
+        self._buckets = buckets
+        self._entitlements = entitlements
+        self._history_repo = history_repo
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or not isinstance(event, Update):
+            return await handler(event, data)
+        bucket = await self._classify(event, user.id, data)
+        if bucket is None or bucket not in self._buckets:
+            return await handler(event, data)
+
+        retry_after = await self._throttler.check(
+            user.id, bucket, self._entitlements.tier(user.id)
+        )
+        if retry_after <= 0:
+            return await handler(event, data)
+
+        logger.info("Пользователь %s ограничен (%s), ждать %.1f с", user.id, bucket, retry_after)
+        if await self._throttler.should_notify(user.id, bucket):
+            await _notify(event, format_retry_after(retry_after))
+        return None
+
+    async def _classify(self, event: Update, user_id: int, data: dict[str, Any]) -> str | None:
+        if event.inline_query is not None:
+            # Inline-запрос приходит на каждое нажатие клавиши и отвечается
+            # из курсов в памяти: ограничение только оставило бы его без ответа
+            return None
+        if event.callback_query is not None:
+            # Кнопки сейчас есть только у конвертера
+            return BUCKET_CONVERT
+        message = event.message
+        if message is None:
+            return None
+        command = parse_command(message.text)
+        if command is not None:
+            return BUCKET_CONVERT if command.command in CONVERT_COMMANDS else BUCKET_COMMAND
+        if data.get("raw_state") is not None:
+            return BUCKET_CONVERT
+        # У каждого бота процесса своя история (BotContextMiddleware)
+        history_repo = data.get("history_repo", self._history_repo)
+        if message.text and await history_repo.is_active(user_id):
+            return BUCKET_LLM
+        return BUCKET_COMMAND
+
+
+async def _notify(event: Update, retry_after: int) -> None:
+    text = f"⏳ Слишком много запросов. Попробуйте через {retry_after} с."
+    try:
+        if event.message is not None:
+            await event.message.answer(text)
+        elif event.callback_query is not None:
+            await event.callback_query.answer(text)
+    except Exception as e:
+        logger.warning("Не удалось отправить предупреждение об ограничении: %s", e)
@@ -6,7 +6,19 @@
 
 from aiogram import Router
 
-from . import chatgpt, convert, echo, start, profile, premium, language, help
+from . import (
+    chatgpt,
+    commands,
+    convert,
+    echo,
+    help,
+    inline,
+    language,
+    premium,
+    profile,
+    rates,
+    start,
+)
 
 
 def get_main_router() -> Router:
@@ -15,13 +27,18 @@ def get_main_router() -> Router:
     все остальные под-роутеры.
     """
     router = Router()
+    # Диспетчер команд по таблице — первым, остальные роутеры остаются резервным путём
+    router.include_router(commands.router)
     # Подключаем роутеры команд (важен порядок - более специфичные команды первыми)
     router.include_router(start.router)
     router.include_router(convert.router)
+    router.include_router(rates.router)
     router.include_router(profile.router)
     router.include_router(premium.router)
     router.include_router(language.router)
     router.include_router(help.router)
+    # Inline-запросы — отдельный тип событий, порядок относительно команд не важен
+    router.include_router(inline.router)
     # Роутер ChatGPT подключаем перед echo, чтобы перехватывать сообщения в режиме диалога
     router.include_router(chatgpt.router)
     # Эхо-роутер подключаем последним, чтобы он обрабатывал только неизвестные сообщения
@@ -4,16 +4,21 @@
 Обрабатывает команду запуска ChatGPT-режима и текстовые сообщения в этом режиме.
 """
 
-import asyncio
 import logging
-from contextlib import suppress
+import math
+from contextlib import nullcontext
 
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
 from src.bot.config import BotConfig
+from src.bot.filters.session import ActiveChatSession
+from src.bot.services.admission import AdmissionController, OverloadedError
+from src.bot.services.entitlements import TIER_FREE, Entitlements
 from src.bot.services.history import ChatHistoryRepository
+from src.bot.services.llm_queue import LLMJob, LLMJobQueue, QueueFullError
+from src.bot.services.llm_requests import InFlightRequests, RequestSupersededError
 from src.bot.services.llm import (
     LLMClient,
     LLMTimeoutError,
@@ -21,6 +26,11 @@ from src.bot.services.llm import (
     RateLimitError,
     UpstreamError,
 )
+from src.bot.services.prompt_cache import PromptCache
+from src.bot.services.text import make_llm_error_message
+from src.bot.services.throttling import format_retry_after
+from src.bot.services.typing import TypingTicker
+from src.bot.services.usage import QuotaExceededError, UsageAccounting
 from src.bot.utils.formatting import format_user_for_log
 
 logger = logging.getLogger("bot")
@@ -54,11 +64,15 @@ async def cmd_chatgpt(
 
 
 @router.message(Command("stop"))
-async def cmd_stop(message: Message, history_repo: ChatHistoryRepository) -> None:
+async def cmd_stop(
+    message: Message,
+    history_repo: ChatHistoryRepository,
+    llm_requests: InFlightRequests | None = None,
+) -> None:
     """
     Обработчик команды /stop.
 
-    Останавливает режим ChatGPT для пользователя.
+    Останавливает режим ChatGPT для пользователя и отменяет его текущий запрос к LLM.
     """
     user = message.from_user
     if user is None:
@@ -67,6 +81,9 @@ async def cmd_stop(message: Message, history_repo: ChatHistoryRepository) -> Non
 
     logger.info("Команда /stop от пользователя: %s", format_user_for_log(message))
 
+    if llm_requests is not None:
+        llm_requests.cancel(user.id)
+
     if await history_repo.is_active(user.id):
         await history_repo.stop_session(user.id)
         await message.answer("✅ Режим ChatGPT деактивирован.")
@@ -74,12 +91,20 @@ async def cmd_stop(message: Message, history_repo: ChatHistoryRepository) -> Non
         await message.answer("ℹ️ Вы не находитесь в режиме ChatGPT.")
 
 
-@router.message()
+@router.message(ActiveChatSession())
 async def handle_chat_message(
     message: Message,
     config: BotConfig,
     history_repo: ChatHistoryRepository,
     llm_client: LLMClient,
+    llm_requests: InFlightRequests | None = None,
+    burst_texts: list[str] | None = None,
+    typing: TypingTicker | None = None,
+    llm_queue: LLMJobQueue | None = None,
+    admission: AdmissionController | None = None,
+    entitlements: Entitlements | None = None,
+    prompt_cache: PromptCache | None = None,
+    usage: UsageAccounting | None = None,
 ) -> None:
     """
     Обработчик текстовых сообщений в режиме ChatGPT.
@@ -89,12 +114,20 @@ async def handle_chat_message(
     Args:
         message: Сообщение от пользователя
         config: Конфигурация бота (передаётся через workflow_data)
+        llm_requests: Реестр запросов к LLM; через него запрос можно отменить
+        burst_texts: Тексты серии быстрых сообщений, склеенных в одну реплику
+        typing: Общий планировщик индикатора "печатает"
+        llm_queue: Очередь заданий LLM; если задана, ответ отправит воркер очереди
+        admission: Контроль допуска запросов к LLM при перегрузке
+        entitlements: Уровни доступа (Premium получает больше мест у планировщика)
+        prompt_cache: Кэш ответов на похожие первые вопросы диалога
+        usage: Учёт использования LLM и суточные квоты
     """
     user = message.from_user
     if user is None:
         return
 
-    # Проверяем, что пользователь в режиме ChatGPT
+    # Режим уже проверен фильтром ActiveChatSession; повтор отвечает из кэша сессий
     if not await history_repo.is_active(user.id):
         return
 
@@ -102,7 +135,8 @@ async def handle_chat_message(
     if message.text and message.text.startswith("/"):
         return
 
-    user_text = message.text or ""
+    # Серия быстрых сообщений уходит в LLM одной репликой
+    user_text = "\n".join(burst_texts) if burst_texts else message.text or ""
     if not user_text.strip():
         await message.answer("Пожалуйста, отправьте текстовое сообщение.")
         return
@@ -113,11 +147,8 @@ async def handle_chat_message(
         user_text[:100],  # Логируем только первые 100 символов
     )
 
-    bot = message.bot
-    stop_typing = asyncio.Event()
-    typing_task = asyncio.create_task(
-        _typing_loop(bot=bot, chat_id=message.chat.id, stop_event=stop_typing)
-    )
+    if typing is not None:
+        typing.start(message.chat.id)
 
     try:
         # Проверяем наличие API ключа
@@ -129,38 +160,90 @@ async def handle_chat_message(
             logger.error("OpenRouter API ключ не найден для пользователя %s", user.id)
             return
 
-        # Добавляем сообщение пользователя в историю
-        await history_repo.add_user_message(user.id, user_text)
+        tier = entitlements.tier(user.id) if entitlements is not None else TIER_FREE
 
-        # Получаем историю диалога
-        history = await history_repo.get_history(user.id)
+        if llm_queue is not None:
+            # Ответ отправит воркер очереди LLM (llm_worker.py)
+            usage_day = await usage.reserve(user.id, tier) if usage is not None else None
+            await history_repo.add_user_message(user.id, user_text)
+            try:
+                await llm_queue.enqueue(
+                    LLMJob(
+                        user_id=user.id,
+                        chat_id=message.chat.id,
+                        text=user_text[:1000],
+                        usage_day=usage_day or "",
+                    )
+                )
+            except QueueFullError:
+                if usage is not None:
+                    await usage.refund(user.id, usage_day)
+                raise
+            return
 
-        # Отправляем запрос к LLM с моделью из конфигурации
-        response_text = await llm_client.get_response(
-            api_key=config.openrouter_api_key,
-            messages=history,
-            model=config.llm_model,
+        response_text = (
+            await _answer_from_cache(user.id, user_text, history_repo, prompt_cache)
+            if prompt_cache is not None
+            else None
         )
-
-        # Добавляем ответ в историю
-        await history_repo.add_assistant_message(user.id, response_text)
+        if response_text is None:
+            # Без квоты или при перегрузке отказываем сразу, не дописывая реплику в историю
+            usage_day = await usage.reserve(user.id, tier) if usage is not None else None
+            try:
+                async with admission.slot(tier) if admission is not None else nullcontext():
+                    response_text = await _ask_llm(
+                        user.id,
+                        user_text,
+                        config,
+                        history_repo,
+                        llm_client,
+                        llm_requests,
+                        prompt_cache,
+                        usage,
+                        usage_day,
+                    )
+            except BaseException:
+                # Модель не ответила (в том числе запрос прерван остановкой бота):
+                # запрос не расходует квоту
+                if usage is not None:
+                    await usage.refund(user.id, usage_day)
+                raise
 
         # Отправляем ответ пользователю
         await message.answer(response_text)
 
+    except RequestSupersededError:
+        # Пользователь отправил /stop или новое сообщение: ответ уже не нужен
+        logger.info("Запрос к LLM пользователя %s отменён", user.id)
+
+    except OverloadedError as e:
+        logger.warning("LLM перегружена, запрос пользователя %s отклонён: %s", user.id, e)
+        await message.answer(
+            "⏳ Сейчас модель перегружена. "
+            f"Попробуйте через {format_retry_after(e.retry_after)} с."
+        )
+
+    except QuotaExceededError as e:
+        logger.info("Квота LLM пользователя %s исчерпана: %s", user.id, e)
+        await message.answer(
+            f"📊 Дневной лимит запросов к модели ({e.limit}) исчерпан. "
+            f"Он обновится через {math.ceil(e.retry_after / 3600)} ч. "
+            "Использование можно посмотреть в /profile."
+        )
+
+    except QueueFullError as e:
+        logger.warning("Очередь LLM переполнена, пользователь %s: %s", user.id, e)
+        await message.answer(
+            "⏳ Сейчас слишком много запросов к модели. Попробуйте через минуту."
+        )
+
     except RateLimitError as e:
         logger.warning(
             "Rate limit для пользователя %s: %s",
             user.id,
             e,
         )
-        await message.answer(
-            "⏳ Превышен лимит запросов к бесплатной модели.\n\n"
-            "Бесплатные модели имеют ограничения:\n"
-            "• 20 запросов/день без кредитов\n"
-            "• 200 запросов/день с кредитами $5+\n\n"
-            "Попробуйте позже или используйте команду /stop для выхода из режима."
-        )
+        await message.answer(make_llm_error_message(e))
 
     except ModelNotFoundError as e:
         logger.error(
@@ -168,56 +251,76 @@ async def handle_chat_message(
             user.id,
             e,
         )
-        await message.answer(
-            "❌ Модель временно недоступна.\n\n"
-            "Обратитесь к администратору для настройки другой модели."
-        )
+        await message.answer(make_llm_error_message(e))
 
     except LLMTimeoutError as e:
         logger.warning("Таймаут LLM для пользователя %s: %s", user.id, e)
-        await message.answer(
-            "⏳ Превышено время ожидания ответа модели. "
-            "Попробуйте ещё раз или выйдите из режима /stop."
-        )
+        await message.answer(make_llm_error_message(e))
     except UpstreamError as e:
         logger.error("Upstream ошибка для пользователя %s: %s", user.id, e)
-        await message.answer(
-            "❌ Провайдер временно недоступен. "
-            "Попробуйте позже или используйте /stop для выхода из режима."
-        )
+        await message.answer(make_llm_error_message(e))
     except Exception as e:
         logger.error(
             "Ошибка при обработке сообщения в режиме ChatGPT: %s",
             e,
             exc_info=True,
         )
-        await message.answer(
-            "❌ Произошла ошибка при обработке запроса.\n\n"
-            "Попробуйте позже или используйте команду /stop для выхода из режима."
-        )
+        await message.answer(make_llm_error_message(e))
 
     finally:
-        stop_typing.set()
-        typing_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await typing_task
+        if typing is not None:
+            typing.stop(message.chat.id)
 
 
-async def _typing_loop(bot, chat_id: int, stop_event: asyncio.Event, interval: float = 4.0) -> None:
-    """
-    Отправляет action "typing" пока не будет остановлен stop_event.
+async def _ask_llm(
+    user_id: int,
+    user_text: str,
+    config: BotConfig,
+    history_repo: ChatHistoryRepository,
+    llm_client: LLMClient,
+    llm_requests: InFlightRequests | None,
+    prompt_cache: PromptCache | None = None,
+    usage: UsageAccounting | None = None,
+    usage_day: str | None = None,
+) -> str:
+    """Дописывает реплику в историю, получает ответ модели и сохраняет его."""
+    await history_repo.add_user_message(user_id, user_text)
+    history = await history_repo.get_history(user_id)
+    first_turn = len(history) == 1
+
+    # Отправляем запрос к LLM с моделью из конфигурации
+    request = llm_client.get_response(
+        api_key=config.openrouter_api_key or "",
+        messages=history,
+        model=config.llm_model,
+    )
+    if llm_requests is not None:
+        response_text = await llm_requests.run(user_id, request)
+    else:
+        response_text = await request
 
-    Telegram показывает статус ~5 секунд, поэтому повторяем каждые 4 секунды,
-    пока обрабатываем запрос к LLM.
-    """
-    try:
-        while not stop_event.is_set():
-            await bot.send_chat_action(chat_id=chat_id, action="typing")
-            try:
-                await asyncio.wait_for(stop_event.wait(), timeout=interval)
-            except asyncio.TimeoutError:
-                continue
-    except Exception:
-        # Не падаем из-за ошибок отправки "typing"
-        return
+    await history_repo.add_assistant_message(user_id, response_text)
+    if usage is not None:
+        # Объём учитывается в тех сутках, из квоты которых списан запрос
+        await usage.record(user_id, history, response_text, usage_day)
+    # Ответ на первый вопрос не зависит от контекста, его можно отдать похожим вопросам
+    if prompt_cache is not None and first_turn:
+        prompt_cache.put(user_text, response_text)
+    return response_text
 
+
+async def _answer_from_cache(
+    user_id: int,
+    user_text: str,
+    history_repo: ChatHistoryRepository,
+    prompt_cache: PromptCache,
+) -> str | None:
+    """Ответ из кэша на первый вопрос диалога (с записью в историю) или None."""
+    if await history_repo.get_history(user_id):
+        return None
+    response_text = prompt_cache.get(user_text)
+    if response_text is None:
+        return None
+    await history_repo.add_user_message(user_id, user_text)
+    await history_repo.add_assistant_message(user_id, response_text)
+    return response_text
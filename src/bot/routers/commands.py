@@ -0,0 +1,25 @@
+"""
+Роутер быстрой диспетчеризации команд.
+
+Подключается первым: команды из таблицы (см. CommandDispatchTable)
+сразу передаются своему обработчику, минуя фильтры остальных роутеров.
+Без таблицы в workflow_data роутер ничего не перехватывает.
+"""
+
+from typing import Any
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import Message
+
+from src.bot.filters.command_table import TableCommand
+
+router = Router()
+
+
+@router.message(TableCommand())
+async def dispatch_command(
+    message: Message, command_handler: HandlerObject, **data: Any
+) -> Any:
+    """Вызывает обработчик команды с теми же зависимостями, что и aiogram."""
+    return await command_handler.call(message, **data)
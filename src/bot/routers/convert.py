@@ -2,28 +2,36 @@
 Роутер для команды /convert.
 
 Обрабатывает команду конвертации валют с использованием inline-кнопок для выбора валют.
+Валюту можно выбрать на страницах каталога или найти, отправив часть названия.
 """
 
 import logging
-from typing import Any
+import time
 
 from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from src.bot.services.currency import (
-    SUPPORTED_CURRENCIES,
-    convert_currency,
-    format_currency_result,
+from src.bot.keyboards.currency import (
+    CURRENCY_CALLBACK_PREFIX,
+    NOOP_CALLBACK,
+    PAGE_CALLBACK_PREFIX,
+    CurrencyKeyboards,
+    build_search_keyboard,
 )
+from src.bot.services.currency import ExchangeRateService
+from src.bot.services.currency_format import format_currency_result
 from src.bot.utils.formatting import format_user_for_log
 
 logger = logging.getLogger("bot")
 
 router = Router()
 
+# Постраничные клавиатуры каталога строятся один раз на каталог
+currency_keyboards = CurrencyKeyboards()
+
 
 class ConvertStates(StatesGroup):
     """Состояния для конечного автомата конвертации валют."""
@@ -31,42 +39,12 @@ class ConvertStates(StatesGroup):
     waiting_for_amount = State()   # Ожидание ввода суммы
 
 
-def get_currency_keyboard() -> InlineKeyboardMarkup:
-    """
-    Создает inline-клавиатуру с 10 поддерживаемыми валютами.
-    
-    Returns:
-        InlineKeyboardMarkup: Клавиатура с кнопками валют
-    """
-    # Получаем список из 10 валют
-    currencies = list(SUPPORTED_CURRENCIES.items())[:10]
-    
-    # Создаем кнопки по 2 в ряд
-    buttons = []
-    for i in range(0, len(currencies), 2):
-        row = []
-        # Добавляем первую валюту в ряду
-        code1, name1 = currencies[i]
-        row.append(InlineKeyboardButton(
-            text=f"{code1} - {name1}",
-            callback_data=f"currency:{code1}"
-        ))
-        
-        # Добавляем вторую валюту, если есть
-        if i + 1 < len(currencies):
-            code2, name2 = currencies[i + 1]
-            row.append(InlineKeyboardButton(
-                text=f"{code2} - {name2}",
-                callback_data=f"currency:{code2}"
-            ))
-        
-        buttons.append(row)
-    
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
-
-
 @router.message(Command("convert"))
-async def cmd_convert(message: Message, state: FSMContext) -> None:
+async def cmd_convert(
+    message: Message,
+    state: FSMContext,
+    currency_service: ExchangeRateService,
+) -> None:
     """
     Обработчик команды /convert.
     
@@ -74,10 +52,14 @@ async def cmd_convert(message: Message, state: FSMContext) -> None:
     """
     logger.info("Команда /convert от пользователя: %s", format_user_for_log(message))
     
-    # Отправляем сообщение с клавиатурой выбора валюты
-    keyboard = get_currency_keyboard()
+    # Загружаем курсы (из памяти, если они уже есть), чтобы каталог был полным
+    await currency_service.get_table()
+    
+    # Отправляем сообщение с первой страницей каталога валют
+    keyboard = currency_keyboards.page(currency_service.catalog, 0)
     await message.answer(
-        "💱 Выберите валюту для конвертации:",
+        "💱 Выберите валюту для конвертации или отправьте часть её названия "
+        "(например, «евр» или «eu»):",
         reply_markup=keyboard
     )
     
@@ -85,23 +67,82 @@ async def cmd_convert(message: Message, state: FSMContext) -> None:
     await state.set_state(ConvertStates.waiting_for_currency)
 
 
-@router.callback_query(ConvertStates.waiting_for_currency, F.data.startswith("currency:"))
-async def callback_currency_selected(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(
+    ConvertStates.waiting_for_currency, F.data.startswith(PAGE_CALLBACK_PREFIX)
+)
+async def callback_currency_page(
+    callback: CallbackQuery, currency_service: ExchangeRateService
+) -> None:
+    """
+    Обработчик листания страниц каталога валют.
+    
+    Args:
+        callback: CallbackQuery объект
+        currency_service: Сервис курсов валют (передаётся через workflow_data)
+    """
+    try:
+        page = int(callback.data.removeprefix(PAGE_CALLBACK_PREFIX))
+    except ValueError:
+        await callback.answer()
+        return
+    
+    keyboard = currency_keyboards.page(currency_service.catalog, page)
+    await callback.message.edit_reply_markup(reply_markup=keyboard)
+    await callback.answer()
+
+
+@router.callback_query(F.data == NOOP_CALLBACK)
+async def callback_noop(callback: CallbackQuery) -> None:
+    """Обработчик кнопки-индикатора страницы: просто убирает "часики"."""
+    await callback.answer()
+
+
+@router.message(ConvertStates.waiting_for_currency, F.text, ~F.text.startswith("/"))
+async def process_currency_search(
+    message: Message, currency_service: ExchangeRateService
+) -> None:
+    """
+    Обработчик поиска валюты по тексту.
+    
+    Ищет валюты по префиксам кода и названий и предлагает найденные варианты.
+    """
+    results = currency_service.catalog.search(message.text)
+    if not results:
+        await message.answer(
+            "🔍 Ничего не найдено. Попробуйте другое название или код валюты."
+        )
+        return
+    
+    await message.answer(
+        "🔍 Найденные валюты:",
+        reply_markup=build_search_keyboard(results),
+    )
+
+
+@router.callback_query(
+    ConvertStates.waiting_for_currency, F.data.startswith(CURRENCY_CALLBACK_PREFIX)
+)
+async def callback_currency_selected(
+    callback: CallbackQuery,
+    state: FSMContext,
+    currency_service: ExchangeRateService,
+) -> None:
     """
     Обработчик выбора валюты через inline-кнопки.
     
     Args:
         callback: CallbackQuery объект
         state: FSMContext для управления состоянием
+        currency_service: Сервис курсов валют (передаётся через workflow_data)
     """
     # Извлекаем код валюты из callback_data
-    currency_code = callback.data.split(":")[1]
+    currency_code = callback.data.removeprefix(CURRENCY_CALLBACK_PREFIX)
     
     # Сохраняем выбранную валюту в состоянии
     await state.update_data(selected_currency=currency_code)
     
     # Отправляем подтверждение выбора
-    currency_name = SUPPORTED_CURRENCIES.get(currency_code, currency_code)
+    currency_name = currency_service.catalog.label(currency_code)
     await callback.message.edit_text(
         f"✅ Вы выбрали валюту: {currency_code} ({currency_name})\n\n"
         f"📝 Теперь введите сумму для конвертации:"
@@ -115,13 +156,18 @@ async def callback_currency_selected(callback: CallbackQuery, state: FSMContext)
 
 
 @router.message(ConvertStates.waiting_for_amount)
-async def process_amount_input(message: Message, state: FSMContext) -> None:
+async def process_amount_input(
+    message: Message,
+    state: FSMContext,
+    currency_service: ExchangeRateService,
+) -> None:
     """
     Обработчик ввода суммы для конвертации.
     
     Args:
         message: Сообщение с суммой
         state: FSMContext для управления состоянием
+        currency_service: Сервис курсов валют (передаётся через workflow_data)
     """
     # Получаем выбранную валюту из состояния
     user_data = await state.get_data()
@@ -145,16 +191,17 @@ async def process_amount_input(message: Message, state: FSMContext) -> None:
         await message.answer("❌ Сумма должна быть положительным числом.")
         return
     
-    # Отправляем сообщение о начале конвертации
-    await message.answer("⏳ Получаю актуальный курс валют...")
+    # Сообщаем об ожидании, только если курсов ещё нет в памяти
+    if currency_service.peek_table() is None:
+        await message.answer("⏳ Получаю актуальный курс валют...")
     
     # Выполняем конвертацию в USD как пример
-    converted_amount, rate = await convert_currency(
+    result = await currency_service.convert(
         amount, currency_code, "USD"  # Конвертируем в USD для примера
     )
     
     # Проверяем результат
-    if converted_amount is None or rate is None:
+    if result is None:
         logger.error(
             "Ошибка конвертации валют: amount=%s, base=%s, target=USD",
             amount,
@@ -171,7 +218,14 @@ async def process_amount_input(message: Message, state: FSMContext) -> None:
     
     # Форматируем и отправляем результат
     result_text = format_currency_result(
-        amount, currency_code, converted_amount, "USD", rate
+        amount,
+        currency_code,
+        result.converted_amount,
+        "USD",
+        result.rate,
+        rates_age_seconds=time.time() - result.rates_fetched_at,
+        base_name=currency_service.catalog.label(currency_code),
+        target_name=currency_service.catalog.label("USD"),
     )
     await message.answer(result_text)
     
@@ -179,8 +233,8 @@ async def process_amount_input(message: Message, state: FSMContext) -> None:
         "Конвертация выполнена: %.2f %s -> %.2f USD (курс: %.4f)",
         amount,
         currency_code,
-        converted_amount,
-        rate,
+        result.converted_amount,
+        result.rate,
     )
     
     # Очищаем состояние
@@ -17,6 +17,9 @@ logger = logging.getLogger("bot")
 
 router = Router()
 
+# Текст статичен: формируем его один раз при запуске, а не на каждую команду
+HELP_TEXT = make_help_message()
+
 
 @router.message(Command("help"))
 async def cmd_help(message: Message) -> None:
@@ -26,5 +29,5 @@ async def cmd_help(message: Message) -> None:
     Отправляет пользователю информацию о помощи и поддержке.
     """
     logger.info("Команда /help от пользователя: %s", format_user_for_log(message))
-    await message.answer(make_help_message())
+    await message.answer(HELP_TEXT)
 
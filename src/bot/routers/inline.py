@@ -0,0 +1,97 @@
+"""
+Роутер inline-режима: конвертация валют прямо в поле ввода (@bot 100 usd eur).
+
+Ответы строятся только из таблицы курсов в памяти, поэтому набор запроса
+по мере ввода никогда не вызывает обращений к внешнему API курсов.
+"""
+
+import logging
+import time
+
+from aiogram import Router
+from aiogram.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+)
+
+from src.bot.config import BotConfig
+from src.bot.services.currency import ExchangeRateService
+from src.bot.services.currency_format import format_currency_result
+from src.bot.services.currency_query import parse_conversion_query
+
+logger = logging.getLogger("bot")
+
+router = Router()
+
+# Подсказка, если запрос не распознан или курсы ещё не загружены
+INLINE_HINT_TITLE = "💱 Конвертер валют"
+INLINE_HINT_TEXT = "Введите запрос, например: 100 usd eur"
+
+
+@router.inline_query()
+async def inline_convert(
+    inline_query: InlineQuery,
+    config: BotConfig,
+    currency_service: ExchangeRateService,
+) -> None:
+    """
+    Обработчик inline-запросов на конвертацию.
+
+    Разбирает запрос и отвечает по курсам из памяти с cache_time,
+    чтобы Telegram мог переиспользовать ответы на одинаковые запросы.
+    """
+    started = time.perf_counter()
+    catalog = currency_service.catalog
+    query = parse_conversion_query(inline_query.query, catalog)
+
+    results: list[InlineQueryResultArticle] = []
+    if query is not None:
+        for target in query.target_currencies:
+            conversion = currency_service.convert_cached(
+                query.amount, query.base_currency, target
+            )
+            if conversion is None:
+                continue
+            text = format_currency_result(
+                conversion.amount,
+                conversion.base_currency,
+                conversion.converted_amount,
+                conversion.target_currency,
+                conversion.rate,
+                rates_age_seconds=time.time() - conversion.rates_fetched_at,
+                base_name=catalog.label(conversion.base_currency),
+                target_name=catalog.label(conversion.target_currency),
+            )
+            results.append(
+                InlineQueryResultArticle(
+                    id=f"{conversion.base_currency}-{target}-{conversion.amount:g}",
+                    title=(
+                        f"{conversion.amount:,.2f} {conversion.base_currency} = "
+                        f"{conversion.converted_amount:,.2f} {target}"
+                    ),
+                    description=f"1 {conversion.base_currency} = {conversion.rate:.4f} {target}",
+                    input_message_content=InputTextMessageContent(message_text=text),
+                )
+            )
+
+    if not results:
+        results.append(
+            InlineQueryResultArticle(
+                id="hint",
+                title=INLINE_HINT_TITLE,
+                description=INLINE_HINT_TEXT,
+                input_message_content=InputTextMessageContent(message_text=INLINE_HINT_TEXT),
+            )
+        )
+
+    logger.debug(
+        "Inline-запрос обработан за %.1f мс, результатов: %s",
+        (time.perf_counter() - started) * 1000,
+        len(results),
+    )
+    await inline_query.answer(
+        results,
+        cache_time=config.inline_cache_time_sec,
+        is_personal=False,
+    )
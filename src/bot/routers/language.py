@@ -17,6 +17,8 @@ logger = logging.getLogger("bot")
 
 router = Router()
 
+LANGUAGE_TEXT = make_language_message()
+
 
 @router.message(Command("language"))
 async def cmd_language(message: Message) -> None:
@@ -26,5 +28,5 @@ async def cmd_language(message: Message) -> None:
     Отправляет пользователю меню выбора языка.
     """
     logger.info("Команда /language от пользователя: %s", format_user_for_log(message))
-    await message.answer(make_language_message())
+    await message.answer(LANGUAGE_TEXT)
 
@@ -17,6 +17,8 @@ logger = logging.getLogger("bot")
 
 router = Router()
 
+PREMIUM_TEXT = make_premium_message()
+
 
 @router.message(Command("premium"))
 async def cmd_premium(message: Message) -> None:
@@ -26,5 +28,5 @@ async def cmd_premium(message: Message) -> None:
     Отправляет пользователю информацию о премиум-подписке.
     """
     logger.info("Команда /premium от пользователя: %s", format_user_for_log(message))
-    await message.answer(make_premium_message())
+    await message.answer(PREMIUM_TEXT)
 
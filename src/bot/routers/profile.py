@@ -10,7 +10,9 @@ from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from src.bot.utils.formatting import format_user_for_log, format_user_profile
+from src.bot.services.entitlements import TIER_FREE, Entitlements
+from src.bot.services.usage import UsageAccounting
+from src.bot.utils.formatting import format_usage, format_user_for_log, format_user_profile
 
 logger = logging.getLogger("bot")
 
@@ -18,12 +20,21 @@ router = Router()
 
 
 @router.message(Command("profile"))
-async def cmd_profile(message: Message) -> None:
+async def cmd_profile(
+    message: Message,
+    usage: UsageAccounting | None = None,
+    entitlements: Entitlements | None = None,
+) -> None:
     """
     Обработчик команды /profile.
 
-    Отправляет пользователю информацию о его профиле.
+    Отправляет пользователю информацию о его профиле и использовании LLM за сегодня.
     """
     logger.info("Команда /profile от пользователя: %s", format_user_for_log(message))
-    await message.answer(format_user_profile(message.from_user))
+    text = format_user_profile(message.from_user)
+    user = message.from_user
+    if user is not None and usage is not None:
+        tier = entitlements.tier(user.id) if entitlements is not None else TIER_FREE
+        text += "\n\n" + format_usage(await usage.usage(user.id), usage.limit_for(tier))
+    await message.answer(text)
 
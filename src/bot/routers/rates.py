@@ -0,0 +1,80 @@
+"""
+Роутер для команды /rates.
+
+Показывает, как менялся курс пары валют за последние дни:
+/rates — USD/RUB за неделю, /rates eur rub 30 — EUR/RUB за 30 дней.
+"""
+
+import asyncio
+import logging
+import time
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from src.bot.services.currency import ExchangeRateService
+from src.bot.services.currency_format import format_rate_history
+from src.bot.services.rate_history import RateHistoryStore
+from src.bot.utils.formatting import format_user_for_log
+
+logger = logging.getLogger("bot")
+
+router = Router()
+
+# Пара и окно по умолчанию, ограничение окна
+DEFAULT_HISTORY_PAIR = ("USD", "RUB")
+DEFAULT_HISTORY_DAYS = 7
+MAX_HISTORY_DAYS = 365
+SECONDS_PER_DAY = 60 * 60 * 24
+
+
+@router.message(Command("rates"))
+async def cmd_rates(
+    message: Message,
+    command: CommandObject,
+    currency_service: ExchangeRateService,
+    rate_history: RateHistoryStore | None,
+) -> None:
+    """
+    Обработчик команды /rates.
+
+    Аргументы (в любом порядке): до двух валют и число дней.
+    """
+    logger.info("Команда /rates от пользователя: %s", format_user_for_log(message))
+
+    if rate_history is None:
+        await message.answer("ℹ️ История курсов не ведётся на этом сервере.")
+        return
+
+    days = DEFAULT_HISTORY_DAYS
+    currencies: list[str] = []
+    for token in (command.args or "").split():
+        if token.isdigit():
+            days = min(max(int(token), 1), MAX_HISTORY_DAYS)
+            continue
+        matches = currency_service.catalog.search(token, limit=1)
+        if not matches:
+            await message.answer(f"❌ Не удалось распознать валюту «{token}».")
+            return
+        currencies.append(matches[0].code)
+
+    if len(currencies) > 2:
+        await message.answer("❌ Укажите не больше двух валют, например: /rates usd rub 7")
+        return
+    if len(currencies) == 1:
+        currencies.insert(0, DEFAULT_HISTORY_PAIR[0])
+    base_currency, target_currency = currencies or DEFAULT_HISTORY_PAIR
+
+    since = time.time() - days * SECONDS_PER_DAY
+    stats = await asyncio.to_thread(
+        rate_history.window_stats, base_currency, target_currency, since
+    )
+    if stats is None:
+        await message.answer(
+            f"ℹ️ Нет данных по паре {base_currency}/{target_currency} за {days} дн. "
+            "История пополняется при каждом обновлении курсов."
+        )
+        return
+
+    await message.answer(format_rate_history(stats, days))
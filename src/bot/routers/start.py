@@ -17,6 +17,8 @@ logger = logging.getLogger("bot")
 
 router = Router()
 
+START_TEXT = make_start_message()
+
 
 @router.message(CommandStart())
 async def cmd_start(message: Message) -> None:
@@ -26,5 +28,5 @@ async def cmd_start(message: Message) -> None:
     Отправляет пользователю приветственное сообщение с возможностью выбора нейросети.
     """
     logger.info("Команда /start от пользователя: %s", format_user_for_log(message))
-    await message.answer(make_start_message())
+    await message.answer(START_TEXT)
 
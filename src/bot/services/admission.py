@@ -0,0 +1,96 @@
+"""
+Контроль допуска запросов к LLM (load shedding).
+
+Когда провайдер отвечает медленно, ожидающие обработчики копятся без
+ограничения, и в итоге таймаут получают все. Контроллер оценивает ожидание
+нового запроса по очереди планировщика (LLMRequestScheduler) и скользящему
+среднему длительности запроса и сразу отказывает, если ожидание больше
+порога; порог Premium-пользователей выше. Предел одновременных запросов
+и порядок очереди держит планировщик.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+from src.bot.services.llm_scheduler import LLMRequestScheduler
+from src.bot.utils.metrics import MetricsRegistry
+
+DEFAULT_MAX_WAIT_SEC = 20.0
+# Во сколько раз дольше готов ждать Premium-пользователь
+PREMIUM_WAIT_FACTOR = 2.0
+# Оценка длительности запроса, пока замеров ещё нет
+INITIAL_LATENCY_SEC = 5.0
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class OverloadedError(Exception):
+    """Запрос отклонён: ожидание места превысило бы порог."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Перегрузка, повторить через {retry_after:.0f} с")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Допуск запросов к LLM: отказ при долгом ожидании, иначе место у планировщика.
+
+    Args:
+        scheduler: Планировщик мест для запросов к LLM
+        max_wait_seconds: Предел оценки ожидания, после которого новый запрос
+            отклоняется (math.inf — не отклонять)
+    """
+
+    def __init__(
+        self,
+        scheduler: LLMRequestScheduler,
+        max_wait_seconds: float = DEFAULT_MAX_WAIT_SEC,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._scheduler = scheduler
+        self._max_wait = max_wait_seconds
+        self._clock = clock
+        self._latency = INITIAL_LATENCY_SEC
+
+        metrics = metrics or MetricsRegistry()
+        self._rejected = metrics.counter("admission_rejected")
+        self._latency_gauge = metrics.gauge("admission_latency_ewma_seconds")
+        self._latency_gauge.set(self._latency)
+
+    def predicted_wait(self, tier: str = TIER_FREE) -> float:
+        """Оценка ожидания места для нового запроса, в секундах."""
+        capacity = self._scheduler.capacity_for(tier)
+        # Очередь продвигается на capacity запросов за одну среднюю длительность
+        excess = self._scheduler.in_flight + self._scheduler.waiting_ahead(tier) + 1 - capacity
+        return max(0.0, excess) / capacity * self._latency
+
+    @asynccontextmanager
+    async def slot(self, tier: str = TIER_FREE) -> AsyncIterator[None]:
+        """
+        Занимает место для запроса к LLM на время блока.
+
+        Raises:
+            OverloadedError: Ожидание места превысило бы порог
+        """
+        limit = self._max_wait * (PREMIUM_WAIT_FACTOR if tier == TIER_PREMIUM else 1)
+        wait = self.predicted_wait(tier)
+        if wait > limit:
+            self._rejected.inc()
+            raise OverloadedError(wait)
+
+        async with self._scheduler.slot(tier):
+            started_at = self._clock()
+            try:
+                yield
+            finally:
+                self._observe(self._clock() - started_at)
+
+    def _observe(self, seconds: float) -> None:
+        self._latency += LATENCY_EWMA_ALPHA * (seconds - self._latency)
+        self._latency_gauge.set(self._latency)
@@ -1,18 +1,30 @@
 """
 Сервис конвертации валют.
 
-Получает актуальные курсы валют и выполняет конвертацию.
+Получает актуальные курсы валют через цепочку провайдеров и выполняет конвертацию.
+Таблица курсов кэшируется в памяти и сохраняется снимком на диск,
+чтобы после перезапуска конвертация работала сразу и без сети;
+каждая обновлённая таблица дописывается в историю курсов.
 Не зависит от aiogram и Telegram API.
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Any
+import time
+from contextlib import suppress
+from dataclasses import dataclass
 
-import aiohttp
+from src.bot.services.currency_catalog import CurrencyCatalog
+from src.bot.services.rate_history import RateHistoryStore
+from src.bot.services.rate_providers import RateProvider, RateProviderError
+from src.bot.services.rate_snapshot import RateSnapshotStore
+from src.bot.services.rate_table import RateTable
 
 logger = logging.getLogger("bot")
 
-# Список поддерживаемых валют
+# Популярные валюты: показываются первыми в каталоге и доступны до загрузки курсов
 SUPPORTED_CURRENCIES = {
     "USD": "🇺🇸 Доллар США",
     "EUR": "🇪🇺 Евро",
@@ -26,151 +38,231 @@ SUPPORTED_CURRENCIES = {
     "TRY": "🇹🇷 Турецкая лира",
 }
 
-# Базовый URL для получения курсов валют (бесплатный API без ключа)
-# Используем open.er-api.com - более надежный бесплатный API
-EXCHANGE_RATE_API_URL = "https://open.er-api.com/v6/latest"
+# Валюта, относительно которой запрашивается и хранится таблица курсов
+RATES_BASE_CURRENCY = "USD"
 
+# Время, в течение которого таблица курсов считается свежей
+DEFAULT_RATES_TTL_SEC = 60 * 60
 
-async def get_exchange_rate(base_currency: str, target_currency: str) -> float | None:
-    """
-    Получает курс обмена между двумя валютами.
+# Минимальная пауза между фоновыми обновлениями (в том числе после ошибки)
+MIN_AUTO_REFRESH_DELAY_SEC = 60
+
+
+@dataclass(frozen=True)
+class ConversionResult:
+    """Результат конвертации суммы между двумя валютами."""
 
-    Args:
-        base_currency: Базовая валюта (например, "USD")
-        target_currency: Целевая валюта (например, "EUR")
+    amount: float
+    base_currency: str
+    target_currency: str
+    converted_amount: float
+    rate: float
+    rates_fetched_at: float  # Unix-время получения использованной таблицы
 
-    Returns:
-        Курс обмена (сколько единиц целевой валюты за 1 единицу базовой)
-        или None в случае ошибки
+
+class ExchangeRateService:
     """
-    if base_currency == target_currency:
-        return 1.0
-
-    if base_currency not in SUPPORTED_CURRENCIES:
-        logger.warning("Неподдерживаемая базовая валюта: %s", base_currency)
-        return None
-
-    if target_currency not in SUPPORTED_CURRENCIES:
-        logger.warning("Неподдерживаемая целевая валюта: %s", target_currency)
-        return None
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            # Получаем курсы относительно базовой валюты
-            # Формат URL: https://open.er-api.com/v6/latest/{BASE_CURRENCY}
-            url = f"{EXCHANGE_RATE_API_URL}/{base_currency}"
-            logger.info("Запрос курса валют: %s -> %s, URL: %s", base_currency, target_currency, url)
-            
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status != 200:
-                    response_text = await response.text()
-                    logger.error(
-                        "Ошибка при получении курса валют: статус %s, URL: %s, ответ: %s",
-                        response.status,
-                        url,
-                        response_text[:200],  # Первые 200 символов ответа
-                    )
-                    return None
-
-                data: dict[str, Any] = await response.json()
-                logger.info("Ответ API получен: result=%s, base_code=%s", 
-                           data.get("result"), data.get("base_code"))
-
-                # Проверяем результат API (формат: {"result": "success", "rates": {...}})
-                if data.get("result") != "success":
-                    error_msg = data.get("error", "Unknown error")
-                    logger.error("API вернул ошибку: %s, полный ответ: %s", error_msg, data)
-                    return None
-
-                # Получаем курсы валют
-                rates = data.get("rates")
-                
-                if not rates:
-                    logger.error("Не найдено поле rates в ответе API. Ответ: %s", data)
-                    return None
-
-                # Проверяем наличие целевой валюты в курсах
-                if target_currency not in rates:
-                    available_currencies = list(rates.keys())[:20]
-                    logger.error(
-                        "Валюта %s не найдена в ответе API. Доступные валюты (первые 20): %s",
-                        target_currency,
-                        ", ".join(available_currencies),
-                    )
-                    return None
-
-                rate = float(rates[target_currency])
-                
-                logger.info(
-                    "Получен курс: 1 %s = %.4f %s",
-                    base_currency,
-                    rate,
-                    target_currency,
-                )
-                return rate
-
-    except aiohttp.ClientError as e:
-        logger.error("Ошибка сети при получении курса валют: %s, тип: %s", 
-                    e, type(e).__name__, exc_info=True)
-        return None
-    except (ValueError, KeyError) as e:
-        logger.error("Ошибка парсинга ответа API: %s, тип: %s", e, type(e).__name__, exc_info=True)
-        return None
-    except Exception as e:
-        logger.error("Неожиданная ошибка при получении курса: %s, тип: %s", 
-                    e, type(e).__name__, exc_info=True)
-        return None
-
-
-async def convert_currency(
-    amount: float, base_currency: str, target_currency: str
-) -> tuple[float | None, float | None]:
+    Сервис курсов валют с кэшем в памяти и снимком на диске.
+
+    Пока таблица свежая, запросы обслуживаются из памяти. Устаревшая таблица
+    отдаётся сразу, а обновление запускается в фоне (stale-while-revalidate).
+    Если обновить курсы не удалось, продолжаем работать на последней таблице.
     """
-    Конвертирует сумму из одной валюты в другую.
 
-    Args:
-        amount: Сумма для конвертации
-        base_currency: Исходная валюта
-        target_currency: Целевая валюта
+    def __init__(
+        self,
+        provider: RateProvider,
+        snapshot_store: RateSnapshotStore | None = None,
+        ttl_seconds: float = DEFAULT_RATES_TTL_SEC,
+        history_store: RateHistoryStore | None = None,
+    ) -> None:
+        self._provider = provider
+        self._snapshot_store = snapshot_store
+        self._history_store = history_store
+        self._ttl_seconds = ttl_seconds
+        self._table: RateTable | None = None
+        self._catalog = CurrencyCatalog.from_codes(SUPPORTED_CURRENCIES, SUPPORTED_CURRENCIES)
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[RateTable | None] | None = None
+        self._auto_refresh_task: asyncio.Task[None] | None = None
 
-    Returns:
-        Кортеж (конвертированная сумма, курс обмена)
-        или (None, None) в случае ошибки
-    """
-    rate = await get_exchange_rate(base_currency, target_currency)
-    if rate is None:
-        return None, None
+    async def warm_up(self) -> None:
+        """Загружает снимок курсов с диска, чтобы первый запрос не ждал сеть."""
+        if self._snapshot_store is None:
+            return
+        table = await asyncio.to_thread(self._snapshot_store.load)
+        if table is None:
+            logger.info("Снимок курсов не найден, курсы будут загружены по запросу")
+            return
+        self._set_table(table)
+        logger.info(
+            "Загружен снимок курсов: %s валют, возраст %.0f с",
+            len(table.rates),
+            table.age_seconds(),
+        )
 
-    converted_amount = amount * rate
-    return converted_amount, rate
+    def peek_table(self) -> RateTable | None:
+        """Возвращает текущую таблицу из памяти без обращения к сети."""
+        return self._table
 
+    @property
+    def catalog(self) -> CurrencyCatalog:
+        """
+        Каталог валют из текущей таблицы курсов.
 
-def format_currency_result(
-    amount: float,
-    base_currency: str,
-    converted_amount: float,
-    target_currency: str,
-    rate: float,
-) -> str:
-    """
-    Форматирует результат конвертации валют для отправки пользователю.
+        До первой загрузки курсов содержит только популярные валюты.
+        Перестраивается лишь при изменении набора валют в таблице.
+        """
+        return self._catalog
 
-    Args:
-        amount: Исходная сумма
-        base_currency: Исходная валюта
-        converted_amount: Конвертированная сумма
-        target_currency: Целевая валюта
-        rate: Курс обмена
+    async def get_table(self) -> RateTable | None:
+        """
+        Возвращает таблицу курсов.
 
-    Returns:
-        Отформатированное сообщение
-    """
-    base_name = SUPPORTED_CURRENCIES.get(base_currency, base_currency)
-    target_name = SUPPORTED_CURRENCIES.get(target_currency, target_currency)
-
-    return (
-        f"💱 Конвертация валют\n\n"
-        f"📊 {amount:,.2f} {base_currency} ({base_name})\n"
-        f"➡️ {converted_amount:,.2f} {target_currency} ({target_name})\n\n"
-        f"📈 Курс: 1 {base_currency} = {rate:.4f} {target_currency}"
-    )
+        Свежая таблица отдаётся из памяти; устаревшая — тоже из памяти,
+        но с фоновым обновлением. Сетевой запрос ожидается только если
+        таблицы ещё нет совсем.
+        """
+        table = self._table
+        if table is not None:
+            if table.age_seconds() >= self._ttl_seconds:
+                self._schedule_refresh()
+            return table
+        return await self.refresh()
+
+    async def refresh(self) -> RateTable | None:
+        """
+        Загружает таблицу курсов из API, сохраняет снимок и дописывает историю.
+
+        Параллельные вызовы объединяются: в сеть уходит один запрос.
+        При ошибке возвращает последнюю известную таблицу (или None).
+        """
+        started_at = time.time()
+        async with self._refresh_lock:
+            current = self._table
+            if current is not None and current.fetched_at >= started_at:
+                # Таблицу уже обновил параллельный вызов
+                return current
+
+            table = await self._fetch_table()
+            if table is None:
+                return current
+
+            self._set_table(table)
+            if self._snapshot_store is not None:
+                await asyncio.to_thread(self._snapshot_store.save, table)
+            if self._history_store is not None:
+                await asyncio.to_thread(self._history_store.append, table)
+            return table
+
+    async def get_exchange_rate(
+        self, base_currency: str, target_currency: str
+    ) -> float | None:
+        """
+        Возвращает курс обмена (сколько единиц целевой валюты за 1 единицу базовой)
+        или None, если курс получить не удалось.
+        """
+        result = await self.convert(1.0, base_currency, target_currency)
+        return result.rate if result is not None else None
+
+    async def convert(
+        self, amount: float, base_currency: str, target_currency: str
+    ) -> ConversionResult | None:
+        """
+        Конвертирует сумму из одной валюты в другую.
+
+        Returns:
+            Результат конвертации или None, если валюта не поддерживается
+            или курсы недоступны.
+        """
+        table = await self.get_table()
+        if table is None:
+            return None
+        return self._convert_with_table(table, amount, base_currency, target_currency)
+
+    def convert_cached(
+        self, amount: float, base_currency: str, target_currency: str
+    ) -> ConversionResult | None:
+        """
+        Конвертирует сумму только по таблице из памяти, без обращений к сети.
+
+        Подходит для горячих путей (inline-запросы), где ожидание внешнего
+        API недопустимо. Возвращает None, если курсов в памяти ещё нет.
+        """
+        table = self._table
+        if table is None:
+            return None
+        return self._convert_with_table(table, amount, base_currency, target_currency)
+
+    def start_auto_refresh(self) -> None:
+        """
+        Запускает фоновое обновление курсов по истечении TTL.
+
+        Так таблица в памяти остаётся свежей без обновлений на пути запроса.
+        """
+        if self._auto_refresh_task is not None and not self._auto_refresh_task.done():
+            return
+        self._auto_refresh_task = asyncio.create_task(self._auto_refresh_loop())
+
+    async def aclose(self) -> None:
+        """Останавливает фоновые обновления и закрывает провайдеров."""
+        for task in (self._auto_refresh_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        await self._provider.aclose()
+
+    def _convert_with_table(
+        self, table: RateTable, amount: float, base_currency: str, target_currency: str
+    ) -> ConversionResult | None:
+        rate = table.cross_rate(base_currency, target_currency)
+        if rate is None:
+            logger.warning(
+                "Неподдерживаемая пара валют: %s -> %s",
+                base_currency,
+                target_currency,
+            )
+            return None
+
+        return ConversionResult(
+            amount=amount,
+            base_currency=base_currency,
+            target_currency=target_currency,
+            converted_amount=amount * rate,
+            rate=rate,
+            rates_fetched_at=table.fetched_at,
+        )
+
+    async def _auto_refresh_loop(self) -> None:
+        while True:
+            table = self._table
+            delay = 0.0 if table is None else self._ttl_seconds - table.age_seconds()
+            # После неудачного обновления не долбим провайдеров в цикле
+            await asyncio.sleep(max(delay, MIN_AUTO_REFRESH_DELAY_SEC))
+            await self.refresh()
+
+    def _set_table(self, table: RateTable) -> None:
+        self._table = table
+        if len(self._catalog) != len(table.rates) or any(
+            code not in self._catalog for code in table.rates
+        ):
+            self._catalog = CurrencyCatalog.from_codes(table.rates, SUPPORTED_CURRENCIES)
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def _fetch_table(self) -> RateTable | None:
+        try:
+            table = await self._provider.fetch_table(RATES_BASE_CURRENCY)
+        except RateProviderError as e:
+            logger.error("Не удалось обновить курсы валют: %s", e)
+            return None
+        logger.info(
+            "Таблица курсов обновлена: %s валют, провайдер %s",
+            len(table.rates),
+            self._provider.name,
+        )
+        return table
@@ -0,0 +1,148 @@
+"""
+Каталог валют с поиском по префиксам.
+
+Каталог строится по кодам из таблицы курсов и справочнику названий.
+Поиск идёт по префиксному индексу (код, русское и английское название),
+поэтому запрос "евр" или "eu" обслуживается словарным обращением
+без перебора всех валют. Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from src.bot.services.currency_names import CURRENCY_NAMES
+
+# Сколько результатов поиска возвращать по умолчанию
+DEFAULT_SEARCH_LIMIT = 8
+
+# Слова запроса и названий: буквы и цифры
+TOKEN_PATTERN = re.compile(r"[0-9a-zа-я]+")
+
+
+def normalize_search_text(text: str) -> str:
+    """Приводит текст к виду для поиска: нижний регистр, "ё" -> "е"."""
+    return text.lower().replace("ё", "е")
+
+
+def _tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(normalize_search_text(text))
+
+
+@dataclass(frozen=True)
+class CurrencyInfo:
+    """Описание валюты в каталоге."""
+
+    code: str
+    name_ru: str
+    name_en: str
+    label: str  # Подпись для пользователя (с флагом для популярных валют)
+
+
+class CurrencyCatalog:
+    """
+    Неизменяемый каталог валют с префиксным индексом.
+
+    Порядок валют: сначала популярные (в заданном порядке), затем
+    остальные по алфавиту кода. Результаты поиска идут в том же порядке,
+    точное совпадение по коду — первым.
+    """
+
+    def __init__(self, currencies: Iterable[CurrencyInfo]) -> None:
+        self._items: tuple[CurrencyInfo, ...] = tuple(currencies)
+        self._by_code: dict[str, CurrencyInfo] = {c.code: c for c in self._items}
+        self._prefix_index: dict[str, tuple[int, ...]] = self._build_index(self._items)
+
+    @classmethod
+    def from_codes(
+        cls, codes: Iterable[str], popular: Mapping[str, str]
+    ) -> "CurrencyCatalog":
+        """
+        Строит каталог по набору кодов.
+
+        Args:
+            codes: Коды валют (обычно ключи таблицы курсов)
+            popular: Популярные валюты {код: подпись}, идут первыми
+        """
+        available = set(codes)
+        ordered = [code for code in popular if code in available]
+        ordered += sorted(available.difference(popular))
+
+        currencies = []
+        for code in ordered:
+            name_ru, name_en = CURRENCY_NAMES.get(code, (code, code))
+            currencies.append(
+                CurrencyInfo(
+                    code=code,
+                    name_ru=name_ru,
+                    name_en=name_en,
+                    label=popular.get(code, name_ru),
+                )
+            )
+        return cls(currencies)
+
+    @property
+    def items(self) -> tuple[CurrencyInfo, ...]:
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._by_code
+
+    def get(self, code: str) -> CurrencyInfo | None:
+        return self._by_code.get(code)
+
+    def label(self, code: str) -> str:
+        """Возвращает подпись валюты или сам код, если валюты нет в каталоге."""
+        info = self._by_code.get(code)
+        return info.label if info is not None else code
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list[CurrencyInfo]:
+        """
+        Ищет валюты по префиксам слов запроса.
+
+        Каждое слово запроса должно быть префиксом кода или слова названия.
+        Например, "евр" найдёт EUR, "us dol" — USD.
+        """
+        words = _tokenize(query)
+        if not words or limit <= 0:
+            return []
+
+        postings = [self._prefix_index.get(word, ()) for word in words]
+        postings.sort(key=len)
+        if not postings[0]:
+            return []
+
+        candidates = postings[0]
+        if len(postings) > 1:
+            others = [frozenset(p) for p in postings[1:]]
+            candidates = tuple(i for i in candidates if all(i in o for o in others))
+
+        exact = self._by_code.get(query.strip().upper())
+        results: list[CurrencyInfo] = [exact] if exact is not None else []
+        for position in candidates:
+            if len(results) >= limit:
+                break
+            info = self._items[position]
+            if info is not exact:
+                results.append(info)
+        return results
+
+    @staticmethod
+    def _build_index(items: tuple[CurrencyInfo, ...]) -> dict[str, tuple[int, ...]]:
+        index: dict[str, list[int]] = {}
+        for position, info in enumerate(items):
+            tokens = set(_tokenize(info.code))
+            tokens.update(_tokenize(info.name_ru))
+            tokens.update(_tokenize(info.name_en))
+            for token in tokens:
+                for end in range(1, len(token) + 1):
+                    posting = index.setdefault(token[:end], [])
+                    # Позиции добавляются по возрастанию, дубликаты идут подряд
+                    if not posting or posting[-1] != position:
+                        posting.append(position)
+        return {prefix: tuple(posting) for prefix, posting in index.items()}
@@ -0,0 +1,91 @@
+"""
+Форматирование результатов конвертации валют для пользователя.
+
+Не зависит от aiogram и Telegram API.
+"""
+
+from src.bot.services.currency import SUPPORTED_CURRENCIES
+from src.bot.services.rate_history import RateWindowStats
+
+
+def format_rates_age(age_seconds: float) -> str:
+    """
+    Форматирует возраст курсов в человекочитаемый вид.
+
+    Например: "только что", "15 мин назад", "3 ч назад", "2 дн назад".
+    """
+    minutes = int(age_seconds // 60)
+    if minutes < 1:
+        return "только что"
+    if minutes < 60:
+        return f"{minutes} мин назад"
+    hours = minutes // 60
+    if hours < 24:
+        return f"{hours} ч назад"
+    return f"{hours // 24} дн назад"
+
+
+def format_currency_result(
+    amount: float,
+    base_currency: str,
+    converted_amount: float,
+    target_currency: str,
+    rate: float,
+    rates_age_seconds: float | None = None,
+    base_name: str | None = None,
+    target_name: str | None = None,
+) -> str:
+    """
+    Форматирует результат конвертации валют для отправки пользователю.
+
+    Args:
+        amount: Исходная сумма
+        base_currency: Исходная валюта
+        converted_amount: Конвертированная сумма
+        target_currency: Целевая валюта
+        rate: Курс обмена
+        rates_age_seconds: Возраст использованных курсов (если известен)
+        base_name: Подпись исходной валюты (по умолчанию из SUPPORTED_CURRENCIES)
+        target_name: Подпись целевой валюты (по умолчанию из SUPPORTED_CURRENCIES)
+
+    Returns:
+        Отформатированное сообщение
+    """
+    if base_name is None:
+        base_name = SUPPORTED_CURRENCIES.get(base_currency, base_currency)
+    if target_name is None:
+        target_name = SUPPORTED_CURRENCIES.get(target_currency, target_currency)
+
+    text = (
+        f"💱 Конвертация валют\n\n"
+        f"📊 {amount:,.2f} {base_currency} ({base_name})\n"
+        f"➡️ {converted_amount:,.2f} {target_currency} ({target_name})\n\n"
+        f"📈 Курс: 1 {base_currency} = {rate:.4f} {target_currency}"
+    )
+    if rates_age_seconds is not None:
+        text += f"\n🕒 Курсы обновлены: {format_rates_age(rates_age_seconds)}"
+    return text
+
+
+def format_rate_history(stats: RateWindowStats, days: int) -> str:
+    """
+    Форматирует статистику курса пары за период для отправки пользователю.
+
+    Args:
+        stats: Статистика курса за окно
+        days: Длина окна в днях (как её запросил пользователь)
+
+    Returns:
+        Отформатированное сообщение
+    """
+    pair = f"{stats.base_currency}/{stats.target_currency}"
+    trend = "📈" if stats.change >= 0 else "📉"
+    return (
+        f"📊 Курс {pair} за {days} дн.\n\n"
+        f"Начало: {stats.first_rate:.4f}\n"
+        f"Сейчас: {stats.last_rate:.4f}\n"
+        f"Минимум: {stats.min_rate:.4f}\n"
+        f"Максимум: {stats.max_rate:.4f}\n"
+        f"{trend} Изменение: {stats.change:+.4f} ({stats.change_percent:+.2f}%)\n\n"
+        f"Точек в истории: {stats.points}"
+    )
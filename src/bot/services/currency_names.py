@@ -0,0 +1,172 @@
+"""
+Справочник названий валют (ISO 4217) на русском и английском.
+
+Декларативная таблица для каталога валют: код -> (русское название, английское название).
+Валюты, которых нет в справочнике, показываются по коду.
+"""
+
+CURRENCY_NAMES: dict[str, tuple[str, str]] = {
+    "AED": ("Дирхам ОАЭ", "UAE Dirham"),
+    "AFN": ("Афганский афгани", "Afghan Afghani"),
+    "ALL": ("Албанский лек", "Albanian Lek"),
+    "AMD": ("Армянский драм", "Armenian Dram"),
+    "ANG": ("Антильский гульден", "Netherlands Antillean Guilder"),
+    "AOA": ("Ангольская кванза", "Angolan Kwanza"),
+    "ARS": ("Аргентинское песо", "Argentine Peso"),
+    "AUD": ("Австралийский доллар", "Australian Dollar"),
+    "AWG": ("Арубанский флорин", "Aruban Florin"),
+    "AZN": ("Азербайджанский манат", "Azerbaijani Manat"),
+    "BAM": ("Конвертируемая марка", "Bosnia-Herzegovina Convertible Mark"),
+    "BBD": ("Барбадосский доллар", "Barbadian Dollar"),
+    "BDT": ("Бангладешская така", "Bangladeshi Taka"),
+    "BGN": ("Болгарский лев", "Bulgarian Lev"),
+    "BHD": ("Бахрейнский динар", "Bahraini Dinar"),
+    "BIF": ("Бурундийский франк", "Burundian Franc"),
+    "BMD": ("Бермудский доллар", "Bermudan Dollar"),
+    "BND": ("Брунейский доллар", "Brunei Dollar"),
+    "BOB": ("Боливийский боливиано", "Bolivian Boliviano"),
+    "BRL": ("Бразильский реал", "Brazilian Real"),
+    "BSD": ("Багамский доллар", "Bahamian Dollar"),
+    "BTN": ("Бутанский нгултрум", "Bhutanese Ngultrum"),
+    "BWP": ("Ботсванская пула", "Botswanan Pula"),
+    "BYN": ("Белорусский рубль", "Belarusian Ruble"),
+    "BZD": ("Белизский доллар", "Belize Dollar"),
+    "CAD": ("Канадский доллар", "Canadian Dollar"),
+    "CDF": ("Конголезский франк", "Congolese Franc"),
+    "CHF": ("Швейцарский франк", "Swiss Franc"),
+    "CLP": ("Чилийское песо", "Chilean Peso"),
+    "CNY": ("Китайский юань", "Chinese Yuan"),
+    "COP": ("Колумбийское песо", "Colombian Peso"),
+    "CRC": ("Костариканский колон", "Costa Rican Colon"),
+    "CUP": ("Кубинское песо", "Cuban Peso"),
+    "CVE": ("Эскудо Кабо-Верде", "Cape Verdean Escudo"),
+    "CZK": ("Чешская крона", "Czech Koruna"),
+    "DJF": ("Франк Джибути", "Djiboutian Franc"),
+    "DKK": ("Датская крона", "Danish Krone"),
+    "DOP": ("Доминиканское песо", "Dominican Peso"),
+    "DZD": ("Алжирский динар", "Algerian Dinar"),
+    "EGP": ("Египетский фунт", "Egyptian Pound"),
+    "ERN": ("Эритрейская накфа", "Eritrean Nakfa"),
+    "ETB": ("Эфиопский быр", "Ethiopian Birr"),
+    "EUR": ("Евро", "Euro"),
+    "FJD": ("Доллар Фиджи", "Fijian Dollar"),
+    "FKP": ("Фунт Фолклендских островов", "Falkland Islands Pound"),
+    "FOK": ("Фарерская крона", "Faroese Krona"),
+    "GBP": ("Фунт стерлингов", "British Pound"),
+    "GEL": ("Грузинский лари", "Georgian Lari"),
+    "GGP": ("Гернсийский фунт", "Guernsey Pound"),
+    "GHS": ("Ганский седи", "Ghanaian Cedi"),
+    "GIP": ("Гибралтарский фунт", "Gibraltar Pound"),
+    "GMD": ("Гамбийский даласи", "Gambian Dalasi"),
+    "GNF": ("Гвинейский франк", "Guinean Franc"),
+    "GTQ": ("Гватемальский кетсаль", "Guatemalan Quetzal"),
+    "GYD": ("Гайанский доллар", "Guyanaese Dollar"),
+    "HKD": ("Гонконгский доллар", "Hong Kong Dollar"),
+    "HNL": ("Гондурасская лемпира", "Honduran Lempira"),
+    "HRK": ("Хорватская куна", "Croatian Kuna"),
+    "HTG": ("Гаитянский гурд", "Haitian Gourde"),
+    "HUF": ("Венгерский форинт", "Hungarian Forint"),
+    "IDR": ("Индонезийская рупия", "Indonesian Rupiah"),
+    "ILS": ("Израильский шекель", "Israeli New Shekel"),
+    "IMP": ("Фунт острова Мэн", "Manx Pound"),
+    "INR": ("Индийская рупия", "Indian Rupee"),
+    "IQD": ("Иракский динар", "Iraqi Dinar"),
+    "IRR": ("Иранский риал", "Iranian Rial"),
+    "ISK": ("Исландская крона", "Icelandic Krona"),
+    "JEP": ("Джерсийский фунт", "Jersey Pound"),
+    "JMD": ("Ямайский доллар", "Jamaican Dollar"),
+    "JOD": ("Иорданский динар", "Jordanian Dinar"),
+    "JPY": ("Японская йена", "Japanese Yen"),
+    "KES": ("Кенийский шиллинг", "Kenyan Shilling"),
+    "KGS": ("Киргизский сом", "Kyrgystani Som"),
+    "KHR": ("Камбоджийский риель", "Cambodian Riel"),
+    "KID": ("Доллар Кирибати", "Kiribati Dollar"),
+    "KMF": ("Коморский франк", "Comorian Franc"),
+    "KRW": ("Южнокорейская вона", "South Korean Won"),
+    "KWD": ("Кувейтский динар", "Kuwaiti Dinar"),
+    "KYD": ("Доллар Каймановых островов", "Cayman Islands Dollar"),
+    "KZT": ("Казахстанский тенге", "Kazakhstani Tenge"),
+    "LAK": ("Лаосский кип", "Laotian Kip"),
+    "LBP": ("Ливанский фунт", "Lebanese Pound"),
+    "LKR": ("Шри-ланкийская рупия", "Sri Lankan Rupee"),
+    "LRD": ("Либерийский доллар", "Liberian Dollar"),
+    "LSL": ("Лоти Лесото", "Lesotho Loti"),
+    "LYD": ("Ливийский динар", "Libyan Dinar"),
+    "MAD": ("Марокканский дирхам", "Moroccan Dirham"),
+    "MDL": ("Молдавский лей", "Moldovan Leu"),
+    "MGA": ("Малагасийский ариари", "Malagasy Ariary"),
+    "MKD": ("Македонский денар", "Macedonian Denar"),
+    "MMK": ("Мьянманский кьят", "Myanmar Kyat"),
+    "MNT": ("Монгольский тугрик", "Mongolian Tugrik"),
+    "MOP": ("Патака Макао", "Macanese Pataca"),
+    "MRU": ("Мавританская угия", "Mauritanian Ouguiya"),
+    "MUR": ("Маврикийская рупия", "Mauritian Rupee"),
+    "MVR": ("Мальдивская руфия", "Maldivian Rufiyaa"),
+    "MWK": ("Малавийская квача", "Malawian Kwacha"),
+    "MXN": ("Мексиканское песо", "Mexican Peso"),
+    "MYR": ("Малайзийский ринггит", "Malaysian Ringgit"),
+    "MZN": ("Мозамбикский метикал", "Mozambican Metical"),
+    "NAD": ("Намибийский доллар", "Namibian Dollar"),
+    "NGN": ("Нигерийская найра", "Nigerian Naira"),
+    "NIO": ("Никарагуанская кордоба", "Nicaraguan Cordoba"),
+    "NOK": ("Норвежская крона", "Norwegian Krone"),
+    "NPR": ("Непальская рупия", "Nepalese Rupee"),
+    "NZD": ("Новозеландский доллар", "New Zealand Dollar"),
+    "OMR": ("Оманский риал", "Omani Rial"),
+    "PAB": ("Панамский бальбоа", "Panamanian Balboa"),
+    "PEN": ("Перуанский соль", "Peruvian Sol"),
+    "PGK": ("Кина Папуа — Новой Гвинеи", "Papua New Guinean Kina"),
+    "PHP": ("Филиппинское песо", "Philippine Peso"),
+    "PKR": ("Пакистанская рупия", "Pakistani Rupee"),
+    "PLN": ("Польский злотый", "Polish Zloty"),
+    "PYG": ("Парагвайский гуарани", "Paraguayan Guarani"),
+    "QAR": ("Катарский риал", "Qatari Riyal"),
+    "RON": ("Румынский лей", "Romanian Leu"),
+    "RSD": ("Сербский динар", "Serbian Dinar"),
+    "RUB": ("Российский рубль", "Russian Ruble"),
+    "RWF": ("Франк Руанды", "Rwandan Franc"),
+    "SAR": ("Саудовский риял", "Saudi Riyal"),
+    "SBD": ("Доллар Соломоновых островов", "Solomon Islands Dollar"),
+    "SCR": ("Сейшельская рупия", "Seychellois Rupee"),
+    "SDG": ("Суданский фунт", "Sudanese Pound"),
+    "SEK": ("Шведская крона", "Swedish Krona"),
+    "SGD": ("Сингапурский доллар", "Singapore Dollar"),
+    "SHP": ("Фунт Святой Елены", "Saint Helena Pound"),
+    "SLE": ("Сьерра-леонский леоне", "Sierra Leonean Leone"),
+    "SLL": ("Сьерра-леонский леоне (старый)", "Sierra Leonean Leone (old)"),
+    "SOS": ("Сомалийский шиллинг", "Somali Shilling"),
+    "SRD": ("Суринамский доллар", "Surinamese Dollar"),
+    "SSP": ("Южносуданский фунт", "South Sudanese Pound"),
+    "STN": ("Добра Сан-Томе и Принсипи", "Sao Tome and Principe Dobra"),
+    "SYP": ("Сирийский фунт", "Syrian Pound"),
+    "SZL": ("Свазилендский лилангени", "Swazi Lilangeni"),
+    "THB": ("Тайский бат", "Thai Baht"),
+    "TJS": ("Таджикский сомони", "Tajikistani Somoni"),
+    "TMT": ("Туркменский манат", "Turkmenistani Manat"),
+    "TND": ("Тунисский динар", "Tunisian Dinar"),
+    "TOP": ("Тонганская паанга", "Tongan Paanga"),
+    "TRY": ("Турецкая лира", "Turkish Lira"),
+    "TTD": ("Доллар Тринидада и Тобаго", "Trinidad and Tobago Dollar"),
+    "TVD": ("Доллар Тувалу", "Tuvaluan Dollar"),
+    "TWD": ("Новый тайваньский доллар", "New Taiwan Dollar"),
+    "TZS": ("Танзанийский шиллинг", "Tanzanian Shilling"),
+    "UAH": ("Украинская гривна", "Ukrainian Hryvnia"),
+    "UGX": ("Угандийский шиллинг", "Ugandan Shilling"),
+    "USD": ("Доллар США", "US Dollar"),
+    "UYU": ("Уругвайское песо", "Uruguayan Peso"),
+    "UZS": ("Узбекский сум", "Uzbekistani Som"),
+    "VES": ("Венесуэльский боливар", "Venezuelan Bolivar"),
+    "VND": ("Вьетнамский донг", "Vietnamese Dong"),
+    "VUV": ("Вату Вануату", "Vanuatu Vatu"),
+    "WST": ("Самоанская тала", "Samoan Tala"),
+    "XAF": ("Франк КФА BEAC", "Central African CFA Franc"),
+    "XCD": ("Восточнокарибский доллар", "East Caribbean Dollar"),
+    "XCG": ("Карибский гульден", "Caribbean Guilder"),
+    "XDR": ("Специальные права заимствования", "Special Drawing Rights"),
+    "XOF": ("Франк КФА BCEAO", "West African CFA Franc"),
+    "XPF": ("Франк КФП", "CFP Franc"),
+    "YER": ("Йеменский риал", "Yemeni Rial"),
+    "ZAR": ("Южноафриканский рэнд", "South African Rand"),
+    "ZMW": ("Замбийская квача", "Zambian Kwacha"),
+    "ZWL": ("Доллар Зимбабве", "Zimbabwean Dollar"),
+}
@@ -0,0 +1,78 @@
+"""
+Разбор текстовых запросов на конвертацию валют.
+
+Понимает запросы вида "100 usd eur", "100usd в rub", "евро 50".
+Валюты распознаются по каталогу (код или префикс названия).
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Sequence
+
+from src.bot.services.currency_catalog import CurrencyCatalog, normalize_search_text
+
+# Целевые валюты, если в запросе указана только исходная
+DEFAULT_QUERY_TARGETS: tuple[str, ...] = ("USD", "EUR", "RUB", "CNY", "GBP")
+
+# Служебные слова между валютами: "100 usd в eur", "100 usd to eur"
+CONNECTOR_WORDS = frozenset({"в", "во", "на", "to", "in", "into", "->", "="})
+
+NUMBER_PATTERN = re.compile(r"^\d+(?:[.,]\d+)?$")
+# Отделяем число от приклеенного кода: "100usd" -> "100 usd"
+GLUED_AMOUNT_PATTERN = re.compile(r"(\d)([^\d\s.,])")
+
+
+@dataclass(frozen=True)
+class ConversionQuery:
+    """Разобранный запрос на конвертацию."""
+
+    amount: float
+    base_currency: str
+    target_currencies: tuple[str, ...]
+
+
+def parse_conversion_query(
+    text: str,
+    catalog: CurrencyCatalog,
+    default_targets: Sequence[str] = DEFAULT_QUERY_TARGETS,
+) -> ConversionQuery | None:
+    """
+    Разбирает запрос на конвертацию.
+
+    Сумма необязательна (по умолчанию 1). Первая распознанная валюта —
+    исходная, остальные — целевые; если целевых нет, берутся default_targets.
+    Возвращает None, если исходную валюту распознать не удалось.
+    """
+    normalized = GLUED_AMOUNT_PATTERN.sub(r"\1 \2", normalize_search_text(text))
+
+    amount: float | None = None
+    currencies: list[str] = []
+    for token in normalized.split():
+        if amount is None and NUMBER_PATTERN.match(token):
+            amount = float(token.replace(",", "."))
+            continue
+        if token in CONNECTOR_WORDS:
+            continue
+        matches = catalog.search(token, limit=1)
+        if matches and matches[0].code not in currencies:
+            currencies.append(matches[0].code)
+
+    if not currencies:
+        return None
+    if amount is None:
+        amount = 1.0
+    if amount <= 0:
+        return None
+
+    base_currency = currencies[0]
+    targets = tuple(currencies[1:]) or tuple(
+        code for code in default_targets if code != base_currency and code in catalog
+    )
+    return ConversionQuery(
+        amount=amount,
+        base_currency=base_currency,
+        target_currencies=targets,
+    )
@@ -0,0 +1,116 @@
+"""
+Склейка серии быстрых сообщений пользователя в одну реплику.
+
+Пользователи часто пишут мысль тремя-четырьмя сообщениями подряд; без склейки
+каждое уходит в LLM отдельным запросом с неполным контекстом. Первое сообщение
+серии ждёт окно тишины; каждое новое сообщение продлевает ожидание и
+присоединяется к серии. Окно подстраивается под привычную паузу пользователя
+между частями сообщения. Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable
+
+from src.bot.utils.metrics import MetricsRegistry
+
+# Окно подбирается как пауза пользователя, умноженная на этот коэффициент
+GAP_WINDOW_FACTOR = 2.0
+# Вес нового замера паузы в скользящем среднем
+GAP_EWMA_ALPHA = 0.3
+# Сколько пользователей помнить для адаптивного окна (вытесняются давние)
+GAP_STATS_LIMIT = 10_000
+
+
+@dataclass
+class _Burst:
+    texts: list[str]
+    started_at: float
+    last_at: float
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class MessageDebouncer:
+    """
+    Собирает сообщения одного ключа (пользователя) в серии.
+
+    Args:
+        window_seconds: Базовое окно тишины, после которого серия отправляется
+        max_window_seconds: Предел ожидания с первого сообщения серии
+        max_messages: Сколько сообщений склеивать максимум
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        max_window_seconds: float,
+        max_messages: int,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self._window = window_seconds
+        self._min_window = window_seconds / 2
+        self._max_window = max(max_window_seconds, window_seconds)
+        self._max_messages = max(1, max_messages)
+        self._bursts: dict[Hashable, _Burst] = {}
+        self._gaps: OrderedDict[Hashable, float] = OrderedDict()
+        metrics = metrics or MetricsRegistry()
+        self._burst_count = metrics.counter("chat_bursts")
+        self._merged_count = metrics.counter("chat_messages_merged")
+        self._wait = metrics.timing("chat_debounce_wait_seconds")
+
+    async def submit(self, key: Hashable, text: str) -> list[str] | None:
+        """
+        Добавляет сообщение в серию.
+
+        Возвращает тексты серии тому вызову, который её начал (после окна
+        тишины), и None для сообщений, присоединённых к уже идущей серии.
+        """
+        now = time.monotonic()
+        burst = self._bursts.get(key)
+        if burst is not None:
+            self._observe_gap(key, now - burst.last_at)
+            burst.texts.append(text)
+            burst.last_at = now
+            burst.wakeup.set()
+            self._merged_count.inc()
+            return None
+
+        burst = self._bursts[key] = _Burst(texts=[text], started_at=now, last_at=now)
+        try:
+            while len(burst.texts) < self._max_messages:
+                timeout = min(
+                    self.window_for(key),
+                    burst.started_at + self._max_window - time.monotonic(),
+                )
+                if timeout <= 0:
+                    break
+                burst.wakeup.clear()
+                try:
+                    await asyncio.wait_for(burst.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+        finally:
+            del self._bursts[key]
+
+        self._burst_count.inc()
+        self._wait.observe(time.monotonic() - burst.started_at)
+        return burst.texts
+
+    def window_for(self, key: Hashable) -> float:
+        """Окно тишины для ключа с учётом его привычной паузы между сообщениями."""
+        gap = self._gaps.get(key)
+        if gap is None:
+            return self._window
+        return min(max(gap * GAP_WINDOW_FACTOR, self._min_window), self._max_window)
+
+    def _observe_gap(self, key: Hashable, gap: float) -> None:
+        previous = self._gaps.pop(key, None)
+        self._gaps[key] = (
+            gap if previous is None else previous + GAP_EWMA_ALPHA * (gap - previous)
+        )
+        if len(self._gaps) > GAP_STATS_LIMIT:
+            self._gaps.popitem(last=False)
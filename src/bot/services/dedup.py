@@ -0,0 +1,119 @@
+"""
+Отсев повторно доставленных апдейтов Telegram по update_id.
+
+Один и тот же апдейт может прийти дважды: Telegram повторяет webhook,
+если не дождался ответа, polling после перезапуска забирает уже
+обработанные апдейты, при выкладке старый и новый процесс работают вместе.
+Повтор означает второй запрос к LLM и задвоенную историю.
+
+RecentUpdates помнит последние N update_id в кольцевом буфере и множестве:
+проверка и запись — O(1), память ограничена. При нескольких репликах
+апдейт дополнительно "занимается" в Redis через SET NX с TTL.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger("bot")
+
+# Сколько последних update_id помнить в памяти процесса
+DEFAULT_DEDUP_WINDOW = 10_000
+# Сколько Redis помнит обработанный update_id (Telegram хранит апдейты до суток)
+DEFAULT_DEDUP_TTL_SEC = 60 * 60 * 24
+
+
+class RecentUpdates:
+    """Скользящее окно последних update_id фиксированного размера."""
+
+    def __init__(self, window: int = DEFAULT_DEDUP_WINDOW) -> None:
+        if window <= 0:
+            raise ValueError("Размер окна должен быть положительным")
+        self._ring = array("q", [-1]) * window
+        self._seen: set[int] = set()
+        self._position = 0
+
+    def add(self, update_id: int) -> bool:
+        """Запоминает update_id. Возвращает False, если он уже был в окне."""
+        if update_id in self._seen:
+            return False
+        evicted = self._ring[self._position]
+        if evicted >= 0:
+            self._seen.discard(evicted)
+        self._ring[self._position] = update_id
+        self._position = (self._position + 1) % len(self._ring)
+        self._seen.add(update_id)
+        return True
+
+    def __contains__(self, update_id: int) -> bool:
+        return update_id in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class UpdateDeduplicator:
+    """
+    Решает, обрабатывать ли апдейт: первым его видит только один процесс.
+
+    Redis необязателен; при его недоступности апдейт пропускается дальше
+    (лучше редкий повтор, чем потерянное сообщение).
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_DEDUP_WINDOW,
+        redis: Redis | None = None,
+        ttl_seconds: int = DEFAULT_DEDUP_TTL_SEC,
+        key_prefix: str = "upd:",
+    ) -> None:
+        self._window = window
+        # update_id нумеруются у каждого бота отдельно
+        self._recent: dict[int, RecentUpdates] = {}
+        self._redis = redis
+        self._ttl = ttl_seconds
+        self._key_prefix = key_prefix
+
+    async def is_duplicate(self, bot_id: int, update_id: int) -> bool:
+        recent = self._recent.get(bot_id)
+        if recent is None:
+            recent = self._recent[bot_id] = RecentUpdates(self._window)
+        if not recent.add(update_id):
+            return True
+        if self._redis is None:
+            return False
+        try:
+            claimed = await self._redis.set(
+                f"{self._key_prefix}{bot_id}:{update_id}", 1, nx=True, ex=self._ttl
+            )
+        except Exception as e:
+            logger.warning("Redis недоступен для отсева повторных апдейтов: %s", e)
+            return False
+        return not claimed
+
+    async def aclose(self) -> None:
+        if self._redis is not None:
+            # В redis-py до 5.0.1 метод назывался close
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+
+
+def build_update_deduplicator(
+    backend: str,
+    redis_url: str | None = None,
+    window: int = DEFAULT_DEDUP_WINDOW,
+    ttl_seconds: int = DEFAULT_DEDUP_TTL_SEC,
+) -> UpdateDeduplicator:
+    """
+    Фабрика отсева повторов.
+
+    backend: "redis" (память + Redis) или "memory". Без REDIS_URL — только память.
+    """
+    redis_client = None
+    if backend.lower() == "redis" and redis_url:
+        redis_client = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+    return UpdateDeduplicator(window=window, redis=redis_client, ttl_seconds=ttl_seconds)
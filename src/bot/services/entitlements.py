@@ -0,0 +1,27 @@
+"""
+Уровни доступа пользователей (обычный и Premium).
+
+Пока Premium выдаётся администратором через PREMIUM_USER_IDS;
+остальной код спрашивает уровень только через этот сервис.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+TIER_FREE = "free"
+TIER_PREMIUM = "premium"
+
+
+class Entitlements:
+    """Определяет уровень доступа пользователя."""
+
+    def __init__(self, premium_user_ids: Iterable[int] = ()) -> None:
+        self._premium = frozenset(premium_user_ids)
+
+    def is_premium(self, user_id: int) -> bool:
+        return user_id in self._premium
+
+    def tier(self, user_id: int) -> str:
+        return TIER_PREMIUM if user_id in self._premium else TIER_FREE
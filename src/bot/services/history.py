@@ -4,6 +4,9 @@
 Содержит общий интерфейс и две реализации:
 - InMemoryChatHistoryRepository — для локального запуска;
 - RedisChatHistoryRepository — для масштабируемого хранилища с TTL.
+
+CachedSessionRepository оборачивает Redis-реализацию локальным кэшем
+состояния сессий, чтобы проверка is_active не ходила в сеть.
 """
 
 from __future__ import annotations
@@ -15,6 +18,12 @@ from typing import Protocol
 
 from redis.asyncio import Redis
 
+from src.bot.services.session_cache import (
+    DEFAULT_NEGATIVE_TTL_SEC,
+    SESSION_EVENTS_CHANNEL,
+    ActiveSessionCache,
+    CachedSessionRepository,
+)
 
 Message = dict[str, str]
 
@@ -124,23 +133,38 @@ class RedisChatHistoryRepository(ChatHistoryRepository):
     Хранилище истории в Redis с TTL.
 
     Хранит каждое сообщение в JSON-формате в списке, поддерживает обрезку длины
-    и обновление TTL при каждом обращении.
+    и обновление TTL при каждом обращении. Активность сессии отмечается
+    отдельным ключом: сразу после /chatgpt история ещё пуста.
     """
 
-    def __init__(self, redis: Redis, settings: HistorySettings) -> None:
+    def __init__(
+        self,
+        redis: Redis,
+        settings: HistorySettings,
+        namespace: str = "",
+        owns_redis: bool = True,
+    ) -> None:
         self._redis = redis
         self._settings = settings
-        self._key_prefix = "chat_history:"
+        # Пространство имён разделяет историю разных ботов в одном Redis
+        scope = f"{namespace}:" if namespace else ""
+        self._key_prefix = f"chat_history:{scope}"
+        self._session_prefix = f"chat_session:{scope}"
+        self._owns_redis = owns_redis
 
     async def start_session(self, user_id: int) -> None:
-        key = self._key(user_id)
-        await self._redis.delete(key)
+        session_key = self._session_key(user_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(user_id))
+            pipe.set(session_key, 1)
+            await pipe.execute()
+        await self._touch_ttl(session_key)
 
     async def stop_session(self, user_id: int) -> None:
-        await self._redis.delete(self._key(user_id))
+        await self._redis.delete(self._key(user_id), self._session_key(user_id))
 
     async def is_active(self, user_id: int) -> bool:
-        return bool(await self._redis.exists(self._key(user_id)))
+        return bool(await self._redis.exists(self._session_key(user_id)))
 
     async def add_user_message(self, user_id: int, content: str) -> None:
         await self._append(user_id, {"role": "user", "content": content})
@@ -159,6 +183,7 @@ class RedisChatHistoryRepository(ChatHistoryRepository):
                 continue
         if history:
             await self._touch_ttl(key)
+            await self._touch_ttl(self._session_key(user_id))
         return history
 
     async def trim(self, user_id: int) -> None:
@@ -171,6 +196,9 @@ class RedisChatHistoryRepository(ChatHistoryRepository):
         await self._touch_ttl(key)
 
     async def aclose(self) -> None:
+        if not self._owns_redis:
+            # Общим клиентом владеет тот, кто его создал
+            return
         close = getattr(self._redis, "aclose", None)
         if callable(close):
             await close()
@@ -185,6 +213,9 @@ class RedisChatHistoryRepository(ChatHistoryRepository):
         await self._redis.rpush(key, json.dumps(message, ensure_ascii=False))
         await self.trim(user_id)
         await self._touch_ttl(key)
+        # Сообщение продлевает сессию, но не открывает её заново: ответ,
+        # записанный уже после /stop, не должен включать режим ChatGPT
+        await self._touch_ttl(self._session_key(user_id))
 
     async def _touch_ttl(self, key: str) -> None:
         ttl = self._settings.ttl_seconds
@@ -194,19 +225,44 @@ class RedisChatHistoryRepository(ChatHistoryRepository):
     def _key(self, user_id: int) -> str:
         return f"{self._key_prefix}{user_id}"
 
+    def _session_key(self, user_id: int) -> str:
+        return f"{self._session_prefix}{user_id}"
+
 
 def build_history_repository(
     backend: str,
     settings: HistorySettings,
     redis_url: str | None = None,
+    session_cache_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SEC,
+    namespace: str = "",
+    redis: Redis | None = None,
 ) -> ChatHistoryRepository:
     """
     Фабрика репозитория истории.
 
     backend: "redis" или "memory". Если указан redis, но URL отсутствует,
     автоматически падаем назад на InMemory.
+    session_cache_ttl_seconds: сколько помнить неактивных пользователей
+    в локальном кэше сессий Redis-репозитория (0 — кэш выключен).
+    namespace: пространство имён ключей (у каждого бота своя история).
+    redis: общий клиент Redis; репозиторий его не закрывает.
     """
-    if backend.lower() == "redis" and redis_url:
-        redis_client = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
-        return RedisChatHistoryRepository(redis_client, settings)
+    if backend.lower() == "redis" and (redis is not None or redis_url):
+        redis_client = redis or Redis.from_url(
+            redis_url or "", encoding="utf-8", decode_responses=True
+        )
+        repository = RedisChatHistoryRepository(
+            redis_client, settings, namespace=namespace, owns_redis=redis is None
+        )
+        if session_cache_ttl_seconds <= 0:
+            return repository
+        return CachedSessionRepository(
+            repository,
+            ActiveSessionCache(negative_ttl_seconds=session_cache_ttl_seconds),
+            session_ttl_seconds=settings.ttl_seconds,
+            events=redis_client,
+            channel=(
+                f"{SESSION_EVENTS_CHANNEL}:{namespace}" if namespace else SESSION_EVENTS_CHANNEL
+            ),
+        )
     return InMemoryChatHistoryRepository(settings)
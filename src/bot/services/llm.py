@@ -2,17 +2,21 @@
 Сервис для работы с LLM через OpenRouter API.
 
 Добавляет поддержку таймаутов, ретраев и переиспользования HTTP-сессии.
+С маршрутизатором (ModelRouter) модель выбирается под каждый запрос.
 """
 
 from __future__ import annotations
 
 import asyncio
 import random
+import time
 from typing import Any
 
 import aiohttp
 from aiohttp import ClientTimeout
 
+from src.bot.services.model_router import ModelRouter
+
 # Бесплатная модель Mistral 7B Instruct
 # Суффикс :free указывает на бесплатный вариант модели
 # Лимиты: 20 запросов/день без кредитов, 200 запросов/день с кредитами $5+
@@ -47,8 +51,10 @@ class LLMClient:
         timeout_seconds: float = 20.0,
         retries: int = 3,
         session: aiohttp.ClientSession | None = None,
+        router: ModelRouter | None = None,
     ) -> None:
         self._api_url = api_url
+        self._router = router
         self._referer = referer
         self._timeout_seconds = timeout_seconds
         self._retries = retries
@@ -68,13 +74,19 @@ class LLMClient:
         messages: list[dict[str, str]],
         model: str = DEFAULT_MODEL,
     ) -> str:
-        """Отправляет запрос к LLM и возвращает текст ответа."""
+        """
+        Отправляет запрос к LLM и возвращает текст ответа.
+
+        model — модель по умолчанию; маршрутизатор может выбрать другую.
+        """
+        if self._router is not None:
+            model = self._router.choose(messages, default=model)
         attempt = 0
         last_error: Exception | None = None
 
         while attempt <= self._retries:
             try:
-                return await self._send(api_key=api_key, messages=messages, model=model)
+                return await self._send_observed(api_key=api_key, messages=messages, model=model)
             except RateLimitError:
                 raise
             except ModelNotFoundError:
@@ -96,6 +108,24 @@ class LLMClient:
         assert last_error is not None
         raise last_error
 
+    async def _send_observed(
+        self,
+        api_key: str,
+        messages: list[dict[str, str]],
+        model: str,
+    ) -> str:
+        """Отправка с учётом длительности и ошибок модели в статистике маршрутизатора."""
+        if self._router is None:
+            return await self._send(api_key=api_key, messages=messages, model=model)
+        started_at = time.monotonic()
+        try:
+            response = await self._send(api_key=api_key, messages=messages, model=model)
+        except Exception:
+            self._router.observe(model, time.monotonic() - started_at, ok=False)
+            raise
+        self._router.observe(model, time.monotonic() - started_at, ok=True)
+        return response
+
     async def _send(
         self,
         api_key: str,
@@ -143,7 +173,12 @@ class LLMClient:
                     f"OpenRouter API вернул ошибку {status}: {error_text}"
                 )
 
-            data = await response.json()
+            try:
+                data = await response.json()
+            except asyncio.CancelledError:
+                # Запрос отменён: рвём соединение, чтобы провайдер прекратил генерацию
+                response.close()
+                raise
             return self._parse_response(data)
 
     @staticmethod
@@ -0,0 +1,140 @@
+"""
+Потребитель очереди заданий LLM (src.bot.services.llm_queue).
+
+Цикл воркера читает задания группой потребителей, обрабатывает до
+concurrency штук сразу и подтверждает выполненные. Упавшие задания
+переставляет очередь; задания пропавших воркеров подбираются здесь же.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from src.bot.services.llm_queue import LLMJob, LLMJobQueue
+
+logger = logging.getLogger("bot")
+
+# Как часто и по сколько подбирать задания остановившихся воркеров
+CLAIM_INTERVAL_SEC = 30.0
+CLAIM_BATCH = 100
+
+JobHandler = Callable[[LLMJob], Awaitable[None]]
+DeadLetterHandler = Callable[[LLMJob, Exception], Awaitable[None]]
+
+
+class WorkerLostError(Exception):
+    """Воркер взял задание и пропал, не подтвердив его."""
+
+
+class LLMJobConsumer:
+    """
+    Цикл потребителя: читает задания и обрабатывает до concurrency штук сразу.
+
+    Ошибка обработчика ведёт к повтору задания; после последней попытки
+    вызывается on_dead_letter (например, чтобы извиниться перед пользователем).
+    """
+
+    def __init__(
+        self,
+        queue: LLMJobQueue,
+        handler: JobHandler,
+        consumer: str,
+        concurrency: int,
+        claim_idle_seconds: float,
+        on_dead_letter: DeadLetterHandler | None = None,
+    ) -> None:
+        self._queue = queue
+        self._handler = handler
+        self._consumer = consumer
+        self._slots = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._claim_idle_ms = int(claim_idle_seconds * 1000)
+        self._on_dead_letter = on_dead_letter
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._next_claim = 0.0
+
+    def stop(self) -> None:
+        """Перестаёт брать новые задания; начатые дорабатываются в run()."""
+        self._stopping.set()
+
+    async def run(self, drain_timeout: float | None = None) -> None:
+        await self._queue.ensure_group()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await self._fill()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Ошибка чтения очереди LLM: %s", e)
+                    await asyncio.sleep(1)
+        finally:
+            if self._tasks:
+                # Недоделанные задания останутся неподтверждёнными и уйдут другому воркеру
+                await asyncio.wait(self._tasks, timeout=drain_timeout)
+
+    async def _fill(self) -> None:
+        if time.monotonic() >= self._next_claim:
+            self._next_claim = time.monotonic() + CLAIM_INTERVAL_SEC
+            await self._reclaim()
+        # Backpressure: читаем только столько, сколько можем обработать
+        await self._slots.acquire()
+        free = 1
+        while free < self._concurrency and not self._slots.locked():
+            await self._slots.acquire()
+            free += 1
+        try:
+            jobs = [] if self._stopping.is_set() else await self._queue.read(self._consumer, free)
+        except BaseException:
+            for _ in range(free):
+                self._slots.release()
+            raise
+        for _ in range(free - len(jobs)):
+            self._slots.release()
+        for entry_id, job in jobs:
+            task = asyncio.create_task(self._process(entry_id, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _reclaim(self) -> None:
+        """
+        Возвращает в очередь задания остановившихся воркеров.
+
+        Пропажа воркера считается неудачной попыткой: задание, которое
+        роняет процесс, не будет перезапускаться бесконечно.
+        """
+        stale = await self._queue.claim_stale(self._consumer, self._claim_idle_ms, CLAIM_BATCH)
+        for entry_id, job in stale:
+            await self._fail(entry_id, job, WorkerLostError("воркер не подтвердил задание"))
+
+    async def _process(self, entry_id: str, job: LLMJob) -> None:
+        try:
+            await self._handler(job)
+        except Exception as e:
+            await self._fail(entry_id, job, e)
+        else:
+            try:
+                await self._queue.ack(entry_id)
+            except Exception as e:
+                logger.error("Не удалось подтвердить задание LLM: %s", e)
+        finally:
+            self._slots.release()
+
+    async def _fail(self, entry_id: str, job: LLMJob, error: Exception) -> None:
+        logger.warning(
+            "Задание LLM пользователя %s не выполнено (попытка %s): %s",
+            job.user_id,
+            job.attempts + 1,
+            error,
+        )
+        try:
+            dead = await self._queue.retry(entry_id, job, error)
+            if dead and self._on_dead_letter is not None:
+                await self._on_dead_letter(job, error)
+        except Exception as e:
+            logger.error("Не удалось переставить задание LLM: %s", e)
@@ -0,0 +1,203 @@
+"""
+Распределённая очередь заданий LLM на Redis Streams.
+
+В режиме очереди обработчик сообщения не держит запрос к провайдеру:
+он сохраняет реплику в историю и ставит задание (пользователь, чат, ход)
+в поток. Пул процессов-воркеров (src.bot.llm_worker) читает поток через
+группу потребителей, вызывает LLM и отправляет ответ.
+
+- Задание подтверждается (XACK) и удаляется после обработки, поэтому длина
+  потока — это очередь плюс задания в работе; по ней работает backpressure.
+- Упавшее задание ставится заново с увеличенным счётчиком попыток,
+  после последней попытки — в поток "мёртвых" заданий. Готовый ответ
+  модели переезжает в повтор вместе с заданием: если не удалась только
+  отправка, повтор не платит за LLM ещё раз.
+- Задания умершего воркера подбирает другой через XAUTOCLAIM.
+Цикл воркера, читающий очередь, — src.bot.services.llm_consumer.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+LLM_STREAM = "llm_jobs"
+LLM_DEAD_STREAM = "llm_jobs_dead"
+LLM_GROUP = "llm_workers"
+
+DEFAULT_MAX_BACKLOG = 1000
+DEFAULT_MAX_ATTEMPTS = 3
+# Сколько мёртвых заданий хранить для разбора
+DEAD_STREAM_MAXLEN = 10_000
+# Сколько ждать новых заданий за один XREADGROUP
+READ_BLOCK_MS = 5000
+
+
+class QueueFullError(Exception):
+    """Очередь заданий переполнена: новых запросов пока не принимаем."""
+
+
+@dataclass
+class LLMJob:
+    """Задание: ответить пользователю в чате на последний ход его истории."""
+
+    user_id: int
+    chat_id: int
+    # Текст хода — для логов и разбора мёртвых заданий; модель берёт историю
+    text: str = ""
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    # Ответ модели, если он уже получен, но ещё не доставлен
+    response: str = ""
+    # Сутки, из квоты которых списан запрос ("" — не списан); для возврата
+    usage_day: str = ""
+
+    def to_fields(self) -> dict[str, str]:
+        return {name: str(value) for name, value in asdict(self).items()}
+
+    @classmethod
+    def from_fields(cls, fields: dict[str, str]) -> LLMJob:
+        return cls(
+            user_id=int(fields["user_id"]),
+            chat_id=int(fields["chat_id"]),
+            text=fields.get("text", ""),
+            attempts=int(fields.get("attempts", 0)),
+            enqueued_at=float(fields.get("enqueued_at", 0)),
+            response=fields.get("response", ""),
+            usage_day=fields.get("usage_day", ""),
+        )
+
+
+class LLMJobQueue:
+    """Поток заданий LLM с группой потребителей."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        max_backlog: int = DEFAULT_MAX_BACKLOG,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        stream: str = LLM_STREAM,
+        group: str = LLM_GROUP,
+        dead_stream: str = LLM_DEAD_STREAM,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self._redis = redis
+        self._max_backlog = max_backlog
+        self._max_attempts = max_attempts
+        self._stream = stream
+        self._group = group
+        self._dead_stream = dead_stream
+
+        metrics = metrics or MetricsRegistry()
+        self._enqueued = metrics.counter("llm_queue_enqueued")
+        self._rejected = metrics.counter("llm_queue_rejected")
+        self._retried = metrics.counter("llm_queue_retried")
+        self._dead = metrics.counter("llm_queue_dead_lettered")
+        self._wait = metrics.timing("llm_queue_wait_seconds")
+
+    async def enqueue(self, job: LLMJob) -> str:
+        """
+        Ставит задание в поток.
+
+        Raises:
+            QueueFullError: В потоке уже max_backlog необработанных заданий
+        """
+        if await self._redis.xlen(self._stream) >= self._max_backlog:
+            self._rejected.inc()
+            raise QueueFullError(f"В очереди LLM уже {self._max_backlog} заданий")
+        entry_id = await self._redis.xadd(self._stream, job.to_fields())
+        self._enqueued.inc()
+        return entry_id
+
+    async def ensure_group(self) -> None:
+        """Создаёт поток и группу потребителей, если их ещё нет."""
+        try:
+            await self._redis.xgroup_create(self._stream, self._group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(
+        self, consumer: str, count: int, block_ms: int = READ_BLOCK_MS
+    ) -> list[tuple[str, LLMJob]]:
+        """Забирает новые задания для потребителя (пусто по таймауту)."""
+        response = await self._redis.xreadgroup(
+            self._group, consumer, {self._stream: ">"}, count=count, block=block_ms
+        )
+        jobs = [
+            (entry_id, LLMJob.from_fields(fields))
+            for _, entries in response or []
+            for entry_id, fields in entries
+        ]
+        now = time.time()
+        for _, job in jobs:
+            if job.attempts == 0:
+                self._wait.observe(max(0.0, now - job.enqueued_at))
+        return jobs
+
+    async def claim_stale(
+        self, consumer: str, min_idle_ms: int, count: int
+    ) -> list[tuple[str, LLMJob]]:
+        """Забирает задания, зависшие у остановившихся потребителей."""
+        response = await self._redis.xautoclaim(
+            self._stream, self._group, consumer, min_idle_time=min_idle_ms, count=count
+        )
+        # Удалённые из потока записи приходят с пустыми полями
+        return [
+            (entry_id, LLMJob.from_fields(fields)) for entry_id, fields in response[1] if fields
+        ]
+
+    async def ack(self, entry_id: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self._stream, self._group, entry_id)
+            pipe.xdel(self._stream, entry_id)
+            await pipe.execute()
+
+    async def retry(self, entry_id: str, job: LLMJob, error: Exception) -> bool:
+        """
+        Ставит задание заново или в мёртвые, если попытки кончились.
+
+        Returns:
+            True, если задание отправлено в мёртвые
+        """
+        job.attempts += 1
+        dead = job.attempts >= self._max_attempts
+        async with self._redis.pipeline(transaction=True) as pipe:
+            if dead:
+                fields = job.to_fields()
+                fields["error"] = repr(error)[:500]
+                pipe.xadd(self._dead_stream, fields, maxlen=DEAD_STREAM_MAXLEN, approximate=True)
+            else:
+                pipe.xadd(self._stream, job.to_fields())
+            pipe.xack(self._stream, self._group, entry_id)
+            pipe.xdel(self._stream, entry_id)
+            await pipe.execute()
+        (self._dead if dead else self._retried).inc()
+        return dead
+
+    async def aclose(self) -> None:
+        # В redis-py до 5.0.1 метод назывался close
+        close = getattr(self._redis, "aclose", None) or self._redis.close
+        await close()
+
+
+def build_llm_queue(
+    redis_url: str,
+    max_backlog: int = DEFAULT_MAX_BACKLOG,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    metrics: MetricsRegistry | None = None,
+) -> LLMJobQueue:
+    """Фабрика очереди заданий LLM поверх REDIS_URL."""
+    redis_client = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+    return LLMJobQueue(
+        redis_client, max_backlog=max_backlog, max_attempts=max_attempts, metrics=metrics
+    )
@@ -0,0 +1,65 @@
+"""
+Учёт выполняющихся запросов к LLM по пользователям.
+
+Если пользователь отправил /stop или (при политике "последний выигрывает")
+новое сообщение, текущий запрос отменяется: HTTP-соединение с провайдером
+закрывается, и ответ, который уже никто не прочитает, не тратит квоту.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, TypeVar
+
+from src.bot.utils.metrics import MetricsRegistry
+
+T = TypeVar("T")
+
+
+class RequestSupersededError(Exception):
+    """Запрос отменён: пользователь отправил /stop или новое сообщение."""
+
+
+class InFlightRequests:
+    """Реестр текущих запросов к LLM: не больше одного на пользователя."""
+
+    def __init__(self, metrics: MetricsRegistry | None = None) -> None:
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._superseded: set[asyncio.Task] = set()
+        self._cancelled = (metrics or MetricsRegistry()).counter("llm_requests_superseded")
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._tasks
+
+    async def run(self, user_id: int, request: Awaitable[T]) -> T:
+        """
+        Выполняет запрос как отменяемую задачу пользователя.
+
+        Raises:
+            RequestSupersededError: Запрос отменён через cancel()
+        """
+        # Предыдущий запрос того же пользователя больше не нужен
+        self.cancel(user_id)
+        task = asyncio.ensure_future(request)
+        self._tasks[user_id] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task in self._superseded:
+                raise RequestSupersededError("Запрос заменён новым вводом") from None
+            raise
+        finally:
+            self._superseded.discard(task)
+            if self._tasks.get(user_id) is task:
+                del self._tasks[user_id]
+
+    def cancel(self, user_id: int) -> bool:
+        """Отменяет текущий запрос пользователя. Возвращает True, если он был."""
+        task = self._tasks.pop(user_id, None)
+        if task is None or task.done():
+            return False
+        self._superseded.add(task)
+        task.cancel()
+        self._cancelled.inc()
+        return True
@@ -0,0 +1,173 @@
+"""
+Планировщик запросов к LLM с приоритетом по уровню пользователя.
+
+Одновременных запросов к провайдеру не больше max_in_flight, остальные
+ждут. Освободившееся место получает запрос, выбранный взвешенной честной
+очередью (WFQ): каждый запрос получает виртуальную метку завершения
+start + 1 / вес уровня, место достаётся наименьшей метке. При весах 4:1
+Premium получает в четыре раза больше мест, но обычные пользователи тоже
+продвигаются. Запрос, прождавший дольше aging_seconds, проходит вне очереди,
+поэтому обычных пользователей не "заморить голодом" даже потоком Premium.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable
+
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+from src.bot.utils.metrics import MetricsRegistry
+
+DEFAULT_MAX_IN_FLIGHT = 50
+DEFAULT_PREMIUM_RESERVE = 0.2
+DEFAULT_AGING_SEC = 10.0
+TIER_WEIGHTS: dict[str, float] = {TIER_PREMIUM: 4.0, TIER_FREE: 1.0}
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    finish_tag: float
+    enqueued_at: float
+    seq: int
+
+
+class LLMRequestScheduler:
+    """
+    Взвешенная честная очередь запросов к LLM между уровнями пользователей.
+
+    Args:
+        max_in_flight: Жёсткий предел одновременных запросов
+        premium_reserve: Доля мест, которую не занимают обычные пользователи
+        aging_seconds: После такого ожидания запрос обслуживается первым
+        weights: Веса уровней (неизвестный уровень считается обычным)
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        premium_reserve: float = DEFAULT_PREMIUM_RESERVE,
+        aging_seconds: float = DEFAULT_AGING_SEC,
+        weights: dict[str, float] | None = None,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = max(1, max_in_flight)
+        # Хотя бы одно место остаётся обычным пользователям
+        self._free_capacity = max(1, self._capacity - math.floor(self._capacity * premium_reserve))
+        self._aging = aging_seconds
+        self._weights = weights or TIER_WEIGHTS
+        self._clock = clock
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._last_finish: dict[str, float] = {}
+        self._queues: dict[str, deque[_Waiter]] = {tier: deque() for tier in self._weights}
+        self._seq = itertools.count()
+
+        self._metrics = metrics or MetricsRegistry()
+        self._in_flight_gauge = self._metrics.gauge("llm_scheduler_in_flight")
+        self._waiting_gauge = self._metrics.gauge("llm_scheduler_waiting")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def capacity_for(self, tier: str) -> int:
+        return self._capacity if tier == TIER_PREMIUM else self._free_capacity
+
+    def waiting_ahead(self, tier: str) -> float:
+        """Сколько ожидающих пройдут раньше нового запроса уровня tier (оценка)."""
+        tier = self._known(tier)
+        weight = self._weights[tier]
+        return sum(
+            len(queue) * min(1.0, self._weights[other] / weight)
+            for other, queue in self._queues.items()
+        )
+
+    @asynccontextmanager
+    async def slot(self, tier: str = TIER_FREE) -> AsyncIterator[None]:
+        """Занимает место для запроса к LLM на время блока."""
+        tier = self._known(tier)
+        await self._acquire(tier)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _known(self, tier: str) -> str:
+        return tier if tier in self._weights else TIER_FREE
+
+    async def _acquire(self, tier: str) -> None:
+        now = self._clock()
+        if not self.waiting and self._in_flight < self.capacity_for(tier):
+            self._enter(tier, waited=0.0)
+            return
+        start = max(self._virtual_time, self._last_finish.get(tier, 0.0))
+        finish = start + 1 / self._weights[tier]
+        self._last_finish[tier] = finish
+        waiter = _Waiter(
+            future=asyncio.get_running_loop().create_future(),
+            finish_tag=finish,
+            enqueued_at=now,
+            seq=next(self._seq),
+        )
+        self._queues[tier].append(waiter)
+        # Место может быть свободно для этого уровня, хотя другие ждут (резерв Premium)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Место уже выдано, но ждавший ушёл: передаём его дальше
+                self._release()
+            else:
+                self._queues[tier].remove(waiter)
+                self._waiting_gauge.set(self.waiting)
+            raise
+
+    def _enter(self, tier: str, waited: float) -> None:
+        self._in_flight += 1
+        self._in_flight_gauge.set(self._in_flight)
+        self._metrics.summary(f"llm_wait_seconds_{tier}").observe(waited)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._in_flight_gauge.set(self._in_flight)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while True:
+            tier = self._pick()
+            if tier is None:
+                break
+            waiter = self._queues[tier].popleft()
+            self._virtual_time = max(self._virtual_time, waiter.finish_tag)
+            self._enter(tier, waited=self._clock() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+        self._waiting_gauge.set(self.waiting)
+
+    def _pick(self) -> str | None:
+        """Уровень, чей первый запрос получает освободившееся место."""
+        now = self._clock()
+        candidates = [
+            (tier, queue[0])
+            for tier, queue in self._queues.items()
+            if queue and self._in_flight < self.capacity_for(tier)
+        ]
+        if not candidates:
+            return None
+        aged = [c for c in candidates if now - c[1].enqueued_at >= self._aging]
+        if aged:
+            return min(aged, key=lambda c: c[1].enqueued_at)[0]
+        return min(candidates, key=lambda c: (c[1].finish_tag, c[1].seq))[0]
@@ -0,0 +1,185 @@
+"""
+Выбор модели LLM под конкретный запрос.
+
+Короткую болтовню быстрее и дешевле отдаёт маленькая модель, длинные
+аналитические вопросы нужны большой. Правила перебираются по порядку:
+первое, под которое подходят длина последней реплики и размер диалога
+и чья модель сейчас "здорова", выбирает модель. Здоровье считается по
+скользящим средним (EWMA) длительности и доли ошибок каждой модели.
+"Нездоровой" модели изредка достаётся пробный запрос, чтобы заметить
+её восстановление. Если не подошло ни одно правило, используется модель
+по умолчанию (LLM_MODEL).
+
+В теневом режиме маршрутизатор только пишет в лог, что бы он выбрал,
+а запрос уходит модели по умолчанию.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+ROUTING_OFF = "off"
+ROUTING_SHADOW = "shadow"
+ROUTING_ON = "on"
+
+STATS_EWMA_ALPHA = 0.2
+# Модель с большей долей ошибок пропускается, пока не восстановится
+MAX_ERROR_RATE = 0.5
+# До стольких замеров статистике модели не доверяем
+MIN_SAMPLES = 5
+# Каждый такой запрос всё же идёт "нездоровой" модели, чтобы заметить восстановление
+PROBE_EVERY = 20
+
+
+@dataclass(frozen=True)
+class ModelRule:
+    """Правило: модель для запросов не длиннее max_chars и диалогов не больше max_messages."""
+
+    model: str
+    max_chars: float = math.inf
+    max_messages: float = math.inf
+    # Модель пропускается, пока её средняя длительность выше (секунды)
+    max_latency: float = math.inf
+
+    def matches(self, prompt_chars: int, messages: int) -> bool:
+        return prompt_chars <= self.max_chars and messages <= self.max_messages
+
+
+@dataclass
+class ModelStats:
+    """Скользящие средние длительности и доли ошибок модели."""
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    samples: int = 0
+    skipped: int = 0
+
+    def observe(self, seconds: float, ok: bool) -> None:
+        error = 0.0 if ok else 1.0
+        if self.samples == 0:
+            self.latency, self.error_rate = seconds, error
+        else:
+            self.latency += STATS_EWMA_ALPHA * (seconds - self.latency)
+            self.error_rate += STATS_EWMA_ALPHA * (error - self.error_rate)
+        self.samples += 1
+
+
+def parse_model_rule(spec: str) -> ModelRule:
+    """
+    Разбирает правило вида "модель=chars:200,messages:6,latency:3".
+
+    Все условия необязательны: "модель" без них подходит под любой запрос.
+
+    Raises:
+        ValueError: Неизвестное условие или нечисловое значение
+    """
+    model, _, conditions = spec.strip().partition("=")
+    limits: dict[str, float] = {}
+    for condition in filter(None, (part.strip() for part in conditions.split(","))):
+        key, _, value = condition.partition(":")
+        field = {"chars": "max_chars", "messages": "max_messages", "latency": "max_latency"}.get(
+            key.strip()
+        )
+        if field is None:
+            raise ValueError(f"Неизвестное условие маршрутизации: {condition}")
+        limits[field] = float(value)
+    if not model.strip():
+        raise ValueError(f"В правиле маршрутизации не указана модель: {spec}")
+    return ModelRule(model=model.strip(), **limits)
+
+
+class ModelRouter:
+    """
+    Выбирает модель по правилам и живой статистике моделей.
+
+    Args:
+        rules: Правила в порядке приоритета
+        shadow: Только логировать выбор, запрос отдавать модели по умолчанию
+    """
+
+    def __init__(
+        self,
+        rules: list[ModelRule],
+        shadow: bool = False,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        self._rules = rules
+        self._shadow = shadow
+        self._stats: dict[str, ModelStats] = {}
+
+        metrics = metrics or MetricsRegistry()
+        self._rerouted = metrics.counter("llm_router_rerouted")
+        self._shadow_mismatch = metrics.counter("llm_router_shadow_mismatch")
+
+    def choose(self, messages: list[dict[str, str]], default: str) -> str:
+        """Модель для запроса с историей messages."""
+        prompt_chars = _last_user_chars(messages)
+        routed = default
+        for rule in self._rules:
+            if rule.matches(prompt_chars, len(messages)) and self._healthy(rule):
+                routed = rule.model
+                break
+
+        if self._shadow:
+            if routed != default:
+                self._shadow_mismatch.inc()
+                logger.info(
+                    "Маршрутизация (тень): выбрана бы %s вместо %s (символов: %s, сообщений: %s)",
+                    routed,
+                    default,
+                    prompt_chars,
+                    len(messages),
+                )
+            return default
+        if routed != default:
+            self._rerouted.inc()
+        return routed
+
+    def observe(self, model: str, seconds: float, ok: bool) -> None:
+        """Учитывает результат одного запроса к модели."""
+        self._stats.setdefault(model, ModelStats()).observe(seconds, ok)
+
+    def stats(self, model: str) -> ModelStats | None:
+        return self._stats.get(model)
+
+    def _healthy(self, rule: ModelRule) -> bool:
+        stats = self._stats.get(rule.model)
+        if stats is None or stats.samples < MIN_SAMPLES:
+            return True
+        if stats.error_rate <= MAX_ERROR_RATE and stats.latency <= rule.max_latency:
+            return True
+        stats.skipped += 1
+        return stats.skipped % PROBE_EVERY == 0
+
+
+def _last_user_chars(messages: list[dict[str, str]]) -> int:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return len(message.get("content", ""))
+    return 0
+
+
+def build_model_router(
+    mode: str,
+    specs: tuple[str, ...],
+    metrics: MetricsRegistry | None = None,
+) -> ModelRouter | None:
+    """
+    Фабрика маршрутизатора.
+
+    mode: "off" (None — всегда LLM_MODEL), "shadow" или "on".
+    """
+    mode = mode.lower()
+    if mode == ROUTING_OFF or not specs:
+        return None
+    if mode not in (ROUTING_SHADOW, ROUTING_ON):
+        raise ValueError(f"Неизвестный режим маршрутизации: {mode}")
+    rules = [parse_model_rule(spec) for spec in specs]
+    return ModelRouter(rules, shadow=mode == ROUTING_SHADOW, metrics=metrics)
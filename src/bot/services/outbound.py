@@ -0,0 +1,276 @@
+"""
+Очередь исходящих запросов к Telegram с учётом лимитов Bot API.
+
+Telegram ограничивает бота примерно 30 сообщениями в секунду на всех
+и 1 сообщением в секунду в одном чате (в группах — 20 в минуту), сверх
+этого отвечает 429 с retry_after. Очередь выпускает запросы, только когда
+есть токены в общем ведре и в ведре чата; ответы пользователю идут раньше
+индикатора "печатает", повторные индикаторы для чата склеиваются в один.
+На 429 чат ставится на паузу, а запрос возвращается в очередь на своё место.
+Не зависит от aiogram и Telegram API: запрос — это просто корутина.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.bot.services.outbound_jobs import OutboundJob, TokenBucket, settle
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+# Полосы приоритета: меньше — раньше
+PRIORITY_HIGH = 0
+PRIORITY_LOW = 1
+
+DEFAULT_GLOBAL_RATE = 30.0
+DEFAULT_CHAT_BURST = 3
+# Личный чат: 1 сообщение в секунду; группа (chat_id < 0): 20 в минуту
+CHAT_RATE_PER_SECOND = 1.0
+GROUP_RATE_PER_SECOND = 20 / 60
+GROUP_BURST = 20
+# Сколько раз повторять запрос после 429, прежде чем вернуть ошибку
+MAX_RETRY_ATTEMPTS = 3
+
+
+class RetryLater(Exception):
+    """Telegram попросил повторить запрос через retry_after секунд."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Повторить через {retry_after} с")
+        self.retry_after = retry_after
+
+
+class OutboundQueue:
+    """
+    Планировщик исходящих запросов.
+
+    Один фоновый цикл выбирает из кучи самый приоритетный запрос, чей чат
+    свободен и имеет токен; сами запросы выполняются параллельно, но в одном
+    чате — строго по одному, поэтому порядок сообщений сохраняется.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = DEFAULT_GLOBAL_RATE,
+        chat_burst: int = DEFAULT_CHAT_BURST,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._chat_burst = chat_burst
+        self._global = TokenBucket(global_rate, global_rate, clock())
+        self._chats: dict[int, TokenBucket] = {}
+        self._paused_until: dict[int, float] = {}
+        self._busy: set[int] = set()
+        self._heap: list[OutboundJob] = []
+        self._coalesced: dict[Hashable, OutboundJob] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+        metrics = metrics or MetricsRegistry()
+        self._depth = metrics.gauge("outbound_queue_depth")
+        self._wait = metrics.timing("outbound_wait_seconds")
+        self._retries = metrics.counter("outbound_retry_after")
+        self._coalesced_count = metrics.counter("outbound_coalesced")
+
+    async def submit(
+        self,
+        chat_id: int,
+        send: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_HIGH,
+        coalesce_key: Hashable | None = None,
+    ) -> Any:
+        """
+        Ставит запрос в очередь и ждёт его результата.
+
+        coalesce_key: запросы с одинаковым ключом, ещё не отправленные,
+        выполняются один раз (например, "печатает" для одного чата).
+        """
+        if coalesce_key is not None:
+            pending = self._coalesced.get(coalesce_key)
+            if pending is not None:
+                self._coalesced_count.inc()
+                return await self._wait_for(pending)
+
+        job = OutboundJob(
+            priority=priority,
+            seq=next(self._seq),
+            chat_id=chat_id,
+            send=send,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=self._clock(),
+            coalesce_key=coalesce_key,
+        )
+        if coalesce_key is not None:
+            self._coalesced[coalesce_key] = job
+        self._push(job)
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+        return await self._wait_for(job)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    async def drain(self, timeout: float) -> int:
+        """
+        Ждёт, пока очередь отправит накопленные запросы, не дольше timeout секунд.
+
+        Returns:
+            Сколько запросов так и не отправлено (их отменит aclose)
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._heap or self._inflight:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            futures = [job.future for job in self._heap] + list(self._inflight)
+            await asyncio.wait(futures, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        unsent = len(self._heap) + len(self._inflight)
+        if unsent:
+            logger.warning("Остановка: не отправлено %s исходящих запросов", unsent)
+        return unsent
+
+    async def aclose(self) -> None:
+        """Останавливает цикл; неотправленные запросы отменяются."""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        for job in self._heap:
+            job.future.cancel()
+        self._heap.clear()
+        self._coalesced.clear()
+        self._depth.set(0)
+        # Зависшая отправка не должна держать остановку
+        for task in self._inflight:
+            task.cancel()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _wait_for(self, job: OutboundJob) -> Any:
+        """
+        Ждёт результат запроса.
+
+        Если все ожидающие отменились до отправки, запрос убирается из очереди:
+        например, индикатор "печатает" после уже полученного ответа не нужен.
+        """
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            job.waiters -= 1
+            if job.waiters == 0 and any(queued is job for queued in self._heap):
+                self._heap.remove(job)
+                heapq.heapify(self._heap)
+                self._depth.set(len(self._heap))
+                if self._coalesced.get(job.coalesce_key) is job:
+                    del self._coalesced[job.coalesce_key]
+                job.future.cancel()
+            raise
+
+    def _push(self, job: OutboundJob) -> None:
+        heapq.heappush(self._heap, job)
+        self._depth.set(len(self._heap))
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            job, delay = self._next_ready()
+            if job is None:
+                if delay is None:
+                    self._prune_idle()
+                    await self._wakeup.wait()
+                else:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+            self._start(job)
+
+    def _next_ready(self) -> tuple[OutboundJob | None, float | None]:
+        """Находит первый готовый запрос или время до ближайшей готовности."""
+        now = self._clock()
+        global_delay = self._global.delay(now)
+        soonest: float | None = None
+        for job in sorted(self._heap):
+            if job.chat_id in self._busy:
+                continue
+            delay = max(
+                self._paused_until.get(job.chat_id, 0.0) - now,
+                self._chat_bucket(job.chat_id, now).delay(now),
+                global_delay,
+            )
+            if delay <= 0:
+                return job, None
+            if soonest is None or delay < soonest:
+                soonest = delay
+        return None, soonest
+
+    def _start(self, job: OutboundJob) -> None:
+        self._heap.remove(job)
+        heapq.heapify(self._heap)
+        self._depth.set(len(self._heap))
+        if job.coalesce_key is not None and self._coalesced.get(job.coalesce_key) is job:
+            del self._coalesced[job.coalesce_key]
+        now = self._clock()
+        self._global.take()
+        self._chat_bucket(job.chat_id, now).take()
+        self._paused_until.pop(job.chat_id, None)
+        if job.attempts == 0:
+            self._wait.observe(now - job.enqueued_at)
+        self._busy.add(job.chat_id)
+        task = asyncio.create_task(self._execute(job))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, job: OutboundJob) -> None:
+        try:
+            result = await job.send()
+        except RetryLater as e:
+            job.attempts += 1
+            self._retries.inc()
+            if job.attempts > MAX_RETRY_ATTEMPTS or job.future.done():
+                settle(job.future, error=e.__cause__ or e)
+            else:
+                logger.warning(
+                    "Telegram ограничил чат %s, повтор через %s с", job.chat_id, e.retry_after
+                )
+                self._paused_until[job.chat_id] = self._clock() + e.retry_after
+                self._push(job)
+        except BaseException as e:
+            settle(job.future, error=e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        else:
+            settle(job.future, result=result)
+        finally:
+            self._busy.discard(job.chat_id)
+            self._wakeup.set()
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if chat_id < 0:
+                bucket = TokenBucket(GROUP_BURST, GROUP_RATE_PER_SECOND, now)
+            else:
+                bucket = TokenBucket(self._chat_burst, CHAT_RATE_PER_SECOND, now)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune_idle(self) -> None:
+        """Забывает полные вёдра простаивающих чатов: их состояние равно новому."""
+        now = self._clock()
+        for chat_id in [c for c, b in self._chats.items() if b.is_full(now)]:
+            if chat_id not in self._busy:
+                del self._chats[chat_id]
+                self._paused_until.pop(chat_id, None)
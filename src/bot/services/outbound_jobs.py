@@ -0,0 +1,64 @@
+"""
+Элементы очереди исходящих запросов (src.bot.services.outbound).
+
+Ведро токенов для общего лимита и лимитов чатов и запись о запросе в куче
+планировщика. Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class TokenBucket:
+    """Синхронное ведро токенов: цикл очереди проверяет его без ожиданий."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, rate: float, now: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Сколько секунд ждать до появления токена (0 — токен есть)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self.delay(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass(order=True)
+class OutboundJob:
+    """Запрос в очереди: сравнивается по приоритету, затем по порядку постановки."""
+
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    send: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    coalesce_key: Hashable | None = field(default=None, compare=False)
+    attempts: int = field(default=0, compare=False)
+    waiters: int = field(default=0, compare=False)
+
+
+def settle(
+    future: asyncio.Future, result: Any = None, error: BaseException | None = None
+) -> None:
+    """Завершает future результатом или ошибкой, если он ещё не завершён."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
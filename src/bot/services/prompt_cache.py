@@ -0,0 +1,189 @@
+"""
+Приблизительный кэш ответов на первые вопросы диалога.
+
+Пользователи часто спрашивают одно и то же почти одними словами
+("что такое ИИ?" и "Что такое ИИ"), и точное совпадение текста такие
+повторы не ловит. Текст нормализуется, по словам и символьным триграммам
+считается 64-битный SimHash: у похожих текстов отпечатки отличаются
+в немногих битах. Кандидаты ищутся в LSH-индексе — отпечаток режется
+на полосы, и в кандидаты попадают записи, совпавшие хотя бы по одной
+полосе; ответ берётся у ближайшего кандидата, если доля совпавших бит
+не ниже порога. Всё считается локально, без сервиса эмбеддингов.
+
+Отпечаток не видит смысла: "я люблю" и "я не люблю", "умножить на 6789"
+и "на 6788" отличаются в паре бит. Поэтому числа и слова-отрицания должны
+совпадать точно, иначе запись не подходит, как бы похож ни был отпечаток.
+
+Кэш общий для всех пользователей: ответ одному может получить другой,
+так что включать его стоит для справочных вопросов, а не личных диалогов.
+
+Записей не больше max_entries (вытесняются давно не использованные),
+каждая живёт ttl_seconds.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from src.bot.utils.metrics import MetricsRegistry
+
+FINGERPRINT_BITS = 64
+# Полосы LSH: при 4 полосах по 16 бит тексты, отличающиеся не больше
+# чем в 3 битах, гарантированно окажутся кандидатами
+LSH_BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // LSH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+SHINGLE_SIZE = 3
+
+DEFAULT_MAX_ENTRIES = 10_000
+# Порог под полосы: допускает те же 3 отличающихся бита (61/64 ≈ 0.953),
+# при пороге ниже часть подходящих записей индекс всё равно не найдёт
+DEFAULT_SIMILARITY = 0.95
+DEFAULT_TTL_SEC = 60 * 60 * 24
+# Слова, меняющие смысл на противоположный при почти том же тексте
+NEGATIONS = frozenset({"не", "ни", "нет", "без", "no", "not", "never", "without"})
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Нижний регистр, ё → е, без пунктуации и лишних пробелов."""
+    text = text.lower().replace("ё", "е")
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip()
+
+
+def simhash(normalized: str) -> int:
+    """64-битный SimHash по словам и символьным триграммам текста."""
+    features = normalized.split()
+    padded = f" {normalized} "
+    features += [padded[i : i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)]
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def exact_guard(normalized: str) -> tuple[str, ...]:
+    """Слова, которые должны совпасть точно: числа и отрицания, в порядке текста."""
+    return tuple(
+        word
+        for word in normalized.split()
+        if word in NEGATIONS or any(char.isdigit() for char in word)
+    )
+
+
+def similarity(left: int, right: int) -> float:
+    """Доля совпавших бит двух отпечатков."""
+    return 1 - bin(left ^ right).count("1") / FINGERPRINT_BITS
+
+
+def _bands(fingerprint: int) -> list[tuple[int, int]]:
+    return [(band, fingerprint >> (band * BAND_BITS) & BAND_MASK) for band in range(LSH_BANDS)]
+
+
+@dataclass
+class _Entry:
+    answer: str
+    expires_at: float
+    guard: tuple[str, ...]
+
+
+class PromptCache:
+    """
+    Ответы на похожие вопросы с ограниченной памятью.
+
+    Args:
+        max_entries: Предел записей (вытесняются давно не использованные)
+        min_similarity: Минимальная доля совпавших бит отпечатков для попадания
+        ttl_seconds: Время жизни ответа
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        min_similarity: float = DEFAULT_SIMILARITY,
+        ttl_seconds: float = DEFAULT_TTL_SEC,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._min_similarity = min_similarity
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._index: dict[tuple[int, int], set[int]] = {}
+
+        metrics = metrics or MetricsRegistry()
+        self._hits = metrics.counter("prompt_cache_hits")
+        self._misses = metrics.counter("prompt_cache_misses")
+        self._size = metrics.gauge("prompt_cache_entries")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, prompt: str) -> str | None:
+        """Ответ на самый похожий закэшированный вопрос или None."""
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        fingerprint = simhash(normalized)
+        guard = exact_guard(normalized)
+        now = self._clock()
+        best: int | None = None
+        best_similarity = self._min_similarity
+        for candidate in self._candidates(fingerprint):
+            if self._entries[candidate].expires_at <= now:
+                self._remove(candidate)
+                continue
+            if self._entries[candidate].guard != guard:
+                continue
+            score = similarity(fingerprint, candidate)
+            if score >= best_similarity:
+                best, best_similarity = candidate, score
+        if best is None:
+            self._misses.inc()
+            return None
+        self._entries.move_to_end(best)
+        self._hits.inc()
+        return self._entries[best].answer
+
+    def put(self, prompt: str, answer: str) -> None:
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return
+        fingerprint = simhash(normalized)
+        if fingerprint in self._entries:
+            self._remove(fingerprint)
+        self._entries[fingerprint] = _Entry(
+            answer, self._clock() + self._ttl, exact_guard(normalized)
+        )
+        for band in _bands(fingerprint):
+            self._index.setdefault(band, set()).add(fingerprint)
+        while len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries)))
+        self._size.set(len(self._entries))
+
+    def _candidates(self, fingerprint: int) -> set[int]:
+        candidates: set[int] = set()
+        for band in _bands(fingerprint):
+            candidates |= self._index.get(band, set())
+        return candidates
+
+    def _remove(self, fingerprint: int) -> None:
+        del self._entries[fingerprint]
+        for band in _bands(fingerprint):
+            bucket = self._index[band]
+            bucket.discard(fingerprint)
+            if not bucket:
+                del self._index[band]
+        self._size.set(len(self._entries))
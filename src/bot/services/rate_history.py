@@ -0,0 +1,241 @@
+"""
+Хранилище истории курсов валют в виде компактных временных рядов.
+
+Каждая обновлённая таблица курсов дописывается строкой в набор колонок:
+- timestamps.f64 — Unix-время строк (float64);
+- {CODE}.f64 — курс валюты к базовой валюте таблицы (float64, NaN — нет данных).
+
+Чтение идёт через mmap: окно находится бинарным поиском по колонке времени,
+а минимум/максимум считаются встроенными функциями (map/min/max на уровне C)
+по срезам memoryview, без загрузки всей истории в список Python-объектов.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import logging
+import math
+import mmap
+import operator
+import os
+import re
+from array import array
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from src.bot.services.rate_table import RateTable
+
+logger = logging.getLogger("bot")
+
+TIMESTAMPS_FILE = "timestamps.f64"
+COLUMN_SUFFIX = ".f64"
+ITEM_SIZE = array("d").itemsize
+
+# Допустимые коды валют (защита от произвольных имён файлов)
+CURRENCY_CODE_PATTERN = re.compile(r"^[A-Z]{3}$")
+
+
+@dataclass(frozen=True)
+class RateWindowStats:
+    """Статистика курса пары валют за окно времени."""
+
+    base_currency: str
+    target_currency: str
+    points: int
+    first_rate: float
+    last_rate: float
+    min_rate: float
+    max_rate: float
+    first_at: float
+    last_at: float
+
+    @property
+    def change(self) -> float:
+        return self.last_rate - self.first_rate
+
+    @property
+    def change_percent(self) -> float:
+        return self.change / self.first_rate * 100 if self.first_rate else 0.0
+
+
+class RateHistoryStore:
+    """
+    Колоночное хранилище истории курсов на диске.
+
+    Число строк определяется колонкой времени: она дописывается последней,
+    поэтому строка, недописанная из-за сбоя, не видна читателям
+    и обрезается при следующей записи.
+    """
+
+    def __init__(self, directory: str | Path, base_currency: str = "USD") -> None:
+        self._directory = Path(directory)
+        self._base_currency = base_currency
+
+    def append(self, table: RateTable) -> bool:
+        """
+        Дописывает таблицу курсов в историю.
+
+        Пропускает таблицу, если она не новее последней строки или курсы
+        не изменились. Возвращает True, если строка добавлена.
+        """
+        if table.base != self._base_currency:
+            logger.warning(
+                "Таблица с базой %s не записана в историю (ожидается %s)",
+                table.base,
+                self._base_currency,
+            )
+            return False
+
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            rows = self._row_count()
+            if rows and not self._is_new_row(table, rows):
+                return False
+
+            codes = {code for code in table.rates if CURRENCY_CODE_PATTERN.match(code)}
+            codes.update(self._stored_codes())
+            # Курс базовой валюты к самой себе всегда 1.0, колонка не нужна
+            codes.discard(self._base_currency)
+            for code in codes:
+                self._append_value(code, rows, table.rates.get(code, math.nan))
+            # Время пишем последним: оно фиксирует строку для читателей
+            with open(self._directory / TIMESTAMPS_FILE, "ab") as file:
+                array("d", [table.fetched_at]).tofile(file)
+            return True
+        except OSError as e:
+            logger.warning("Не удалось записать историю курсов: %s", e)
+            return False
+
+    def window_stats(
+        self, base_currency: str, target_currency: str, since: float
+    ) -> RateWindowStats | None:
+        """
+        Считает минимум, максимум и изменение курса пары с момента since.
+
+        Возвращает None, если по паре нет данных в окне.
+        """
+        rows = self._row_count()
+        if rows == 0:
+            return None
+
+        with ExitStack() as stack:
+            timestamps = self._map_column(stack, TIMESTAMPS_FILE, rows)
+            start = bisect.bisect_left(timestamps, since)
+            if start >= rows:
+                return None
+
+            target = self._pair_column(stack, target_currency, rows)
+            base = self._pair_column(stack, base_currency, rows)
+            if target is None or base is None:
+                return None
+
+            def pair_rates() -> Iterator[float]:
+                # Ленивый ряд курсов пары в окне: деление колонок поэлементно
+                return map(
+                    operator.truediv,
+                    _series(target, start, rows),
+                    _series(base, start, rows),
+                )
+
+            missing = sum(map(math.isnan, pair_rates()))
+            points = rows - start - missing
+            if points == 0:
+                return None
+
+            first_index = next(
+                i for i in range(start, rows) if not math.isnan(_pair_value(target, base, i))
+            )
+            last_index = next(
+                i for i in range(rows - 1, start - 1, -1)
+                if not math.isnan(_pair_value(target, base, i))
+            )
+            return RateWindowStats(
+                base_currency=base_currency,
+                target_currency=target_currency,
+                points=points,
+                first_rate=_pair_value(target, base, first_index),
+                last_rate=_pair_value(target, base, last_index),
+                min_rate=min(itertools.filterfalse(math.isnan, pair_rates())),
+                max_rate=max(itertools.filterfalse(math.isnan, pair_rates())),
+                first_at=timestamps[first_index],
+                last_at=timestamps[last_index],
+            )
+
+    def _pair_column(
+        self, stack: ExitStack, code: str, rows: int
+    ) -> memoryview | float | None:
+        """Колонка курса к базе хранилища; для самой базы — константа 1.0."""
+        if code == self._base_currency:
+            return 1.0
+        if not CURRENCY_CODE_PATTERN.match(code):
+            return None
+        path = self._directory / f"{code}{COLUMN_SUFFIX}"
+        if not path.exists():
+            return None
+        return self._map_column(stack, path.name, rows)
+
+    def _map_column(self, stack: ExitStack, name: str, rows: int) -> memoryview:
+        file = stack.enter_context(open(self._directory / name, "rb"))
+        mapped = stack.enter_context(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        view = memoryview(mapped)
+        stack.callback(view.release)
+        values = view[: rows * ITEM_SIZE].cast("d")
+        stack.callback(values.release)
+        return values
+
+    def _row_count(self) -> int:
+        try:
+            return os.path.getsize(self._directory / TIMESTAMPS_FILE) // ITEM_SIZE
+        except FileNotFoundError:
+            return 0
+
+    def _stored_codes(self) -> set[str]:
+        return {
+            path.name[: -len(COLUMN_SUFFIX)]
+            for path in self._directory.glob(f"*{COLUMN_SUFFIX}")
+            if path.name != TIMESTAMPS_FILE
+        }
+
+    def _is_new_row(self, table: RateTable, rows: int) -> bool:
+        with ExitStack() as stack:
+            timestamps = self._map_column(stack, TIMESTAMPS_FILE, rows)
+            if table.fetched_at <= timestamps[rows - 1]:
+                return False
+            for code, rate in table.rates.items():
+                if code == self._base_currency:
+                    continue
+                column = self._pair_column(stack, code, rows)
+                if isinstance(column, memoryview) and column[rows - 1] != rate:
+                    return True
+                if column is None and CURRENCY_CODE_PATTERN.match(code):
+                    return True  # Появилась новая валюта
+        return False
+
+    def _append_value(self, code: str, rows: int, value: float) -> None:
+        path = self._directory / f"{code}{COLUMN_SUFFIX}"
+        with open(path, "a+b") as file:
+            size = file.seek(0, os.SEEK_END)
+            stored_rows = size // ITEM_SIZE
+            if stored_rows > rows:
+                # Хвост после сбоя: обрезаем до зафиксированного числа строк
+                file.truncate(rows * ITEM_SIZE)
+            elif stored_rows < rows:
+                # Новая валюта: дополняем пропусками до текущей строки
+                array("d", itertools.repeat(math.nan, rows - stored_rows)).tofile(file)
+            array("d", [value]).tofile(file)
+
+
+def _series(column: memoryview | float, start: int, rows: int) -> Iterable[float]:
+    if isinstance(column, float):
+        return itertools.repeat(column, rows - start)
+    return column[start:rows]
+
+
+def _pair_value(target: memoryview | float, base: memoryview | float, index: int) -> float:
+    target_value = target if isinstance(target, float) else target[index]
+    base_value = base if isinstance(base, float) else base[index]
+    return target_value / base_value
@@ -0,0 +1,269 @@
+"""
+Провайдеры таблицы курсов валют.
+
+Содержит общий интерфейс и реализации:
+- HttpRateProvider — API в формате open.er-api.com (в том числе локальная заглушка);
+- FileRateProvider — файл с ответом в том же формате, для работы без сети;
+- FailoverRateProvider — упорядоченный список провайдеров с переключением
+  при ошибках и учётом задержек каждого провайдера.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol, Sequence
+
+import aiohttp
+
+from src.bot.services.rate_table import RateTable
+
+logger = logging.getLogger("bot")
+
+# Провайдер по умолчанию: бесплатный API без ключа
+OPEN_ER_API_URL = "https://open.er-api.com/v6/latest"
+OPEN_ER_API_SPEC = "open_er_api"
+
+# Префикс спецификации файлового провайдера: file:/path/to/rates.json
+FILE_PROVIDER_PREFIX = "file:"
+
+# Таймаут одного провайдера, после которого переключаемся на следующий
+DEFAULT_PROVIDER_TIMEOUT_SEC = 5.0
+
+# Верхняя граница HTTP-запроса, если провайдер используется вне цепочки
+HTTP_REQUEST_TIMEOUT_SEC = 15
+
+# Сколько ошибок подряд переводят провайдера в режим паузы
+FAILURES_BEFORE_COOLDOWN = 3
+DEFAULT_COOLDOWN_SEC = 60.0
+
+# Коэффициент сглаживания EWMA задержки
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class RateProviderError(Exception):
+    """Исключение, когда провайдер не смог вернуть таблицу курсов."""
+
+
+class RateProvider(Protocol):
+    """Контракт провайдера таблицы курсов."""
+
+    name: str
+
+    async def fetch_table(self, base_currency: str) -> RateTable: ...
+
+    async def aclose(self) -> None: ...
+
+
+def parse_open_er_api_payload(data: dict[str, Any]) -> RateTable:
+    """
+    Разбирает ответ в формате open.er-api.com в таблицу курсов.
+
+    Формат: {"result": "success", "base_code": "USD", "rates": {...}}.
+    """
+    if data.get("result") != "success":
+        raise RateProviderError(f"API вернул ошибку: {data.get('error', 'Unknown error')}")
+
+    rates = data.get("rates")
+    if not rates:
+        raise RateProviderError("Не найдено поле rates в ответе API")
+
+    try:
+        parsed_rates = {str(code): float(value) for code, value in rates.items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        raise RateProviderError(f"Ошибка парсинга курсов: {e}") from e
+
+    return RateTable(
+        base=str(data.get("base_code", "")),
+        rates=parsed_rates,
+        fetched_at=time.time(),
+    )
+
+
+class HttpRateProvider(RateProvider):
+    """
+    Провайдер для API в формате open.er-api.com.
+
+    URL запроса: {base_url}/{BASE_CURRENCY}. Подходит и для локальной
+    HTTP-заглушки, отдающей ответ в том же формате.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OPEN_ER_API_URL,
+        name: str | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        self.name = name or base_url
+        self._base_url = base_url.rstrip("/")
+        self._own_session = session is None
+        self._session = session or aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT_SEC)
+        )
+
+    async def fetch_table(self, base_currency: str) -> RateTable:
+        url = f"{self._base_url}/{base_currency}"
+        try:
+            async with self._session.get(url) as response:
+                if response.status != 200:
+                    response_text = await response.text()
+                    raise RateProviderError(
+                        f"Статус {response.status}, ответ: {response_text[:200]}"
+                    )
+                data: dict[str, Any] = await response.json()
+        except aiohttp.ClientError as e:
+            raise RateProviderError(f"Сетевая ошибка: {e}") from e
+        except ValueError as e:
+            raise RateProviderError(f"Некорректный JSON: {e}") from e
+        return parse_open_er_api_payload(data)
+
+    async def aclose(self) -> None:
+        if self._own_session and not self._session.closed:
+            await self._session.close()
+
+
+class FileRateProvider(RateProvider):
+    """
+    Провайдер-заглушка, читающий таблицу из файла.
+
+    Файл содержит ответ в формате open.er-api.com и перечитывается
+    при каждом запросе, поэтому его можно менять без перезапуска.
+    Базовая валюта берётся из файла, запрошенная игнорируется.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self.name = f"{FILE_PROVIDER_PREFIX}{self._path}"
+
+    async def fetch_table(self, base_currency: str) -> RateTable:
+        try:
+            raw = await asyncio.to_thread(self._path.read_bytes)
+            data: dict[str, Any] = json.loads(raw)
+        except (OSError, ValueError) as e:
+            raise RateProviderError(f"Не удалось прочитать {self._path}: {e}") from e
+        return parse_open_er_api_payload(data)
+
+    async def aclose(self) -> None:
+        return
+
+
+@dataclass
+class ProviderStats:
+    """Статистика вызовов одного провайдера."""
+
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency_ewma_ms: float | None = None
+    last_error: str | None = None
+    cooldown_until: float = 0.0
+
+    def record_latency(self, latency_ms: float) -> None:
+        if self.latency_ewma_ms is None:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms += LATENCY_EWMA_ALPHA * (latency_ms - self.latency_ewma_ms)
+
+
+class FailoverRateProvider(RateProvider):
+    """
+    Упорядоченная цепочка провайдеров с переключением при отказе.
+
+    Провайдеры опрашиваются по порядку, каждый — с собственным таймаутом.
+    После нескольких ошибок подряд провайдер уходит на паузу и опрашивается
+    в последнюю очередь, пока пауза не истечёт.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[RateProvider],
+        timeout_seconds: float = DEFAULT_PROVIDER_TIMEOUT_SEC,
+        cooldown_seconds: float = DEFAULT_COOLDOWN_SEC,
+    ) -> None:
+        if not providers:
+            raise ValueError("Нужен хотя бы один провайдер курсов")
+        self._providers = list(providers)
+        self._timeout_seconds = timeout_seconds
+        self._cooldown_seconds = cooldown_seconds
+        self._stats: dict[str, ProviderStats] = {p.name: ProviderStats() for p in providers}
+        self.name = "failover(" + ",".join(p.name for p in providers) + ")"
+
+    def stats(self) -> dict[str, ProviderStats]:
+        """Возвращает статистику по каждому провайдеру."""
+        return dict(self._stats)
+
+    async def fetch_table(self, base_currency: str) -> RateTable:
+        errors: list[str] = []
+        for provider in self._ordered_providers():
+            stats = self._stats[provider.name]
+            started = time.perf_counter()
+            try:
+                table = await asyncio.wait_for(
+                    provider.fetch_table(base_currency), timeout=self._timeout_seconds
+                )
+            except (RateProviderError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+                self._record_failure(stats, error)
+                errors.append(f"{provider.name}: {error}")
+                logger.warning("Провайдер курсов %s недоступен: %s", provider.name, error)
+                continue
+
+            stats.record_latency((time.perf_counter() - started) * 1000)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.cooldown_until = 0.0
+            return table
+
+        raise RateProviderError("Все провайдеры курсов недоступны: " + "; ".join(errors))
+
+    async def aclose(self) -> None:
+        for provider in self._providers:
+            await provider.aclose()
+
+    def _ordered_providers(self) -> list[RateProvider]:
+        now = time.monotonic()
+        ready = [p for p in self._providers if self._stats[p.name].cooldown_until <= now]
+        cooling = [p for p in self._providers if self._stats[p.name].cooldown_until > now]
+        return ready + cooling
+
+    def _record_failure(self, stats: ProviderStats, error: str) -> None:
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.last_error = error
+        if stats.consecutive_failures >= FAILURES_BEFORE_COOLDOWN:
+            stats.cooldown_until = time.monotonic() + self._cooldown_seconds
+
+
+def build_rate_provider(
+    specs: Sequence[str],
+    timeout_seconds: float = DEFAULT_PROVIDER_TIMEOUT_SEC,
+) -> RateProvider:
+    """
+    Фабрика цепочки провайдеров по списку спецификаций.
+
+    Поддерживаемые спецификации:
+    - "open_er_api" — публичный open.er-api.com;
+    - "http://..." / "https://..." — API в формате open.er-api.com;
+    - "file:/path/rates.json" — файловая заглушка.
+    """
+    providers: list[RateProvider] = []
+    for raw_spec in specs:
+        spec = raw_spec.strip()
+        if not spec:
+            continue
+        if spec == OPEN_ER_API_SPEC:
+            providers.append(HttpRateProvider(OPEN_ER_API_URL, name=OPEN_ER_API_SPEC))
+        elif spec.startswith(FILE_PROVIDER_PREFIX):
+            providers.append(FileRateProvider(spec[len(FILE_PROVIDER_PREFIX):]))
+        elif spec.startswith(("http://", "https://")):
+            providers.append(HttpRateProvider(spec))
+        else:
+            raise ValueError(f"Неизвестный провайдер курсов: {spec}")
+
+    if not providers:
+        providers.append(HttpRateProvider(OPEN_ER_API_URL, name=OPEN_ER_API_SPEC))
+    return FailoverRateProvider(providers, timeout_seconds=timeout_seconds)
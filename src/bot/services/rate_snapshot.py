@@ -0,0 +1,88 @@
+"""
+Хранилище снимков таблицы курсов на диске.
+
+Снимок позволяет после перезапуска сразу отвечать на /convert
+без обращения к внешнему API и работать при его недоступности.
+Формат — компактный JSON с версией, базовой валютой и временем получения.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from src.bot.services.rate_table import RateTable
+
+logger = logging.getLogger("bot")
+
+# Версия формата снимка: при несовпадении снимок игнорируется
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class RateSnapshotStore:
+    """Читает и атомарно записывает снимок таблицы курсов в файл."""
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> RateTable | None:
+        """
+        Загружает снимок с диска.
+
+        Возвращает None, если файла нет, он повреждён или записан
+        в другой версии формата.
+        """
+        try:
+            raw = self._path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning("Не удалось прочитать снимок курсов %s: %s", self._path, e)
+            return None
+
+        try:
+            data: dict[str, Any] = json.loads(raw)
+            if data.get("v") != SNAPSHOT_FORMAT_VERSION:
+                logger.warning("Неподдерживаемая версия снимка курсов: %s", data.get("v"))
+                return None
+            rates = {str(code): float(value) for code, value in data["rates"].items()}
+            return RateTable(
+                base=str(data["base"]),
+                rates=rates,
+                fetched_at=float(data["ts"]),
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Снимок курсов %s повреждён: %s", self._path, e)
+            return None
+
+    def save(self, table: RateTable) -> None:
+        """
+        Сохраняет снимок на диск.
+
+        Запись идёт во временный файл с последующей атомарной заменой,
+        поэтому при падении процесса старый снимок остаётся целым.
+        Ошибки записи логируются и не пробрасываются.
+        """
+        payload = {
+            "v": SNAPSHOT_FORMAT_VERSION,
+            "base": table.base,
+            "ts": table.fetched_at,
+            "rates": table.rates,
+        }
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(
+                json.dumps(payload, separators=(",", ":")),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.warning("Не удалось сохранить снимок курсов %s: %s", self._path, e)
@@ -0,0 +1,43 @@
+"""
+Модель таблицы курсов валют.
+
+Таблица хранит курсы всех валют относительно одной базовой валюты
+и момент её получения. Кросс-курсы считаются через базовую валюту.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Курсы валют относительно базовой валюты."""
+
+    base: str
+    rates: dict[str, float]
+    fetched_at: float  # Unix-время получения таблицы
+
+    def cross_rate(self, base_currency: str, target_currency: str) -> float | None:
+        """
+        Возвращает курс base_currency -> target_currency.
+
+        Курс считается через базовую валюту таблицы:
+        1 base_currency = rates[target] / rates[base] target_currency.
+        Если одной из валют нет в таблице, возвращает None.
+        """
+        if base_currency == target_currency:
+            return 1.0
+
+        base_rate = self.rates.get(base_currency)
+        target_rate = self.rates.get(target_currency)
+        if not base_rate or target_rate is None:
+            return None
+        return target_rate / base_rate
+
+    def age_seconds(self, now: float | None = None) -> float:
+        """Возвращает возраст таблицы в секундах (не меньше нуля)."""
+        current = time.time() if now is None else now
+        return max(0.0, current - self.fetched_at)
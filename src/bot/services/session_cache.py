@@ -0,0 +1,199 @@
+"""
+Локальный кэш состояния сессий ChatGPT.
+
+Почти все сообщения приходят от пользователей вне режима ChatGPT, и каждое
+раньше стоило запроса EXISTS в Redis только ради того, чтобы уйти в эхо.
+Кэш хранит активные сессии (с их TTL) и недавно проверенных неактивных
+пользователей; start_session/stop_session обновляют его сразу.
+Точное множество вместо фильтра Блума: активных сессий немного, а
+ложноположительный ответ отправил бы обычное сообщение в LLM.
+CachedSessionRepository оборачивает репозиторий истории этим кэшем.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+    from src.bot.services.history import ChatHistoryRepository, Message
+
+logger = logging.getLogger("bot")
+
+# Сколько помнить, что пользователь не в режиме ChatGPT
+DEFAULT_NEGATIVE_TTL_SEC = 300.0
+# Предел записей о неактивных пользователях (вытесняются самые давние)
+NEGATIVE_CACHE_LIMIT = 100_000
+# Канал Redis, через который процессы узнают о старте/остановке сессий
+SESSION_EVENTS_CHANNEL = "chat_session_events"
+
+
+class ActiveSessionCache:
+    """
+    Кэш "пользователь в режиме ChatGPT или нет".
+
+    Записи о неактивных пользователях хранятся в порядке добавления,
+    поэтому устаревшие вычищаются с начала без полного перебора.
+    """
+
+    def __init__(
+        self,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._negative_ttl = negative_ttl_seconds
+        self._clock = clock
+        self._active: dict[int, float] = {}
+        self._inactive: OrderedDict[int, float] = OrderedDict()
+
+    def get(self, user_id: int) -> bool | None:
+        """Возвращает известное состояние или None, если надо спросить хранилище."""
+        now = self._clock()
+        expires_at = self._active.get(user_id)
+        if expires_at is not None:
+            if expires_at > now:
+                return True
+            del self._active[user_id]
+        expires_at = self._inactive.get(user_id)
+        if expires_at is not None:
+            if expires_at > now:
+                return False
+            del self._inactive[user_id]
+        return None
+
+    def mark_active(self, user_id: int, ttl_seconds: float) -> None:
+        self._inactive.pop(user_id, None)
+        self._active[user_id] = self._clock() + ttl_seconds
+
+    def extend(self, user_id: int, ttl_seconds: float) -> None:
+        """Продлевает активную сессию; неизвестную или неактивную не трогает."""
+        if self.get(user_id):
+            self._active[user_id] = self._clock() + ttl_seconds
+
+    def mark_inactive(self, user_id: int) -> None:
+        self._active.pop(user_id, None)
+        now = self._clock()
+        self._inactive.pop(user_id, None)
+        self._inactive[user_id] = now + self._negative_ttl
+        self._evict_inactive(now)
+
+    def forget(self, user_id: int) -> None:
+        """Сбрасывает запись: следующий запрос пойдёт в хранилище."""
+        self._active.pop(user_id, None)
+        self._inactive.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._active.clear()
+        self._inactive.clear()
+
+    def _evict_inactive(self, now: float) -> None:
+        while self._inactive:
+            user_id, expires_at = next(iter(self._inactive.items()))
+            if expires_at > now and len(self._inactive) <= NEGATIVE_CACHE_LIMIT:
+                break
+            del self._inactive[user_id]
+
+
+class CachedSessionRepository:
+    """
+    Обёртка репозитория с локальным кэшем состояния сессий.
+
+    is_active отвечает из памяти процесса; хранилище опрашивается только
+    при промахе кэша. При нескольких процессах старт и остановка сессии
+    рассылаются через Redis Pub/Sub, и остальные процессы сбрасывают запись.
+    """
+
+    def __init__(
+        self,
+        inner: ChatHistoryRepository,
+        cache: ActiveSessionCache,
+        session_ttl_seconds: float,
+        events: Redis | None = None,
+        channel: str = SESSION_EVENTS_CHANNEL,
+    ) -> None:
+        self._inner = inner
+        self._channel = channel
+        # Без TTL сессия бессрочна, но кэш всё равно перепроверяет её раз в сутки
+        self._session_ttl = session_ttl_seconds or 60 * 60 * 24
+        self._cache = cache
+        self._events = events
+        self._listener: asyncio.Task | None = None
+
+    async def start_session(self, user_id: int) -> None:
+        await self._inner.start_session(user_id)
+        self._cache.mark_active(user_id, self._session_ttl)
+        await self._publish(user_id)
+
+    async def stop_session(self, user_id: int) -> None:
+        await self._inner.stop_session(user_id)
+        self._cache.mark_inactive(user_id)
+        await self._publish(user_id)
+
+    async def is_active(self, user_id: int) -> bool:
+        self._ensure_listener()
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+        active = await self._inner.is_active(user_id)
+        if active:
+            self._cache.mark_active(user_id, self._session_ttl)
+        else:
+            self._cache.mark_inactive(user_id)
+        return active
+
+    async def add_user_message(self, user_id: int, content: str) -> None:
+        await self._inner.add_user_message(user_id, content)
+        self._cache.extend(user_id, self._session_ttl)
+
+    async def add_assistant_message(self, user_id: int, content: str) -> None:
+        # Ответ, пришедший после /stop, не возвращает пользователя в режим
+        await self._inner.add_assistant_message(user_id, content)
+        self._cache.extend(user_id, self._session_ttl)
+
+    async def get_history(self, user_id: int) -> list[Message]:
+        return await self._inner.get_history(user_id)
+
+    async def trim(self, user_id: int) -> None:
+        await self._inner.trim(user_id)
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self._inner.aclose()
+
+    async def _publish(self, user_id: int) -> None:
+        if self._events is None:
+            return
+        try:
+            await self._events.publish(self._channel, user_id)
+        except Exception as e:
+            logger.warning("Не удалось разослать событие сессии: %s", e)
+
+    def _ensure_listener(self) -> None:
+        if self._events is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        assert self._events is not None
+        while True:
+            try:
+                async with self._events.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    # События до подписки могли пройти мимо: начинаем с пустого кэша
+                    self._cache.clear()
+                    async for event in pubsub.listen():
+                        if event.get("type") == "message":
+                            self._cache.forget(int(event["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Подписка на события сессий прервана: %s", e)
+            await asyncio.sleep(1)
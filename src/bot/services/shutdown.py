@@ -0,0 +1,103 @@
+"""
+Корректная остановка: дожидаемся начатой работы, прежде чем закрывать ресурсы.
+
+Если закрыть HTTP-сессию LLM и репозиторий истории сразу после остановки
+приёма апдейтов, обработчики, ещё ждущие ответа модели, упадут посреди
+запроса: пользователь не получит ответа, а квота уже списана. Поэтому
+порядок такой: перестать принимать апдейты, дождаться начатых (не дольше
+таймаута, остальные отменить) и только потом закрывать сессии и пулы.
+Записи в историю обработчик делает сам и дожидается их, отложенной записи
+нет: дождавшись обработчиков, мы дожидаемся и истории.
+
+Все этапы ожидания делят один срок (ShutdownDeadline), поэтому остановка
+укладывается в SHUTDOWN_TIMEOUT_SEC, сколько бы этапов ни было.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+logger = logging.getLogger("bot")
+
+
+@dataclass(frozen=True)
+class DrainResult:
+    """Итог ожидания: сколько задач завершилось само и сколько прервано."""
+
+    drained: int = 0
+    aborted: int = 0
+
+
+async def drain_tasks(tasks: Iterable[asyncio.Task], timeout: float) -> DrainResult:
+    """Ждёт задачи не дольше timeout секунд, оставшиеся отменяет и дожидается их отмены."""
+    tasks = set(tasks)
+    if not tasks:
+        return DrainResult()
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        # Отменённые обработчики успевают вернуть квоту и закрыть индикаторы
+        await asyncio.gather(*pending, return_exceptions=True)
+    return DrainResult(drained=len(tasks) - len(pending), aborted=len(pending))
+
+
+class ShutdownDeadline:
+    """
+    Общий срок остановки: отсчёт начинается с первого обращения.
+
+    Каждый этап ожидания берёт remaining() — время, оставшееся от общего срока.
+    """
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._timeout = timeout
+        self._clock = clock
+        self._deadline: float | None = None
+
+    def remaining(self) -> float:
+        if self._deadline is None:
+            self._deadline = self._clock() + self._timeout
+        return max(0.0, self._deadline - self._clock())
+
+
+class InFlightTracker:
+    """
+    Учёт задач, обрабатывающих апдейты.
+
+    После drain() новые задачи не принимаются: track() возвращает False.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def track(self, task: asyncio.Task) -> bool:
+        """Начинает учёт задачи; False — идёт остановка, задачу брать нельзя."""
+        if self._closed:
+            return False
+        self._tasks.add(task)
+        return True
+
+    def untrack(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+
+    async def drain(self, timeout: float) -> DrainResult:
+        """Закрывает приём и ждёт учтённые задачи (см. drain_tasks)."""
+        self._closed = True
+        current = asyncio.current_task()
+        result = await drain_tasks((t for t in self._tasks if t is not current), timeout)
+        if result.drained or result.aborted:
+            logger.info(
+                "Остановка: дождались %s апдейтов, прервано %s",
+                result.drained,
+                result.aborted,
+            )
+        return result
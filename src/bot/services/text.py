@@ -2,9 +2,17 @@
 Сервис работы с текстами сообщений.
 
 Здесь нет зависимостей от aiogram и Telegram API.
-Все функции работают только с примитивными типами Python.
+Все функции работают только с примитивными типами Python
+(и исключениями сервисов, для текстов об ошибках).
 """
 
+from src.bot.services.llm import (
+    LLMTimeoutError,
+    ModelNotFoundError,
+    RateLimitError,
+    UpstreamError,
+)
+
 
 def make_echo_reply(text: str) -> str:
     """
@@ -80,6 +88,7 @@ def make_help_message() -> str:
         "• /chatgpt - Активировать режим ChatGPT (общение с LLM)\n"
         "• /stop - Выйти из режима ChatGPT\n"
         "• /convert - Конвертер валют\n"
+        "• /rates - История курсов (например, /rates usd rub 7)\n"
         "• /profile - Просмотреть профиль\n"
         "• /premium - Информация о Premium подписке\n"
         "• /language - Изменить язык интерфейса\n"
@@ -89,3 +98,44 @@ def make_help_message() -> str:
     )
 
 
+def make_llm_error_message(error: Exception) -> str:
+    """
+    Возвращает текст для пользователя об ошибке запроса к LLM.
+
+    Общий для обработчика режима ChatGPT и воркеров очереди LLM.
+    """
+    if isinstance(error, RateLimitError):
+        return (
+            "⏳ Превышен лимит запросов к бесплатной модели.\n\n"
+            "Бесплатные модели имеют ограничения:\n"
+            "• 20 запросов/день без кредитов\n"
+            "• 200 запросов/день с кредитами $5+\n\n"
+            "Попробуйте позже или используйте команду /stop для выхода из режима."
+        )
+    if isinstance(error, ModelNotFoundError):
+        return (
+            "❌ Модель временно недоступна.\n\n"
+            "Обратитесь к администратору для настройки другой модели."
+        )
+    if isinstance(error, LLMTimeoutError):
+        return (
+            "⏳ Превышено время ожидания ответа модели. "
+            "Попробуйте ещё раз или выйдите из режима /stop."
+        )
+    if isinstance(error, UpstreamError):
+        return (
+            "❌ Провайдер временно недоступен. "
+            "Попробуйте позже или используйте /stop для выхода из режима."
+        )
+    return (
+        "❌ Произошла ошибка при обработке запроса.\n\n"
+        "Попробуйте позже или используйте команду /stop для выхода из режима."
+    )
+
+
+def make_delivery_error_message() -> str:
+    """Текст для пользователя: модель ответила, но ответ не удалось доставить."""
+    return (
+        "❌ Не удалось доставить ответ модели.\n\n"
+        "Повторите вопрос или используйте команду /stop для выхода из режима."
+    )
@@ -0,0 +1,207 @@
+"""
+Ограничение частоты запросов пользователей (token bucket).
+
+У каждого пользователя свои "вёдра" токенов на разные виды нагрузки:
+сообщения в LLM, конвертер валют и дешёвые команды. Запрос забирает токен,
+токены восполняются с постоянной скоростью до ёмкости ведра.
+Premium-пользователи получают более ёмкие и быстрые вёдра.
+
+Два хранилища состояния:
+- MemoryThrottleBackend — в памяти процесса;
+- RedisThrottleBackend — атомарный Lua-скрипт, общий для всех реплик.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+from redis.asyncio import Redis
+
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+
+logger = logging.getLogger("bot")
+
+BUCKET_LLM = "llm"
+BUCKET_CONVERT = "convert"
+BUCKET_COMMAND = "command"
+# Ведро для ответа "слишком часто": не чаще раза в cooldown
+BUCKET_NOTICE = "notice"
+
+# Сколько вёдер помнить в памяти (вытесняются давно не использованные)
+MEMORY_BUCKETS_LIMIT = 100_000
+
+
+@dataclass(frozen=True)
+class ThrottleRule:
+    """Параметры ведра: ёмкость (всплеск) и скорость восполнения в токенах/сек."""
+
+    capacity: float
+    refill_per_second: float
+
+    def __post_init__(self) -> None:
+        if self.capacity <= 0 or self.refill_per_second <= 0:
+            raise ValueError("Ёмкость и скорость восполнения должны быть положительными")
+
+
+THROTTLE_TIERS: dict[str, dict[str, ThrottleRule]] = {
+    TIER_FREE: {
+        BUCKET_LLM: ThrottleRule(capacity=5, refill_per_second=1 / 10),
+        BUCKET_CONVERT: ThrottleRule(capacity=10, refill_per_second=1),
+        BUCKET_COMMAND: ThrottleRule(capacity=20, refill_per_second=2),
+    },
+    TIER_PREMIUM: {
+        BUCKET_LLM: ThrottleRule(capacity=20, refill_per_second=1 / 2),
+        BUCKET_CONVERT: ThrottleRule(capacity=30, refill_per_second=3),
+        BUCKET_COMMAND: ThrottleRule(capacity=60, refill_per_second=6),
+    },
+}
+
+
+class ThrottleBackend(Protocol):
+    """Контракт хранилища вёдер."""
+
+    async def consume(self, key: str, rule: ThrottleRule, cost: float = 1) -> float:
+        """Забирает cost токенов. Возвращает 0 или сколько секунд ждать."""
+        ...
+
+    async def aclose(self) -> None: ...
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """Вёдра в памяти процесса (для одного процесса и локальной отладки)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def consume(self, key: str, rule: ThrottleRule, cost: float = 1) -> float:
+        now = self._clock()
+        tokens, updated_at = self._buckets.pop(key, (rule.capacity, now))
+        tokens = min(rule.capacity, tokens + (now - updated_at) * rule.refill_per_second)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rule.refill_per_second
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > MEMORY_BUCKETS_LIMIT:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    async def aclose(self) -> None:
+        return
+
+
+# Токены и время хранятся в хэше; время берётся из Redis, чтобы реплики
+# с расходящимися часами считали одинаково. Возвращает строку: иначе
+# Redis обрезал бы дробное время ожидания до целого.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisThrottleBackend(ThrottleBackend):
+    """Вёдра в Redis: проверка и списание — один атомарный скрипт."""
+
+    def __init__(self, redis: Redis, key_prefix: str = "throttle:") -> None:
+        self._redis = redis
+        self._key_prefix = key_prefix
+        self._script = redis.register_script(TOKEN_BUCKET_LUA)
+
+    async def consume(self, key: str, rule: ThrottleRule, cost: float = 1) -> float:
+        result = await self._script(
+            keys=[f"{self._key_prefix}{key}"],
+            args=[rule.capacity, rule.refill_per_second, cost],
+        )
+        return float(result)
+
+    async def aclose(self) -> None:
+        # В redis-py до 5.0.1 метод назывался close
+        close = getattr(self._redis, "aclose", None) or self._redis.close
+        await close()
+
+
+class Throttler:
+    """
+    Проверка лимитов по видам нагрузки с учётом уровня пользователя.
+
+    Ошибки хранилища не блокируют пользователей: при недоступном Redis
+    запрос пропускается (fail-open) с записью в лог.
+    """
+
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        notice_cooldown_seconds: float,
+        tiers: dict[str, dict[str, ThrottleRule]] | None = None,
+    ) -> None:
+        self._backend = backend
+        self._tiers = tiers or THROTTLE_TIERS
+        self._notice_rule = ThrottleRule(
+            capacity=1, refill_per_second=1 / max(notice_cooldown_seconds, 0.001)
+        )
+
+    async def check(self, user_id: int, bucket: str, tier: str = TIER_FREE) -> float:
+        """Возвращает 0, если запрос разрешён, иначе сколько секунд ждать."""
+        rules = self._tiers.get(tier) or self._tiers[TIER_FREE]
+        rule = rules.get(bucket)
+        if rule is None:
+            return 0.0
+        try:
+            return await self._backend.consume(f"{bucket}:{user_id}", rule)
+        except Exception as e:
+            logger.warning("Хранилище лимитов недоступно, запрос пропущен: %s", e)
+            return 0.0
+
+    async def should_notify(self, user_id: int, bucket: str) -> bool:
+        """Можно ли сообщить пользователю об ограничении (не чаще cooldown)."""
+        try:
+            retry_after = await self._backend.consume(
+                f"{BUCKET_NOTICE}:{bucket}:{user_id}", self._notice_rule
+            )
+        except Exception:
+            return False
+        return retry_after == 0
+
+    async def aclose(self) -> None:
+        await self._backend.aclose()
+
+
+def build_throttle_backend(backend: str, redis_url: str | None = None) -> ThrottleBackend:
+    """
+    Фабрика хранилища лимитов.
+
+    backend: "redis" или "memory". Без REDIS_URL используется память.
+    """
+    if backend.lower() == "redis" and redis_url:
+        redis_client = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+        return RedisThrottleBackend(redis_client)
+    return MemoryThrottleBackend()
+
+
+def format_retry_after(seconds: float) -> int:
+    """Округляет время ожидания вверх до целых секунд (минимум 1)."""
+    return max(1, math.ceil(seconds))
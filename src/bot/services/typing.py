@@ -0,0 +1,152 @@
+"""
+Общий планировщик индикатора "печатает" для чатов, ждущих ответа LLM.
+
+Раньше каждое сообщение в режиме ChatGPT заводило свою задачу с таймером,
+а индикатор уходил даже для ответов, пришедших за доли секунды.
+Теперь один фоновый цикл хранит чаты, ждущие ответа, и пачкой отправляет
+индикатор тем, чья очередь подошла: первый раз — только если ответ не пришёл
+за grace-период, дальше — раз в TYPING_INTERVAL_SEC, пока Telegram не
+погасил статус. Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+# Telegram показывает статус ~5 секунд, повторяем с запасом
+TYPING_INTERVAL_SEC = 4.0
+DEFAULT_GRACE_SEC = 1.0
+# Чаты, чья очередь подойдёт в ближайшие полсекунды, попадают в ту же пачку
+BATCH_SLACK_SEC = 0.5
+
+
+@dataclass(slots=True)
+class _ChatTyping:
+    """Состояние чата, ждущего ответа."""
+
+    # Сколько запросов чата ещё ждут ответа
+    waiting: int
+    # Когда отправить следующий индикатор
+    next_at: float
+    # Уходил ли индикатор хоть раз (иначе ответ пришёл в grace-период)
+    sent: bool = False
+
+
+class TypingTicker:
+    """
+    Индикатор "печатает" для множества чатов на одном таймере.
+
+    Несколько одновременных запросов из одного чата (например, в группе)
+    учитываются счётчиком: индикатор гаснет, когда ответ получили все.
+    """
+
+    def __init__(
+        self,
+        send_action: Callable[[int], Awaitable[Any]],
+        grace_seconds: float = DEFAULT_GRACE_SEC,
+        interval_seconds: float = TYPING_INTERVAL_SEC,
+        metrics: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._send_action = send_action
+        self._grace = grace_seconds
+        self._interval = interval_seconds
+        self._clock = clock
+        self._chats: dict[int, _ChatTyping] = {}
+        self._sending: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+
+        metrics = metrics or MetricsRegistry()
+        self._waiting_chats = metrics.gauge("typing_waiting_chats")
+        self._sent = metrics.counter("typing_actions_sent")
+        self._skipped = metrics.counter("typing_skipped_fast_replies")
+
+    def start(self, chat_id: int) -> None:
+        """Чат ждёт ответа: индикатор появится, если ответ задержится."""
+        state = self._chats.get(chat_id)
+        if state is not None:
+            state.waiting += 1
+            return
+        self._chats[chat_id] = _ChatTyping(waiting=1, next_at=self._clock() + self._grace)
+        self._waiting_chats.set(len(self._chats))
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def stop(self, chat_id: int) -> None:
+        """Ответ для чата получен (или запрос завершился ошибкой)."""
+        state = self._chats.get(chat_id)
+        if state is None:
+            return
+        state.waiting -= 1
+        if state.waiting > 0:
+            return
+        del self._chats[chat_id]
+        self._waiting_chats.set(len(self._chats))
+        if not state.sent:
+            self._skipped.inc()
+        # Индикатор, ещё ждущий в очереди отправки, после ответа не нужен
+        sending = self._sending.pop(chat_id, None)
+        if sending is not None:
+            sending.cancel()
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._chats
+
+    async def aclose(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        for task in self._sending.values():
+            task.cancel()
+        await asyncio.gather(*self._sending.values(), return_exceptions=True)
+        self._sending.clear()
+        self._chats.clear()
+        self._waiting_chats.set(0)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._chats:
+                await self._wakeup.wait()
+                continue
+            now = self._clock()
+            delay = min(state.next_at for state in self._chats.values()) - now
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        for chat_id, state in self._chats.items():
+            if state.next_at > now + BATCH_SLACK_SEC:
+                continue
+            state.next_at = now + self._interval
+            state.sent = True
+            # Предыдущий индикатор ещё не ушёл — второй не нужен
+            if chat_id not in self._sending:
+                self._sending[chat_id] = asyncio.create_task(self._send(chat_id))
+
+    async def _send(self, chat_id: int) -> None:
+        try:
+            await self._send_action(chat_id)
+            self._sent.inc()
+        except Exception as e:
+            # Не падаем из-за ошибок отправки "typing"
+            logger.debug("Не удалось отправить typing в чат %s: %s", chat_id, e)
+        finally:
+            if self._sending.get(chat_id) is asyncio.current_task():
+                del self._sending[chat_id]
@@ -0,0 +1,278 @@
+"""
+Учёт использования LLM и суточные квоты пользователей.
+
+Бесплатный ключ OpenRouter даёт 20–200 запросов в сутки на всех, и один
+активный пользователь может выбрать их за остальных. Сервис ведёт
+суточные (UTC) счётчики на пользователя: запросы, байты и токены промптов
+и ответов. Проверка квоты и списание запроса — одна атомарная операция
+(Lua-скрипт в Redis), поэтому лишнего обращения к хранилищу нет.
+
+Два хранилища:
+- MemoryUsageBackend — в памяти процесса;
+- RedisUsageBackend — хэш на пользователя и сутки с истечением, общий для реплик.
+Не зависит от aiogram и Telegram API.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import Callable, Protocol
+
+from redis.asyncio import Redis
+
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+
+logger = logging.getLogger("bot")
+
+DAILY_LIMITS: dict[str, int] = {TIER_FREE: 20, TIER_PREMIUM: 200}
+# Счётчики хранятся чуть дольше суток, чтобы пережить смену даты
+USAGE_TTL_SEC = 2 * 60 * 60 * 24
+# Грубая оценка: символов на токен (провайдер свой подсчёт не возвращает)
+CHARS_PER_TOKEN = 4
+
+
+class QuotaExceededError(Exception):
+    """Суточная квота запросов к LLM исчерпана."""
+
+    def __init__(self, limit: int, retry_after: float) -> None:
+        super().__init__(f"Квота {limit} запросов в сутки исчерпана")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+@dataclass
+class DailyUsage:
+    """Использование LLM пользователем за сутки."""
+
+    requests: int = 0
+    prompt_bytes: int = 0
+    response_bytes: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+
+    @classmethod
+    def from_mapping(cls, values: dict[str, str]) -> DailyUsage:
+        return cls(**{f.name: int(values.get(f.name, 0)) for f in fields(cls)})
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class UsageBackend(Protocol):
+    """Контракт хранилища счётчиков."""
+
+    async def reserve(self, key: str, limit: int) -> bool:
+        """Увеличивает счётчик запросов, если он меньше limit (0 — без предела)."""
+        ...
+
+    async def add(self, key: str, amounts: dict[str, int]) -> None: ...
+
+    async def get(self, key: str) -> DailyUsage: ...
+
+    async def aclose(self) -> None: ...
+
+
+class MemoryUsageBackend(UsageBackend):
+    """Счётчики в памяти процесса; записи прошлых суток удаляются при смене даты."""
+
+    def __init__(self) -> None:
+        self._day = ""
+        self._usage: dict[str, DailyUsage] = {}
+
+    async def reserve(self, key: str, limit: int) -> bool:
+        usage = self._current(key)
+        if limit and usage.requests >= limit:
+            return False
+        usage.requests += 1
+        return True
+
+    async def add(self, key: str, amounts: dict[str, int]) -> None:
+        usage = self._current(key)
+        for name, amount in amounts.items():
+            setattr(usage, name, getattr(usage, name) + amount)
+
+    async def get(self, key: str) -> DailyUsage:
+        return DailyUsage(**vars(self._usage.get(key, DailyUsage())))
+
+    async def aclose(self) -> None:
+        return
+
+    def _current(self, key: str) -> DailyUsage:
+        # Ключ начинается с даты: новые сутки — старые счётчики больше не нужны
+        day = key.partition(":")[0]
+        if day > self._day:
+            self._day = day
+            self._usage.clear()
+        if day < self._day:
+            # Возврат за прошедшие сутки: их счётчики уже сброшены
+            return DailyUsage()
+        return self._usage.setdefault(key, DailyUsage())
+
+
+# Проверка квоты и списание одним вызовом: параллельные запросы
+# не проскочат предел
+RESERVE_LUA = """
+local limit = tonumber(ARGV[1])
+local used = tonumber(redis.call('HGET', KEYS[1], 'requests') or '0')
+if limit > 0 and used >= limit then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'requests', 1)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RedisUsageBackend(UsageBackend):
+    """Счётчики в Redis: хэш на пользователя и сутки."""
+
+    def __init__(self, redis: Redis, key_prefix: str = "usage:") -> None:
+        self._redis = redis
+        self._key_prefix = key_prefix
+        self._script = redis.register_script(RESERVE_LUA)
+
+    async def reserve(self, key: str, limit: int) -> bool:
+        result = await self._script(keys=[self._key(key)], args=[limit, USAGE_TTL_SEC])
+        return bool(int(result))
+
+    async def add(self, key: str, amounts: dict[str, int]) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for name, amount in amounts.items():
+                pipe.hincrby(self._key(key), name, amount)
+            pipe.expire(self._key(key), USAGE_TTL_SEC)
+            await pipe.execute()
+
+    async def get(self, key: str) -> DailyUsage:
+        return DailyUsage.from_mapping(await self._redis.hgetall(self._key(key)))
+
+    async def aclose(self) -> None:
+        # В redis-py до 5.0.1 метод назывался close
+        close = getattr(self._redis, "aclose", None) or self._redis.close
+        await close()
+
+    def _key(self, key: str) -> str:
+        return f"{self._key_prefix}{key}"
+
+
+class UsageAccounting:
+    """
+    Суточные квоты и учёт использования LLM.
+
+    Ошибки хранилища не блокируют пользователей: при недоступном Redis
+    запрос пропускается (fail-open) с записью в лог.
+    """
+
+    def __init__(
+        self,
+        backend: UsageBackend,
+        limits: dict[str, int] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._backend = backend
+        self._limits = limits or DAILY_LIMITS
+        self._clock = clock
+
+    def limit_for(self, tier: str) -> int:
+        """Суточный предел запросов уровня (0 — без предела)."""
+        return self._limits.get(tier, self._limits.get(TIER_FREE, 0))
+
+    async def reserve(self, user_id: int, tier: str = TIER_FREE) -> str | None:
+        """
+        Списывает запрос из суточной квоты пользователя.
+
+        Returns:
+            Сутки, из квоты которых списан запрос (передаются в refund),
+            или None, если хранилище недоступно и запрос пропущен без списания
+
+        Raises:
+            QuotaExceededError: Квота на сегодня исчерпана
+        """
+        limit = self.limit_for(tier)
+        day = self._day()
+        try:
+            allowed = await self._backend.reserve(self._key(user_id, day), limit)
+        except Exception as e:
+            logger.warning("Хранилище квот недоступно, запрос пропущен: %s", e)
+            return None
+        if not allowed:
+            raise QuotaExceededError(limit, self._seconds_to_midnight())
+        return day
+
+    async def refund(self, user_id: int, day: str | None) -> None:
+        """
+        Возвращает запрос в квоту (модель так и не ответила).
+
+        Возврат идёт в те сутки, из которых запрос списан: запрос, списанный
+        до полуночи, не уменьшает счётчик следующих суток.
+        """
+        if day is None:
+            return
+        await self._add(user_id, {"requests": -1}, day)
+
+    async def record(
+        self,
+        user_id: int,
+        prompt: list[dict[str, str]],
+        response: str,
+        day: str | None = None,
+    ) -> None:
+        """
+        Учитывает объём промпта (вся отправленная история) и ответа.
+
+        day: сутки, из квоты которых списан запрос (см. reserve); объём
+        учитывается там же, даже если ответ пришёл после полуночи.
+        None — текущие сутки.
+        """
+        prompt_text = "".join(message.get("content", "") for message in prompt)
+        await self._add(
+            user_id,
+            {
+                "prompt_bytes": len(prompt_text.encode("utf-8")),
+                "response_bytes": len(response.encode("utf-8")),
+                "prompt_tokens": estimate_tokens(prompt_text),
+                "response_tokens": estimate_tokens(response),
+            },
+            day,
+        )
+
+    async def usage(self, user_id: int) -> DailyUsage:
+        try:
+            return await self._backend.get(self._key(user_id))
+        except Exception as e:
+            logger.warning("Хранилище квот недоступно: %s", e)
+            return DailyUsage()
+
+    async def aclose(self) -> None:
+        await self._backend.aclose()
+
+    async def _add(self, user_id: int, amounts: dict[str, int], day: str | None = None) -> None:
+        try:
+            await self._backend.add(self._key(user_id, day), amounts)
+        except Exception as e:
+            logger.warning("Не удалось учесть использование LLM: %s", e)
+
+    def _day(self) -> str:
+        return datetime.fromtimestamp(self._clock(), timezone.utc).strftime("%Y-%m-%d")
+
+    def _key(self, user_id: int, day: str | None = None) -> str:
+        return f"{day or self._day()}:{user_id}"
+
+    def _seconds_to_midnight(self) -> float:
+        return 60 * 60 * 24 - self._clock() % (60 * 60 * 24)
+
+
+def build_usage_backend(backend: str, redis_url: str | None = None) -> UsageBackend:
+    """
+    Фабрика хранилища счётчиков.
+
+    backend: "redis" или "memory". Без REDIS_URL используется память.
+    """
+    if backend.lower() == "redis" and redis_url:
+        redis_client = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+        return RedisUsageBackend(redis_client)
+    return MemoryUsageBackend()
@@ -0,0 +1,206 @@
+"""
+Общие сервисы процесса: сборка при запуске и закрытие при выходе.
+
+Пул соединений к провайдеру LLM, планировщик и контроль допуска, кэш
+ответов, очередь заданий LLM, лимиты, квоты, курсы валют, дедупликация
+апдейтов, хранилище FSM и клиент Redis для историй — по одному на процесс,
+сколько бы ботов он ни обслуживал (см. src.bot.application).
+"""
+
+from __future__ import annotations
+
+import math
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from aiogram.fsm.storage.base import BaseStorage
+from redis.asyncio import Redis
+
+from src.bot.config import BotConfig
+from src.bot.services.admission import AdmissionController
+from src.bot.services.currency import ExchangeRateService
+from src.bot.services.dedup import UpdateDeduplicator, build_update_deduplicator
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM, Entitlements
+from src.bot.services.llm import LLMClient
+from src.bot.services.llm_queue import LLMJobQueue, build_llm_queue
+from src.bot.services.llm_scheduler import LLMRequestScheduler
+from src.bot.services.model_router import build_model_router
+from src.bot.services.prompt_cache import PromptCache
+from src.bot.services.rate_history import RateHistoryStore
+from src.bot.services.rate_providers import build_rate_provider
+from src.bot.services.rate_snapshot import RateSnapshotStore
+from src.bot.services.shutdown import InFlightTracker, ShutdownDeadline
+from src.bot.services.throttling import Throttler, build_throttle_backend
+from src.bot.services.usage import UsageAccounting, build_usage_backend
+from src.bot.utils.fsm_storage import build_fsm_storage
+from src.bot.utils.metrics import MetricsRegistry
+
+
+@dataclass
+class SharedServices:
+    """Сервисы, общие для всех ботов процесса."""
+
+    metrics: MetricsRegistry
+    llm_client: LLMClient
+    admission: AdmissionController
+    prompt_cache: PromptCache | None
+    llm_queue: LLMJobQueue | None
+    entitlements: Entitlements
+    throttler: Throttler
+    usage: UsageAccounting | None
+    currency_service: ExchangeRateService
+    rate_history: RateHistoryStore | None
+    deduplicator: UpdateDeduplicator
+    fsm_storage: BaseStorage
+    # Общий пул соединений историй диалогов (None — история в памяти)
+    history_redis: Redis | None
+    # Обрабатываемые апдейты всех ботов: их дожидаются перед закрытием ресурсов
+    updates: InFlightTracker
+    # Один срок на все этапы остановки (SHUTDOWN_TIMEOUT_SEC)
+    shutdown: ShutdownDeadline
+
+
+@asynccontextmanager
+async def shared_services(
+    config: BotConfig, writes_rate_history: bool = True
+) -> AsyncIterator[SharedServices]:
+    """
+    Собирает общие сервисы; при выходе закрывает их.
+
+    Args:
+        config: Конфигурация приложения
+        writes_rate_history: Дописывать ли историю курсов. При нескольких
+            воркерах пишет только один, остальные только читают.
+    """
+    metrics = MetricsRegistry()
+
+    llm_client = LLMClient(
+        api_url=config.openrouter_api_url,
+        referer=config.llm_referer,
+        timeout_seconds=config.llm_timeout_sec,
+        retries=config.llm_retries,
+        router=build_model_router(config.llm_routing_mode, config.llm_routes, metrics),
+    )
+    # Места для запросов к LLM делятся между уровнями взвешенной честной очередью
+    llm_scheduler = LLMRequestScheduler(
+        max_in_flight=config.llm_max_in_flight,
+        premium_reserve=config.llm_premium_reserve,
+        aging_seconds=config.llm_scheduler_aging_sec,
+        metrics=metrics,
+    )
+    # При перегрузке провайдера новые запросы к LLM получают быстрый отказ
+    admission = AdmissionController(
+        llm_scheduler,
+        max_wait_seconds=config.llm_max_wait_sec if config.admission_enabled else math.inf,
+        metrics=metrics,
+    )
+    # Похожие первые вопросы получают уже готовый ответ без запроса к LLM
+    prompt_cache = (
+        PromptCache(
+            max_entries=config.prompt_cache_max_entries,
+            min_similarity=config.prompt_cache_similarity,
+            ttl_seconds=config.prompt_cache_ttl_sec,
+            metrics=metrics,
+        )
+        if config.prompt_cache_enabled
+        else None
+    )
+    # Ответы LLM готовят воркеры очереди (llm_worker.py), бот только ставит задания
+    llm_queue = (
+        build_llm_queue(
+            config.redis_url or "",
+            max_backlog=config.llm_queue_max_backlog,
+            max_attempts=config.llm_queue_max_attempts,
+            metrics=metrics,
+        )
+        if config.llm_queue_enabled
+        else None
+    )
+    throttler = Throttler(
+        build_throttle_backend(config.throttle_backend, redis_url=config.redis_url),
+        notice_cooldown_seconds=config.throttle_notice_cooldown_sec,
+    )
+    usage = (
+        UsageAccounting(
+            build_usage_backend(config.usage_backend, redis_url=config.redis_url),
+            limits={
+                TIER_FREE: config.usage_daily_limit_free,
+                TIER_PREMIUM: config.usage_daily_limit_premium,
+            },
+        )
+        if config.usage_enabled
+        else None
+    )
+
+    rate_history = (
+        RateHistoryStore(config.rates_history_dir) if config.rates_history_dir else None
+    )
+    # Сервис курсов валют: поднимаем снимок с диска, чтобы /convert работал сразу
+    currency_service = ExchangeRateService(
+        provider=build_rate_provider(
+            config.rate_providers,
+            timeout_seconds=config.rate_provider_timeout_sec,
+        ),
+        snapshot_store=(
+            RateSnapshotStore(config.rates_snapshot_path)
+            if config.rates_snapshot_path
+            else None
+        ),
+        ttl_seconds=config.rates_cache_ttl_sec,
+        history_store=rate_history if writes_rate_history else None,
+    )
+    await currency_service.warm_up()
+    # Курсы обновляются в фоне, чтобы inline-запросы всегда отвечали из памяти
+    currency_service.start_auto_refresh()
+
+    # Повторно доставленные апдейты отбрасываются раньше всего остального
+    deduplicator = build_update_deduplicator(
+        config.update_dedup_backend,
+        redis_url=config.redis_url,
+        ttl_seconds=config.update_dedup_ttl_sec,
+    )
+    # Состояния /convert с TTL; ключ включает id бота, поэтому хранилище общее
+    fsm_storage = build_fsm_storage(
+        config.fsm_storage_backend,
+        redis_url=config.redis_url,
+        ttl_seconds=config.fsm_state_ttl_sec,
+    )
+    history_redis = (
+        Redis.from_url(config.redis_url, encoding="utf-8", decode_responses=True)
+        if config.chat_history_backend.lower() == "redis" and config.redis_url
+        else None
+    )
+
+    try:
+        yield SharedServices(
+            metrics=metrics,
+            llm_client=llm_client,
+            admission=admission,
+            prompt_cache=prompt_cache,
+            llm_queue=llm_queue,
+            entitlements=Entitlements(config.premium_user_ids),
+            throttler=throttler,
+            usage=usage,
+            currency_service=currency_service,
+            rate_history=rate_history,
+            deduplicator=deduplicator,
+            fsm_storage=fsm_storage,
+            history_redis=history_redis,
+            updates=InFlightTracker(),
+            shutdown=ShutdownDeadline(config.shutdown_timeout_sec),
+        )
+    finally:
+        await llm_client.aclose()
+        if llm_queue is not None:
+            await llm_queue.aclose()
+        await throttler.aclose()
+        if usage is not None:
+            await usage.aclose()
+        await deduplicator.aclose()
+        await currency_service.aclose()
+        await fsm_storage.close()
+        if history_redis is not None:
+            # В redis-py до 5.0.1 метод назывался close
+            close = getattr(history_redis, "aclose", None) or history_redis.close
+            await close()
@@ -0,0 +1,299 @@
+"""
+Супервизор нескольких процессов-воркеров webhook.
+
+Один asyncio-процесс упирается в одно ядро: разбор JSON апдейтов,
+логирование и работа с историей складываются при большом потоке.
+Супервизор запускает N воркеров, каждый со своим Dispatcher и LLMClient;
+все слушают один порт через SO_REUSEPORT, и ядро распределяет соединения.
+
+Здесь выполняется:
+- однократная регистрация webhook и меню команд (воркеры этого не делают);
+- перезапуск упавших воркеров с нарастающей задержкой;
+- поочерёдный перезапуск по SIGHUP: новый воркер поднимается раньше,
+  чем останавливается старый, поэтому порт не остаётся без слушателя;
+- корректная остановка по SIGINT/SIGTERM: воркеры получают SIGTERM
+  и дожидаются уже принятых апдейтов.
+
+Общее между пользователями состояние (история диалогов, FSM) при нескольких
+воркерах должно жить в Redis — память у каждого процесса своя.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import socket
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+from aiogram import Bot, Dispatcher
+
+from src.bot.application import bot_application
+from src.bot.config import BOT_MODE_WEBHOOK, BotConfig, load_config
+from src.bot.routers import get_main_router
+from src.bot.utils.commands import set_bot_commands
+from src.bot.utils.logging import setup_logging
+from src.bot.webhook import register_webhook, run_webhook
+
+logger = logging.getLogger("bot")
+
+# Сколько ждать после запуска нового воркера, прежде чем гасить старый
+WORKER_START_GRACE_SEC = 5.0
+# Предельная задержка перед перезапуском упавшего воркера
+RESTART_BACKOFF_MAX_SEC = 30.0
+# Как часто супервизор проверяет состояние воркеров
+POLL_INTERVAL_SEC = 0.5
+
+
+def shared_state_problems(config: BotConfig) -> list[str]:
+    """Возвращает настройки, несовместимые с несколькими воркерами."""
+    if config.webhook_workers <= 1:
+        return []
+    # Настройка, её значение и что сломается, если состояние в памяти воркера
+    backends = [
+        (
+            "CHAT_HISTORY_BACKEND",
+            config.chat_history_backend,
+            "история диалогов разойдётся между воркерами",
+        ),
+        (
+            "FSM_STORAGE_BACKEND",
+            config.fsm_storage_backend,
+            "диалог /convert оборвётся, если шаги попадут в разные воркеры",
+        ),
+    ]
+    if config.throttle_enabled:
+        backends.append(
+            ("THROTTLE_BACKEND", config.throttle_backend, "у каждого воркера свои лимиты")
+        )
+    if config.usage_enabled:
+        backends.append(
+            ("USAGE_BACKEND", config.usage_backend, "у каждого воркера свои суточные квоты")
+        )
+
+    problems = []
+    for name, backend, consequence in backends:
+        if backend.lower() != "redis":
+            problems.append(f"{name}={backend}: {consequence}, используйте {name}=redis")
+    # Без REDIS_URL фабрики хранилищ молча откатываются на память
+    if not config.redis_url and any(backend.lower() == "redis" for _, backend, _ in backends):
+        problems.append(
+            "REDIS_URL не задан: хранилища с backend redis работают в памяти "
+            "каждого воркера"
+        )
+    return problems
+
+
+def per_worker_limitations(config: BotConfig) -> list[str]:
+    """
+    Возвращает возможности, которые при нескольких воркерах работают хуже.
+
+    Их состояние живёт в памяти процесса, а апдейты одного чата попадают
+    в разные воркеры. Настройкой это не исправить, поэтому это предупреждения,
+    а не ошибки конфигурации.
+    """
+    if config.webhook_workers <= 1:
+        return []
+    limitations = [
+        "порядок апдейтов соблюдается только внутри воркера: сообщения одного "
+        "чата, попавшие в разные воркеры, обрабатываются параллельно",
+        "/stop и новое сообщение отменяют запрос к LLM, только если попали "
+        "в тот же воркер, что и сам запрос",
+    ]
+    if config.chat_debounce_ms > 0:
+        limitations.append(
+            "CHAT_DEBOUNCE_MS: склеиваются только сообщения серии, попавшие "
+            "в один воркер, остальные уходят в LLM отдельными запросами"
+        )
+    return limitations
+
+
+@dataclass
+class WorkerSlot:
+    """Место воркера в пуле: текущий процесс и статистика перезапусков."""
+
+    index: int
+    process: BaseProcess | None = None
+    started_at: float = 0.0
+    crashes: int = 0
+    restart_at: float = 0.0
+
+
+class WorkerSupervisor:
+    """
+    Держит заданное число воркеров запущенными.
+
+    Args:
+        workers: Число воркеров
+        spawn: Фабрика, создающая (но не запускающая) процесс воркера по индексу
+        stop_timeout: Сколько ждать корректной остановки воркера перед kill()
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        spawn: Callable[[int], BaseProcess],
+        stop_timeout: float,
+    ) -> None:
+        self._slots = [WorkerSlot(index=i) for i in range(workers)]
+        self._spawn = spawn
+        self._stop_timeout = stop_timeout
+        self._stopping = False
+        self._restart_requested = False
+
+    @property
+    def slots(self) -> list[WorkerSlot]:
+        return self._slots
+
+    def request_stop(self) -> None:
+        self._stopping = True
+
+    def request_restart(self) -> None:
+        self._restart_requested = True
+
+    def run(self) -> None:
+        """Запускает воркеры и следит за ними до сигнала остановки."""
+        for slot in self._slots:
+            self._start(slot)
+        try:
+            while not self._stopping:
+                if self._restart_requested:
+                    self._restart_requested = False
+                    self.rolling_restart()
+                self.check_workers()
+                time.sleep(POLL_INTERVAL_SEC)
+        finally:
+            self.stop_all()
+
+    def check_workers(self, now: float | None = None) -> None:
+        """Планирует и выполняет перезапуск завершившихся воркеров."""
+        now = time.monotonic() if now is None else now
+        for slot in self._slots:
+            process = slot.process
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                logger.warning(
+                    "Воркер %s завершился с кодом %s", slot.index, process.exitcode
+                )
+                # Долго проработавший воркер не считается падающим в цикле
+                if now - slot.started_at > RESTART_BACKOFF_MAX_SEC:
+                    slot.crashes = 0
+                slot.crashes += 1
+                slot.restart_at = now + min(2 ** (slot.crashes - 1), RESTART_BACKOFF_MAX_SEC)
+                slot.process = None
+            if now >= slot.restart_at:
+                self._start(slot, now)
+
+    def rolling_restart(self) -> None:
+        """Поочерёдно заменяет воркеры, не оставляя порт без слушателя."""
+        logger.info("Поочерёдный перезапуск %s воркеров...", len(self._slots))
+        for slot in self._slots:
+            if self._stopping:
+                return
+            old = slot.process
+            self._start(slot)
+            if old is not None and old.is_alive():
+                time.sleep(WORKER_START_GRACE_SEC)
+                self._stop_process(old)
+
+    def stop_all(self) -> None:
+        """Посылает воркерам SIGTERM и ждёт их корректной остановки."""
+        processes = [slot.process for slot in self._slots if slot.process is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            self._stop_process(process)
+
+    def _start(self, slot: WorkerSlot, now: float | None = None) -> None:
+        process = self._spawn(slot.index)
+        process.start()
+        slot.process = process
+        slot.started_at = time.monotonic() if now is None else now
+        logger.info("Запущен воркер %s (pid %s)", slot.index, process.pid)
+
+    def _stop_process(self, process: BaseProcess) -> None:
+        if process.is_alive():
+            process.terminate()
+        process.join(self._stop_timeout)
+        if process.is_alive():
+            logger.warning(
+                "Воркер pid %s не остановился вовремя, завершаем принудительно",
+                process.pid,
+            )
+            process.kill()
+            process.join()
+
+
+def run_supervisor() -> None:
+    """Точка входа супервизора (см. supervisor.py в корне проекта)."""
+    setup_logging()
+    config = load_config()
+    if config.bot_mode != BOT_MODE_WEBHOOK:
+        raise RuntimeError("Супервизор работает только в режиме BOT_MODE=webhook")
+    if config.webhook_workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError(
+            "Платформа не поддерживает SO_REUSEPORT, используйте WEBHOOK_WORKERS=1"
+        )
+    problems = shared_state_problems(config)
+    if problems:
+        raise RuntimeError("; ".join(problems))
+    for limitation in per_worker_limitations(config):
+        logger.warning("WEBHOOK_WORKERS=%s: %s", config.webhook_workers, limitation)
+
+    asyncio.run(_register(config))
+
+    context = multiprocessing.get_context("spawn")
+    supervisor = WorkerSupervisor(
+        workers=config.webhook_workers,
+        spawn=lambda index: context.Process(
+            target=_worker_main, args=(index,), name=f"worker-{index}"
+        ),
+        # Запас сверх таймаута дренажа на закрытие сессий
+        stop_timeout=config.shutdown_timeout_sec + 5,
+    )
+    signal.signal(signal.SIGINT, lambda *_: supervisor.request_stop())
+    signal.signal(signal.SIGTERM, lambda *_: supervisor.request_stop())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: supervisor.request_restart())
+
+    logger.info("Супервизор запущен: %s воркеров", config.webhook_workers)
+    supervisor.run()
+    logger.info("Супервизор остановлен")
+
+
+async def _register(config: BotConfig) -> None:
+    """Регистрирует webhook и меню команд один раз на весь пул."""
+    bot = Bot(token=config.bot_token)
+    dp = Dispatcher()
+    dp.include_router(get_main_router())
+    try:
+        try:
+            await set_bot_commands(bot)
+        except Exception as e:
+            logger.error("Ошибка при установке меню команд: %s", e, exc_info=True)
+        await register_webhook(dp, bot, config)
+    finally:
+        await bot.session.close()
+
+
+def _worker_main(index: int) -> None:
+    """Точка входа процесса-воркера (запускается через spawn)."""
+    setup_logging()
+    config = load_config()
+    # SIGINT от терминала приходит и воркерам: останавливаемся через SIGTERM-путь
+    with suppress(KeyboardInterrupt):
+        asyncio.run(_run_worker(config, index))
+
+
+async def _run_worker(config: BotConfig, index: int) -> None:
+    # Историю курсов пишет один воркер, чтобы записи не пересекались
+    async with bot_application(config, writes_rate_history=index == 0) as (bot, dp):
+        logger.info("Воркер %s готов принимать апдейты", index)
+        await run_webhook(dp, bot, config, register=False, reuse_port=True)
@@ -1,14 +1,23 @@
 """
 Утилиты для работы с командами бота.
 
-Содержит единый список команд и установку меню.
+Содержит единый список команд, установку меню и таблицу диспетчеризации:
+команда из COMMANDS_SPEC разбирается один раз и находит обработчик
+обращением к словарю, без перебора фильтров всех роутеров по порядку.
 """
 
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Mapping
+
+from aiogram import Bot, Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.filters import Command, CommandObject, CommandStart
+from aiogram.types import BotCommand, Message
 
-from aiogram import Bot
-from aiogram.types import BotCommand
+# Префикс команд, который используют фильтры Command по умолчанию
+COMMAND_PREFIX = "/"
 
 
 @dataclass(frozen=True)
@@ -25,6 +34,7 @@ COMMANDS_SPEC: tuple[CommandSpec, ...] = (
     CommandSpec("chatgpt", "ChatGPT mode (Режим ChatGPT)"),
     CommandSpec("stop", "Stop ChatGPT mode (Выйти из режима ChatGPT)", in_menu=True),
     CommandSpec("convert", "Currency converter (Конвертер валют)"),
+    CommandSpec("rates", "Rate history (История курсов)"),
     CommandSpec("profile", "Profile (Профиль)"),
     CommandSpec("premium", "Premium"),
     CommandSpec("language", "Language (Язык)"),
@@ -55,3 +65,91 @@ async def set_bot_commands(bot: Bot) -> None:
     await bot.set_my_commands(commands)
     logger.info("Меню команд успешно установлено в Telegram")
 
+
+def parse_command(text: str | None) -> CommandObject | None:
+    """
+    Разбирает текст команды так же, как фильтр Command: "/name@bot args".
+
+    Возвращает None, если текст не начинается с префикса команды.
+    """
+    if not text or not text.startswith(COMMAND_PREFIX):
+        return None
+    full_command, *args = text.split(maxsplit=1)
+    name, _, mention = full_command[len(COMMAND_PREFIX) :].partition("@")
+    if not name:
+        return None
+    return CommandObject(
+        prefix=COMMAND_PREFIX,
+        command=name,
+        mention=mention or None,
+        args=args[0] if args else None,
+    )
+
+
+class CommandDispatchTable:
+    """
+    Таблица "имя команды -> обработчик", собранная из роутеров по COMMANDS_SPEC.
+
+    В таблицу попадают обработчики, у которых единственный фильтр —
+    простой Command/CommandStart (без magic, deep link и игнорирования
+    регистра). Остальные команды по-прежнему проходят цепочку роутеров.
+    """
+
+    def __init__(self, handlers: Mapping[str, HandlerObject]) -> None:
+        self._handlers = dict(handlers)
+
+    @classmethod
+    def compile(
+        cls, router: Router, specs: Iterable[CommandSpec] = COMMANDS_SPEC
+    ) -> CommandDispatchTable:
+        """Находит обработчики команд из specs в дереве роутеров (в порядке подключения)."""
+        found: dict[str, HandlerObject] = {}
+        for sub_router in router.chain_tail:
+            for handler in sub_router.message.handlers:
+                for name in _plain_command_names(handler):
+                    # Как и в цепочке роутеров, выигрывает первый подключённый
+                    found.setdefault(name, handler)
+        return cls({spec.name: found[spec.name] for spec in specs if spec.name in found})
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._handlers
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    async def resolve(
+        self, message: Message, bot: Bot
+    ) -> tuple[HandlerObject, CommandObject] | None:
+        """Возвращает обработчик и разобранную команду или None."""
+        command = parse_command(message.text or message.caption)
+        if command is None:
+            return None
+        handler = self._handlers.get(command.command)
+        if handler is None:
+            return None
+        if command.mention:
+            # Команда, адресованная другому боту в группе, не наша
+            me = await bot.me()
+            if not me.username or command.mention.lower() != me.username.lower():
+                return None
+        return handler, command
+
+
+def _plain_command_names(handler: HandlerObject) -> tuple[str, ...]:
+    if not handler.filters or len(handler.filters) != 1:
+        return ()
+    command_filter = handler.filters[0].callback
+    if type(command_filter) not in (Command, CommandStart):
+        return ()
+    if (
+        command_filter.prefix != COMMAND_PREFIX
+        or command_filter.ignore_case
+        or command_filter.ignore_mention
+        or command_filter.magic is not None
+        or getattr(command_filter, "deep_link", False)
+    ):
+        return ()
+    names = command_filter.commands
+    if not all(isinstance(name, str) for name in names):
+        return ()
+    return tuple(names)
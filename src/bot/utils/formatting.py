@@ -6,6 +6,8 @@
 
 from aiogram.types import Message, User
 
+from src.bot.services.usage import DailyUsage
+
 
 def format_user_for_log(message: Message) -> str:
     """
@@ -50,3 +52,19 @@ def format_user_profile(user: User | None) -> str:
         f"🌐 Язык: {user.language_code or 'не указан'}"
     )
 
+
+def format_usage(usage: DailyUsage, limit: int) -> str:
+    """
+    Формирует блок использования LLM за сегодня для профиля.
+
+    Args:
+        usage: Суточные счётчики пользователя
+        limit: Суточный предел запросов (0 — без предела)
+    """
+    requests = f"{usage.requests} из {limit}" if limit else str(usage.requests)
+    return (
+        f"📊 Использование ChatGPT сегодня\n\n"
+        f"💬 Запросов: {requests}\n"
+        f"📝 Токенов (оценка): {usage.prompt_tokens} в запросах, "
+        f"{usage.response_tokens} в ответах"
+    )
@@ -0,0 +1,218 @@
+"""
+Хранилища состояний FSM (диалог /convert) с TTL.
+
+Стандартное MemoryStorage aiogram не забывает брошенные диалоги и живёт
+в одном процессе. Здесь два хранилища:
+- MemoryFSMStorage — в памяти, просроченные записи вычищаются;
+- RedisFSMStorage — общее для всех воркеров; состояние и данные лежат
+  в одном хэше с коротким ключом и TTL, запись — один пайплайн.
+
+Чтение в пределах одного апдейта идёт в Redis один раз: get_state забирает
+и состояние, и данные, а следующие get_data/update_data того же апдейта
+берут их из снимка (снимок хранится в contextvar задачи апдейта).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import DEFAULT_DESTINY, BaseStorage, StateType, StorageKey
+from redis.asyncio import Redis
+
+FSM_BACKEND_MEMORY = "memory"
+FSM_BACKEND_REDIS = "redis"
+
+# Брошенный диалог /convert забывается через 30 минут
+DEFAULT_FSM_TTL_SEC = 30 * 60
+# Как часто память вычищает просроченные записи
+MEMORY_SWEEP_INTERVAL_SEC = 60.0
+
+# Поля хэша записи в Redis
+STATE_FIELD = "s"
+DATA_FIELD = "d"
+
+# Снимок записей, прочитанных в текущем апдейте: ключ -> (состояние, данные)
+_snapshot: ContextVar[dict[str, tuple[str | None, dict[str, Any]]] | None] = ContextVar(
+    "fsm_snapshot", default=None
+)
+
+
+def _state_name(state: StateType) -> str | None:
+    return state.state if isinstance(state, State) else state
+
+
+def build_fsm_key(key: StorageKey, prefix: str = "f") -> str:
+    """
+    Короткий ключ записи: f:<bot>:<chat>:<user>.
+
+    Тред, бизнес-подключение и destiny добавляются, только если заданы.
+    """
+    parts = [prefix, str(key.bot_id), str(key.chat_id), str(key.user_id)]
+    if key.thread_id:
+        parts.append(f"t{key.thread_id}")
+    if key.business_connection_id:
+        parts.append(f"b{key.business_connection_id}")
+    if key.destiny != DEFAULT_DESTINY:
+        parts.append(key.destiny)
+    return ":".join(parts)
+
+
+@dataclass(slots=True)
+class _MemoryRecord:
+    """Запись MemoryFSMStorage: состояние, данные и момент истечения."""
+
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+
+class MemoryFSMStorage(BaseStorage):
+    """Состояния FSM в памяти процесса с истечением по TTL."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_FSM_TTL_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._records: dict[StorageKey, _MemoryRecord] = {}
+        self._next_sweep = clock() + MEMORY_SWEEP_INTERVAL_SEC
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        self._write(key, "state", _state_name(state))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        record = self._read(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        self._write(key, "data", dict(data))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        record = self._read(key)
+        return dict(record.data) if record else {}
+
+    async def close(self) -> None:
+        self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _read(self, key: StorageKey) -> _MemoryRecord | None:
+        record = self._records.get(key)
+        if record is not None and self._ttl and record.expires_at <= self._clock():
+            del self._records[key]
+            return None
+        return record
+
+    def _write(self, key: StorageKey, name: str, value: Any) -> None:
+        now = self._clock()
+        record = self._read(key) or _MemoryRecord()
+        setattr(record, name, value)
+        record.expires_at = now + self._ttl
+        if record.state is None and not record.data:
+            self._records.pop(key, None)
+        else:
+            self._records[key] = record
+        if self._ttl and now >= self._next_sweep:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + MEMORY_SWEEP_INTERVAL_SEC
+        for key in [key for key, record in self._records.items() if record.expires_at <= now]:
+            del self._records[key]
+
+
+class RedisFSMStorage(BaseStorage):
+    """Состояния FSM в Redis: один хэш на пользователя в чате, с TTL."""
+
+    def __init__(
+        self, redis: Redis, ttl_seconds: float = DEFAULT_FSM_TTL_SEC, prefix: str = "f"
+    ) -> None:
+        self._redis = redis
+        self._ttl_ms = int(ttl_seconds * 1000)
+        self._prefix = prefix
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._write(key, STATE_FIELD, _state_name(state))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        redis_key = build_fsm_key(key, self._prefix)
+        record = await self._redis.hgetall(redis_key)
+        state = record.get(STATE_FIELD)
+        data = json.loads(record[DATA_FIELD]) if DATA_FIELD in record else {}
+        self._remember(redis_key, state, data)
+        return state
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        redis_key = build_fsm_key(key, self._prefix)
+        snapshot = _snapshot.get()
+        if snapshot is not None and redis_key in snapshot:
+            return dict(snapshot[redis_key][1])
+        raw = await self._redis.hget(redis_key, DATA_FIELD)
+        return json.loads(raw) if raw else {}
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        value = json.dumps(data, ensure_ascii=False, separators=(",", ":")) if data else None
+        await self._write(key, DATA_FIELD, value, data=dict(data))
+
+    async def close(self) -> None:
+        # В redis-py до 5.0.1 метод назывался close
+        close = getattr(self._redis, "aclose", None) or self._redis.close
+        await close()
+
+    async def _write(
+        self,
+        key: StorageKey,
+        field: str,
+        value: str | None,
+        data: dict[str, Any] | None = None,
+    ) -> None:
+        redis_key = build_fsm_key(key, self._prefix)
+        # Пустой хэш Redis удаляет сам, поэтому сброс записи — просто HDEL
+        async with self._redis.pipeline(transaction=True) as pipe:
+            if value is None:
+                pipe.hdel(redis_key, field)
+            else:
+                pipe.hset(redis_key, field, value)
+                if self._ttl_ms > 0:
+                    pipe.pexpire(redis_key, self._ttl_ms)
+            await pipe.execute()
+
+        snapshot = _snapshot.get()
+        if snapshot is not None and redis_key in snapshot:
+            state, cached_data = snapshot[redis_key]
+            if field == STATE_FIELD:
+                snapshot[redis_key] = (value, cached_data)
+            else:
+                snapshot[redis_key] = (state, data or {})
+
+    def _remember(self, redis_key: str, state: str | None, data: dict[str, Any]) -> None:
+        snapshot = _snapshot.get()
+        if snapshot is None:
+            snapshot = {}
+            _snapshot.set(snapshot)
+        snapshot[redis_key] = (state, data)
+
+
+def build_fsm_storage(
+    backend: str,
+    redis_url: str | None = None,
+    ttl_seconds: float = DEFAULT_FSM_TTL_SEC,
+) -> BaseStorage:
+    """
+    Фабрика хранилища FSM.
+
+    backend: "redis" или "memory". Без REDIS_URL используется память.
+    ttl_seconds: через сколько забывать брошенный диалог (0 — не забывать).
+    """
+    if backend.lower() == FSM_BACKEND_REDIS and redis_url:
+        redis_client = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+        return RedisFSMStorage(redis_client, ttl_seconds=ttl_seconds)
+    return MemoryFSMStorage(ttl_seconds=ttl_seconds)
@@ -23,7 +23,7 @@ def setup_logging() -> logging.Logger:
     logger.setLevel(logging.INFO)
 
     formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        "%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s"
     )
 
     # Обработчик для записи логов в файл
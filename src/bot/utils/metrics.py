@@ -0,0 +1,134 @@
+"""
+Простые метрики процесса: счётчики, текущие значения и тайминги.
+
+Метрики живут в памяти процесса; в webhook-режиме они отдаются
+по GET /metrics в текстовом виде "имя значение" (совместимо с Prometheus).
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+
+# Сколько последних замеров хранит сводка перцентилей
+SUMMARY_WINDOW = 1024
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+
+
+@dataclass
+class Counter:
+    """Монотонно растущий счётчик."""
+
+    value: float = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+@dataclass
+class Gauge:
+    """Текущее значение (глубина очереди, число активных задач)."""
+
+    value: float = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+@dataclass
+class Timing:
+    """Сводка длительностей: число замеров, сумма и максимум (в секундах)."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass
+class Summary:
+    """Перцентили по последним SUMMARY_WINDOW замерам (в секундах)."""
+
+    samples: deque = field(default_factory=lambda: deque(maxlen=SUMMARY_WINDOW))
+    count: int = 0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """Реестр метрик: метрика создаётся при первом обращении по имени."""
+
+    def __init__(self) -> None:
+        self._prefix = ""
+        self._counters: dict[str, Counter] = {}
+        self._gauges: dict[str, Gauge] = {}
+        self._timings: dict[str, Timing] = {}
+        self._summaries: dict[str, Summary] = {}
+
+    def scoped(self, prefix: str) -> MetricsRegistry:
+        """Реестр, чьи метрики попадают в этот же с префиксом к имени (например, на бота)."""
+        child = MetricsRegistry()
+        child._prefix = self._prefix + prefix
+        child._counters = self._counters
+        child._gauges = self._gauges
+        child._timings = self._timings
+        child._summaries = self._summaries
+        return child
+
+    def counter(self, name: str) -> Counter:
+        return self._counters.setdefault(self._prefix + name, Counter())
+
+    def gauge(self, name: str) -> Gauge:
+        return self._gauges.setdefault(self._prefix + name, Gauge())
+
+    def timing(self, name: str) -> Timing:
+        return self._timings.setdefault(self._prefix + name, Timing())
+
+    def summary(self, name: str) -> Summary:
+        return self._summaries.setdefault(self._prefix + name, Summary())
+
+    def snapshot(self) -> dict[str, float]:
+        """Возвращает плоский словарь {имя: значение} всех метрик."""
+        values: dict[str, float] = {}
+        for name, counter in self._counters.items():
+            values[name] = counter.value
+        for name, gauge in self._gauges.items():
+            values[name] = gauge.value
+        for name, timing in self._timings.items():
+            values[f"{name}_count"] = timing.count
+            values[f"{name}_sum"] = timing.total
+            values[f"{name}_max"] = timing.max
+        for name, summary in self._summaries.items():
+            values[f"{name}_count"] = summary.count
+            for q in SUMMARY_QUANTILES:
+                values[f"{name}_p{round(q * 100)}"] = summary.quantile(q)
+        return values
+
+    def render(self) -> str:
+        """Текстовое представление: по строке "имя значение" на метрику."""
+        return "".join(
+            f"{name} {value:g}\n" for name, value in sorted(self.snapshot().items())
+        )
@@ -0,0 +1,187 @@
+"""
+Режим webhook: приём апдейтов через aiohttp-сервер.
+
+Здесь выполняется:
+- маршрут на каждого бота процесса (дополнительные — WEBHOOK_PATH/<имя>);
+- проверка секретного токена Telegram (X-Telegram-Bot-Api-Secret-Token);
+- быстрый ответ 200 с обработкой апдейта в фоне;
+- корректная остановка: перестаём принимать запросы, дожидаемся
+  фоновых обработчиков и только потом закрываем ресурсы.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from contextlib import suppress
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from src.bot.config import BotConfig
+from src.bot.services.shutdown import DrainResult, ShutdownDeadline, drain_tasks
+from src.bot.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("bot")
+
+# Путь для проверки живости (для балансировщика и мониторинга)
+HEALTHCHECK_PATH = "/healthz"
+# Путь с метриками процесса (текстовый формат)
+METRICS_PATH = "/metrics"
+
+
+class DrainingRequestHandler(SimpleRequestHandler):
+    """
+    Обработчик webhook-запросов с ожиданием фоновых задач при остановке.
+
+    Апдейт подтверждается сразу, а обработка идёт в фоне; при остановке
+    drain() ждёт завершения уже принятых апдейтов.
+    """
+
+    @property
+    def pending_updates(self) -> int:
+        return len(self._background_feed_update_tasks)
+
+    async def drain(self, timeout: float) -> DrainResult:
+        """Ждёт фоновые обработчики не дольше timeout секунд, остальные отменяет."""
+        tasks = set(self._background_feed_update_tasks)
+        if not tasks:
+            return DrainResult()
+        logger.info("Ожидаем завершения %s апдейтов перед остановкой...", len(tasks))
+        result = await drain_tasks(tasks, timeout)
+        if result.aborted:
+            logger.warning("Прервано %s апдейтов по таймауту остановки", result.aborted)
+        return result
+
+
+def webhook_path_for(config: BotConfig, name: str = "") -> str:
+    """Путь webhook бота: основной — WEBHOOK_PATH, дополнительные — WEBHOOK_PATH/<имя>."""
+    return f"{config.webhook_path.rstrip('/')}/{name}" if name else config.webhook_path
+
+
+def build_webhook_app(
+    dp: Dispatcher,
+    bot: Bot,
+    config: BotConfig,
+    extra_bots: dict[str, Bot] | None = None,
+) -> tuple[web.Application, list[DrainingRequestHandler]]:
+    """
+    Собирает aiohttp-приложение с маршрутами webhook и healthcheck.
+
+    Args:
+        extra_bots: Дополнительные боты процесса по именам (EXTRA_BOTS)
+    """
+    app = web.Application()
+    handlers: list[DrainingRequestHandler] = []
+    for name, path_bot in {"": bot, **(extra_bots or {})}.items():
+        handler = DrainingRequestHandler(
+            dispatcher=dp,
+            bot=path_bot,
+            handle_in_background=True,
+            secret_token=config.webhook_secret,
+        )
+        handler.register(app, path=webhook_path_for(config, name))
+        handlers.append(handler)
+    app.router.add_get(HEALTHCHECK_PATH, _healthcheck)
+    metrics = dp.workflow_data.get("metrics")
+    if isinstance(metrics, MetricsRegistry):
+        app.router.add_get(METRICS_PATH, _metrics_handler(metrics))
+    setup_application(app, dp, bot=bot)
+    return app, handlers
+
+
+async def register_webhook(
+    dp: Dispatcher, bot: Bot, config: BotConfig, name: str = ""
+) -> None:
+    """Регистрирует webhook в Telegram с типами апдейтов, которые обрабатывает dp."""
+    base_url = (config.webhook_base_url or "").rstrip("/")
+    await bot.set_webhook(
+        url=f"{base_url}{webhook_path_for(config, name)}",
+        secret_token=config.webhook_secret,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+
+
+async def run_webhook(
+    dp: Dispatcher,
+    bot: Bot,
+    config: BotConfig,
+    register: bool = True,
+    reuse_port: bool = False,
+    extra_bots: dict[str, Bot] | None = None,
+) -> None:
+    """
+    Запускает webhook-сервер и регистрирует webhook в Telegram.
+
+    Работает до SIGINT/SIGTERM, затем корректно останавливается.
+
+    Args:
+        register: Регистрировать ли webhook. Воркеры супервизора этого
+            не делают — webhook один на всех и регистрируется супервизором.
+        reuse_port: Открыть порт с SO_REUSEPORT, чтобы несколько процессов
+            слушали его одновременно (ядро распределяет соединения).
+        extra_bots: Дополнительные боты процесса по именам (EXTRA_BOTS)
+    """
+    app, handlers = build_webhook_app(dp, bot, config, extra_bots)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(
+        runner,
+        host=config.webhook_host,
+        port=config.webhook_port,
+        reuse_port=reuse_port or None,
+    )
+    await site.start()
+
+    if register:
+        await register_webhook(dp, bot, config)
+        for name, extra_bot in (extra_bots or {}).items():
+            await register_webhook(dp, extra_bot, config, name)
+    logger.info(
+        "Webhook-сервер запущен на %s:%s, путь %s",
+        config.webhook_host,
+        config.webhook_port,
+        config.webhook_path,
+    )
+
+    try:
+        await _wait_for_stop_signal()
+    finally:
+        logger.info("Останавливаем webhook-сервер...")
+        # Сначала перестаём принимать запросы, затем дожидаемся принятых апдейтов
+        await site.stop()
+        # Срок общий с остальными этапами остановки приложения
+        deadline = dp.workflow_data.get("shutdown")
+        if not isinstance(deadline, ShutdownDeadline):
+            deadline = ShutdownDeadline(config.shutdown_timeout_sec)
+        timeout = deadline.remaining()
+        await asyncio.gather(*(handler.drain(timeout) for handler in handlers))
+        await runner.cleanup()
+
+
+async def _wait_for_stop_signal() -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # На Windows обработчики сигналов в event loop не поддерживаются
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop_event.set)
+    try:
+        await stop_event.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with suppress(NotImplementedError):
+                loop.remove_signal_handler(sig)
+
+
+async def _healthcheck(request: web.Request) -> web.Response:
+    return web.Response(text="ok")
+
+
+def _metrics_handler(metrics: MetricsRegistry):
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render())
+
+    return handle
@@ -0,0 +1,14 @@
+"""
+Точка входа для запуска нескольких webhook-воркеров.
+
+Используется вместо app.py, когда одного процесса не хватает:
+в amvera.yml укажите scriptName: supervisor.py и задайте WEBHOOK_WORKERS.
+"""
+
+from src.bot.supervisor import run_supervisor
+
+if __name__ == "__main__":
+    try:
+        run_supervisor()
+    except KeyboardInterrupt:
+        print("Бот остановлен.")
@@ -0,0 +1,71 @@
+"""
+Тесты для контроля допуска запросов к LLM (`src.bot.services.admission`).
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.services.admission import AdmissionController, OverloadedError
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+from src.bot.services.llm_scheduler import LLMRequestScheduler
+
+
+def make_controller(max_in_flight: int, max_wait: float, reserve: float = 0.0):
+    scheduler = LLMRequestScheduler(max_in_flight=max_in_flight, premium_reserve=reserve)
+    return AdmissionController(scheduler, max_wait_seconds=max_wait), scheduler
+
+
+async def hold(controller: AdmissionController, release: asyncio.Event, tier=TIER_FREE) -> None:
+    async with controller.slot(tier):
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_predicted_wait_too_long() -> None:
+    controller, _ = make_controller(max_in_flight=1, max_wait=1)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(controller, release))
+    await asyncio.sleep(0.01)
+
+    # Место занято, а средний запрос (5 с до первых замеров) дольше порога
+    with pytest.raises(OverloadedError):
+        async with controller.slot():
+            pass
+
+    release.set()
+    await running
+
+
+@pytest.mark.asyncio
+async def test_premium_tolerates_longer_wait() -> None:
+    controller, scheduler = make_controller(max_in_flight=1, max_wait=4)
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(controller, release))
+    await asyncio.sleep(0.01)
+
+    # Ожидание ~5 с: больше порога обычного пользователя, но в пределах Premium
+    with pytest.raises(OverloadedError):
+        async with controller.slot(TIER_FREE):
+            pass
+    premium = asyncio.create_task(hold(controller, release, TIER_PREMIUM))
+    await asyncio.sleep(0.01)
+    assert scheduler.waiting == 1
+
+    release.set()
+    await asyncio.gather(running, premium)
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_admits_without_limit_when_disabled() -> None:
+    controller, scheduler = make_controller(max_in_flight=1, max_wait=float("inf"))
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(controller, release)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+
+    assert scheduler.in_flight == 1
+    assert scheduler.waiting == 4
+
+    release.set()
+    await asyncio.gather(*tasks)
@@ -2,6 +2,8 @@
 Тесты для роутера ChatGPT.
 """
 
+import asyncio
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -10,6 +12,7 @@ from aiogram.types import Chat, Message, User
 from src.bot.config import BotConfig
 from src.bot.routers.chatgpt import cmd_chatgpt, cmd_stop, handle_chat_message
 from src.bot.services.history import ChatHistoryRepository
+from src.bot.services.typing import TypingTicker
 
 
 class FakeHistoryRepo(ChatHistoryRepository):
@@ -90,16 +93,17 @@ def create_mock_message(text: str, user_id: int = 123) -> Message:
         username="testuser",
     )
     chat = Chat(id=user_id, type="private")
+    bot = MagicMock()
+    bot.send_chat_action = AsyncMock()
     message = Message(
         message_id=1,
-        date=None,
+        date=datetime.now(timezone.utc),
         chat=chat,
         from_user=user,
-    )
-    message.text = text
-    message.answer = AsyncMock()
-    message.bot = MagicMock()
-    message.bot.send_chat_action = AsyncMock()
+        text=text,
+    ).as_(bot)
+    # Message неизменяем (frozen): подменяем метод в обход проверки pydantic
+    object.__setattr__(message, "answer", AsyncMock())
     return message
 
 
@@ -186,7 +190,31 @@ async def test_handle_chat_message_processes_in_mode() -> None:
 
     assert message.answer.called
     assert llm_client.calls
-    assert message.bot.send_chat_action.await_count >= 1
+
+
+class SlowLLMClient(FakeLLMClient):
+    async def get_response(
+        self, api_key: str, messages: list[dict[str, str]], model: str
+    ) -> str:
+        await asyncio.sleep(0.1)
+        return await super().get_response(api_key, messages, model)
+
+
+@pytest.mark.asyncio
+async def test_handle_chat_message_shows_typing_for_slow_reply() -> None:
+    config = create_mock_config()
+    message = create_mock_message("Расскажи длинную историю")
+    repo = FakeHistoryRepo()
+    await repo.start_session(message.from_user.id)  # type: ignore[arg-type]
+    typing = TypingTicker(
+        lambda chat_id: message.bot.send_chat_action(chat_id=chat_id, action="typing"),
+        grace_seconds=0.02,
+    )
+
+    await handle_chat_message(message, config, repo, SlowLLMClient(), typing=typing)
+    await typing.aclose()
+
+    message.bot.send_chat_action.assert_awaited_with(chat_id=message.chat.id, action="typing")
 
 
 @pytest.mark.asyncio
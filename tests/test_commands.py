@@ -4,9 +4,17 @@
 
 from typing import List
 
-from aiogram.types import BotCommand
+import pytest
+from aiogram import F, Router
+from aiogram.filters import Command
+from aiogram.types import BotCommand, Chat, Message
 
-from src.bot.utils.commands import COMMANDS_SPEC, set_bot_commands
+from src.bot.utils.commands import (
+    COMMANDS_SPEC,
+    CommandDispatchTable,
+    parse_command,
+    set_bot_commands,
+)
 
 
 class DummyBot:
@@ -25,11 +33,12 @@ class DummyBot:
         self.commands = commands
 
 
+@pytest.mark.asyncio
 async def test_set_bot_commands_sets_expected_commands() -> None:
     """Утилита должна установить ожидаемый набор команд в бота."""
     bot = DummyBot()
 
-    await set_bot_commands(bot)  # type: ignore[arg-type]
+    await set_bot_commands(bot)  # type: ignore[arg-type]  # заглушка вместо Bot
 
     # Проверяем, что команды были установлены
     assert bot.commands, "Список команд не должен быть пустым"
@@ -41,6 +50,8 @@ async def test_set_bot_commands_sets_expected_commands() -> None:
         "start": "Restart bot (Выбрать нейросеть)",
         "chatgpt": "ChatGPT mode (Режим ChatGPT)",
         "stop": "Stop ChatGPT mode (Выйти из режима ChatGPT)",
+        "convert": "Currency converter (Конвертер валют)",
+        "rates": "Rate history (История курсов)",
         "profile": "Profile (Профиль)",
         "premium": "Premium",
         "language": "Language (Язык)",
@@ -54,3 +65,41 @@ async def test_set_bot_commands_sets_expected_commands() -> None:
     assert len(names) == len(set(names))
 
 
+def test_parse_command_matches_command_filter_format() -> None:
+    command = parse_command("/rates@my_bot usd rub 7")
+
+    assert command is not None
+    assert command.command == "rates"
+    assert command.mention == "my_bot"
+    assert command.args == "usd rub 7"
+    assert parse_command("привет") is None
+    assert parse_command("/") is None
+
+
+@pytest.mark.asyncio
+async def test_dispatch_table_resolves_plain_commands_only() -> None:
+    root = Router()
+    child = Router()
+    root.include_router(child)
+
+    @child.message(Command("help"))
+    async def cmd_help(message: Message) -> None: ...
+
+    @child.message(Command("premium"), F.chat.type == "group")
+    async def cmd_premium(message: Message) -> None: ...
+
+    table = CommandDispatchTable.compile(root)
+
+    assert "help" in table
+    # Обработчик с дополнительным фильтром остаётся в цепочке роутеров
+    assert "premium" not in table
+
+    message = Message(
+        message_id=1, date=0, chat=Chat(id=1, type="private"), text="/help me"
+    )
+    # Бот нужен только командам с упоминанием (/help@bot), здесь его нет
+    resolved = await table.resolve(message, bot=None)  # type: ignore[arg-type]
+    assert resolved is not None
+    handler, command = resolved
+    assert handler.callback is cmd_help
+    assert command.args == "me"
@@ -60,3 +60,60 @@ def test_load_config_includes_openrouter_key_when_present() -> None:
     assert config.openrouter_api_key == "TEST_OPENROUTER_KEY"
 
 
+def test_load_config_webhook_mode_requires_base_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Для режима webhook без публичного адреса должна быть поднята ошибка."""
+    os.environ["TELEGRAM_BOT_TOKEN"] = "TEST_TOKEN"
+    monkeypatch.setenv("BOT_MODE", "webhook")
+    monkeypatch.delenv("WEBHOOK_BASE_URL", raising=False)
+
+    with pytest.raises(RuntimeError) as exc_info:
+        load_config()
+
+    assert "WEBHOOK_BASE_URL" in str(exc_info.value)
+
+
+def test_load_config_webhook_url(monkeypatch: pytest.MonkeyPatch) -> None:
+    """URL webhook собирается из публичного адреса и пути."""
+    os.environ["TELEGRAM_BOT_TOKEN"] = "TEST_TOKEN"
+    monkeypatch.setenv("BOT_MODE", "webhook")
+    monkeypatch.setenv("WEBHOOK_BASE_URL", "https://bot.example.com/")
+    monkeypatch.setenv("WEBHOOK_SECRET", "secret")
+
+    config = load_config()
+
+    assert config.webhook_url == "https://bot.example.com/webhook"
+
+
+def test_load_config_webhook_mode_requires_secret(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Без секрета webhook принимал бы апдейты от кого угодно."""
+    os.environ["TELEGRAM_BOT_TOKEN"] = "TEST_TOKEN"
+    monkeypatch.setenv("BOT_MODE", "webhook")
+    monkeypatch.setenv("WEBHOOK_BASE_URL", "https://bot.example.com/")
+    monkeypatch.delenv("WEBHOOK_SECRET", raising=False)
+
+    with pytest.raises(RuntimeError) as exc_info:
+        load_config()
+
+    assert "WEBHOOK_SECRET" in str(exc_info.value)
+
+
+def test_load_config_extra_bots(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Дополнительные боты задаются парами имя=токен."""
+    os.environ["TELEGRAM_BOT_TOKEN"] = "TEST_TOKEN"
+    monkeypatch.setenv("EXTRA_BOTS", "brand2=123:AAA, brand3=456:BBB")
+
+    config = load_config()
+
+    assert config.extra_bots == (("brand2", "123:AAA"), ("brand3", "456:BBB"))
+
+
+@pytest.mark.parametrize("value", ["main=123:AAA", "Brand=123:AAA", "brand2=", "a=1:x,a=2:y"])
+def test_load_config_extra_bots_rejects_invalid(
+    monkeypatch: pytest.MonkeyPatch, value: str
+) -> None:
+    """Имена ботов проверяются: уникальные, строчные, не совпадают с основным."""
+    os.environ["TELEGRAM_BOT_TOKEN"] = "TEST_TOKEN"
+    monkeypatch.setenv("EXTRA_BOTS", value)
+
+    with pytest.raises(RuntimeError):
+        load_config()
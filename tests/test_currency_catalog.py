@@ -0,0 +1,100 @@
+"""
+Тесты для каталога валют (`src.bot.services.currency_catalog`).
+"""
+
+from src.bot.keyboards.currency import CurrencyKeyboards
+from src.bot.services.currency import SUPPORTED_CURRENCIES
+from src.bot.services.currency_catalog import CurrencyCatalog
+from src.bot.services.currency_names import CURRENCY_NAMES
+from src.bot.services.currency_query import parse_conversion_query
+
+
+def make_catalog() -> CurrencyCatalog:
+    return CurrencyCatalog.from_codes(CURRENCY_NAMES, SUPPORTED_CURRENCIES)
+
+
+def test_catalog_orders_popular_first() -> None:
+    catalog = make_catalog()
+
+    codes = [info.code for info in catalog.items]
+
+    assert codes[: len(SUPPORTED_CURRENCIES)] == list(SUPPORTED_CURRENCIES)
+    assert len(catalog) == len(CURRENCY_NAMES)
+
+
+def test_search_by_russian_prefix() -> None:
+    results = make_catalog().search("евр")
+
+    assert results[0].code == "EUR"
+
+
+def test_search_by_code_and_english_prefix() -> None:
+    results = make_catalog().search("eu")
+
+    assert "EUR" in [info.code for info in results]
+
+
+def test_search_exact_code_goes_first() -> None:
+    results = make_catalog().search("kzt")
+
+    assert results[0].code == "KZT"
+
+
+def test_search_multiple_words_intersects() -> None:
+    results = make_catalog().search("канадский дол")
+
+    assert [info.code for info in results] == ["CAD"]
+
+
+def test_search_returns_empty_for_unknown() -> None:
+    assert make_catalog().search("несуществующая") == []
+
+
+def test_unknown_code_uses_code_as_label() -> None:
+    catalog = CurrencyCatalog.from_codes(["USD", "ZZZ"], SUPPORTED_CURRENCIES)
+
+    assert catalog.label("ZZZ") == "ZZZ"
+    assert catalog.search("zz")[0].code == "ZZZ"
+
+
+def test_keyboard_pages_are_cached_per_catalog() -> None:
+    catalog = make_catalog()
+    keyboards = CurrencyKeyboards(per_page=10)
+
+    first = keyboards.page(catalog, 0)
+
+    assert keyboards.page(catalog, 0) is first
+    assert keyboards.page_count(catalog) == (len(catalog) + 9) // 10
+    # Номер страницы за пределами диапазона приводится к последней странице
+    assert keyboards.page(catalog, 10_000) is keyboards.page(catalog, keyboards.page_count(catalog) - 1)
+
+
+def test_parse_conversion_query_with_amount_and_pair() -> None:
+    query = parse_conversion_query("100 usd eur", make_catalog())
+
+    assert query is not None
+    assert query.amount == 100.0
+    assert query.base_currency == "USD"
+    assert query.target_currencies == ("EUR",)
+
+
+def test_parse_conversion_query_glued_amount_and_connector() -> None:
+    query = parse_conversion_query("2,5евро в rub", make_catalog())
+
+    assert query is not None
+    assert query.amount == 2.5
+    assert query.base_currency == "EUR"
+    assert query.target_currencies == ("RUB",)
+
+
+def test_parse_conversion_query_uses_default_targets() -> None:
+    query = parse_conversion_query("usd", make_catalog())
+
+    assert query is not None
+    assert query.amount == 1.0
+    assert "USD" not in query.target_currencies
+    assert query.target_currencies
+
+
+def test_parse_conversion_query_rejects_unknown() -> None:
+    assert parse_conversion_query("100 абракадабра", make_catalog()) is None
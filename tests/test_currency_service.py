@@ -0,0 +1,148 @@
+"""
+Тесты для сервиса курсов валют (`src.bot.services.currency`).
+"""
+
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.bot.services.currency import ExchangeRateService
+from src.bot.services.currency_format import format_currency_result
+from src.bot.services.rate_providers import HttpRateProvider
+from src.bot.services.rate_snapshot import RateSnapshotStore
+from src.bot.services.rate_table import RateTable
+
+
+class DummyResponse:
+    """Поддельный ответ aiohttp."""
+
+    def __init__(self, status: int, json_data: dict[str, Any] | None = None) -> None:
+        self.status = status
+        self._json_data = json_data or {}
+
+    async def json(self) -> dict[str, Any]:
+        return self._json_data
+
+    async def text(self) -> str:
+        return ""
+
+    async def __aenter__(self) -> "DummyResponse":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+class DummySession:
+    """Поддельная HTTP-сессия, считающая запросы."""
+
+    def __init__(self, responses: list[DummyResponse]) -> None:
+        self.responses = responses
+        self.calls = 0
+        self.closed = False
+
+    def get(self, url: str) -> DummyResponse:
+        self.calls += 1
+        if not self.responses:
+            raise RuntimeError("No responses left in DummySession")
+        return self.responses.pop(0)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def make_service(store: RateSnapshotStore, session: DummySession) -> ExchangeRateService:
+    provider = HttpRateProvider("http://rates.test", session=session)  # type: ignore[arg-type]
+    return ExchangeRateService(provider=provider, snapshot_store=store)
+
+
+def make_api_response(rates: dict[str, float]) -> DummyResponse:
+    return DummyResponse(
+        status=200,
+        json_data={"result": "success", "base_code": "USD", "rates": rates},
+    )
+
+
+def test_rate_table_cross_rate() -> None:
+    table = RateTable(base="USD", rates={"USD": 1.0, "EUR": 0.5, "RUB": 100.0}, fetched_at=0.0)
+
+    assert table.cross_rate("USD", "RUB") == 100.0
+    assert table.cross_rate("EUR", "RUB") == 200.0
+    assert table.cross_rate("EUR", "EUR") == 1.0
+    assert table.cross_rate("USD", "XXX") is None
+
+
+def test_snapshot_roundtrip(tmp_path: Path) -> None:
+    store = RateSnapshotStore(tmp_path / "sub" / "rates.json")
+    table = RateTable(base="USD", rates={"USD": 1.0, "EUR": 0.9}, fetched_at=123.5)
+
+    store.save(table)
+
+    assert store.load() == table
+
+
+def test_snapshot_load_ignores_corrupted_file(tmp_path: Path) -> None:
+    path = tmp_path / "rates.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert RateSnapshotStore(path).load() is None
+
+
+@pytest.mark.asyncio
+async def test_warm_up_serves_conversion_without_network(tmp_path: Path) -> None:
+    store = RateSnapshotStore(tmp_path / "rates.json")
+    store.save(RateTable(base="USD", rates={"USD": 1.0, "EUR": 0.5}, fetched_at=time.time()))
+    session = DummySession([])
+    service = make_service(store, session)
+
+    await service.warm_up()
+    result = await service.convert(10.0, "EUR", "USD")
+
+    assert result is not None
+    assert result.converted_amount == 20.0
+    assert session.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_saves_snapshot(tmp_path: Path) -> None:
+    store = RateSnapshotStore(tmp_path / "rates.json")
+    session = DummySession([make_api_response({"USD": 1.0, "RUB": 90.0})])
+    service = make_service(store, session)
+
+    rate = await service.get_exchange_rate("USD", "RUB")
+
+    assert rate == 90.0
+    saved = store.load()
+    assert saved is not None
+    assert saved.rates["RUB"] == 90.0
+
+
+@pytest.mark.asyncio
+async def test_refresh_failure_keeps_stale_table(tmp_path: Path) -> None:
+    store = RateSnapshotStore(tmp_path / "rates.json")
+    store.save(RateTable(base="USD", rates={"USD": 1.0, "RUB": 80.0}, fetched_at=0.0))
+    session = DummySession([DummyResponse(status=503)])
+    service = make_service(store, session)
+    await service.warm_up()
+
+    table = await service.refresh()
+
+    assert table is not None
+    assert table.rates["RUB"] == 80.0
+
+
+def test_format_currency_result_includes_rates_age() -> None:
+    text = format_currency_result(1.0, "USD", 90.0, "RUB", 90.0, rates_age_seconds=15 * 60)
+
+    assert "15 мин назад" in text
+
+
+@pytest.mark.asyncio
+async def test_convert_cached_never_fetches(tmp_path: Path) -> None:
+    session = DummySession([])
+    service = make_service(RateSnapshotStore(tmp_path / "rates.json"), session)
+
+    assert service.convert_cached(1.0, "USD", "EUR") is None
+    assert session.calls == 0
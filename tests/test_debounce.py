@@ -0,0 +1,70 @@
+"""
+Тесты для склейки серий сообщений (`src.bot.services.debounce`).
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.services.debounce import MessageDebouncer
+from src.bot.utils.metrics import MetricsRegistry
+
+
+def make_debouncer(metrics: MetricsRegistry | None = None, **kwargs) -> MessageDebouncer:
+    params = {"window_seconds": 0.05, "max_window_seconds": 0.5, "max_messages": 10}
+    params.update(kwargs)
+    return MessageDebouncer(metrics=metrics, **params)
+
+
+@pytest.mark.asyncio
+async def test_burst_merged_into_first_submit() -> None:
+    metrics = MetricsRegistry()
+    debouncer = make_debouncer(metrics)
+
+    leader = asyncio.create_task(debouncer.submit(1, "привет"))
+    await asyncio.sleep(0.01)
+    assert await debouncer.submit(1, "как дела") is None
+    await asyncio.sleep(0.01)
+    assert await debouncer.submit(1, "?") is None
+
+    assert await leader == ["привет", "как дела", "?"]
+    snapshot = metrics.snapshot()
+    assert snapshot["chat_bursts"] == 1
+    assert snapshot["chat_messages_merged"] == 2
+
+
+@pytest.mark.asyncio
+async def test_different_users_not_merged() -> None:
+    debouncer = make_debouncer()
+
+    first, second = await asyncio.gather(
+        debouncer.submit(1, "a"), debouncer.submit(2, "b")
+    )
+
+    assert first == ["a"]
+    assert second == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_burst_limited_by_message_count() -> None:
+    debouncer = make_debouncer(max_messages=2, window_seconds=5, max_window_seconds=5)
+
+    leader = asyncio.create_task(debouncer.submit(1, "a"))
+    await asyncio.sleep(0)
+    await debouncer.submit(1, "b")
+
+    assert await asyncio.wait_for(leader, timeout=1) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_window_adapts_to_user_pauses() -> None:
+    debouncer = make_debouncer(window_seconds=0.2, max_window_seconds=1)
+
+    leader = asyncio.create_task(debouncer.submit(1, "a"))
+    await asyncio.sleep(0.02)
+    await debouncer.submit(1, "b")
+    await leader
+
+    # Пользователь пишет быстро — окно сужается, но не ниже половины базового
+    assert debouncer.window_for(1) == pytest.approx(0.1)
+    assert debouncer.window_for(2) == 0.2
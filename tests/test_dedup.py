@@ -0,0 +1,74 @@
+"""
+Тесты для отсева повторных апдейтов (`src.bot.services.dedup`).
+"""
+
+import pytest
+
+from src.bot.services.dedup import RecentUpdates, UpdateDeduplicator
+
+
+class FakeRedis:
+    """SET NX поверх словаря; ключи, занятые "другой репликой", задаются заранее."""
+
+    def __init__(self, taken: set[str] | None = None) -> None:
+        self.keys: set[str] = set(taken or ())
+
+    async def set(self, key: str, value, nx: bool = False, ex: int | None = None):
+        if nx and key in self.keys:
+            return None
+        self.keys.add(key)
+        return True
+
+
+class BrokenRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+def test_recent_updates_detects_repeats() -> None:
+    recent = RecentUpdates(window=3)
+
+    assert recent.add(1)
+    assert not recent.add(1)
+    assert 1 in recent
+
+
+def test_recent_updates_forgets_oldest_outside_window() -> None:
+    recent = RecentUpdates(window=2)
+    for update_id in (1, 2, 3):
+        recent.add(update_id)
+
+    assert 1 not in recent
+    assert len(recent) == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_dedup_drops_replayed_update() -> None:
+    deduplicator = UpdateDeduplicator()
+
+    assert not await deduplicator.is_duplicate(1, 100)
+    assert await deduplicator.is_duplicate(1, 100)
+
+
+@pytest.mark.asyncio
+async def test_update_taken_by_other_replica_is_duplicate() -> None:
+    deduplicator = UpdateDeduplicator(redis=FakeRedis({"upd:1:100"}))  # type: ignore[arg-type]
+
+    assert await deduplicator.is_duplicate(1, 100)
+    assert not await deduplicator.is_duplicate(1, 101)
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_lets_update_through() -> None:
+    deduplicator = UpdateDeduplicator(redis=BrokenRedis())  # type: ignore[arg-type]
+
+    assert not await deduplicator.is_duplicate(1, 100)
+
+
+@pytest.mark.asyncio
+async def test_update_ids_of_different_bots_do_not_collide() -> None:
+    deduplicator = UpdateDeduplicator()
+
+    assert not await deduplicator.is_duplicate(1, 100)
+    assert not await deduplicator.is_duplicate(2, 100)
+    assert await deduplicator.is_duplicate(2, 100)
@@ -0,0 +1,74 @@
+"""
+Тесты для хранилищ состояний FSM (`src.bot.utils.fsm_storage`).
+"""
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from src.bot.routers.convert import ConvertStates
+from src.bot.utils.fsm_storage import MemoryFSMStorage, build_fsm_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=20)
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_roundtrip() -> None:
+    storage = MemoryFSMStorage(ttl_seconds=60)
+
+    await storage.set_state(KEY, ConvertStates.waiting_for_amount)
+    await storage.update_data(KEY, {"selected_currency": "USD"})
+
+    assert await storage.get_state(KEY) == ConvertStates.waiting_for_amount.state
+    assert await storage.get_data(KEY) == {"selected_currency": "USD"}
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_forgets_abandoned_dialog() -> None:
+    clock = FakeClock()
+    storage = MemoryFSMStorage(ttl_seconds=60, clock=clock)
+    await storage.set_state(KEY, ConvertStates.waiting_for_currency)
+
+    clock.now = 61
+    assert await storage.get_state(KEY) is None
+    assert await storage.get_data(KEY) == {}
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_sweeps_expired_records() -> None:
+    clock = FakeClock()
+    storage = MemoryFSMStorage(ttl_seconds=60, clock=clock)
+    for user_id in range(5):
+        await storage.set_state(
+            StorageKey(bot_id=1, chat_id=user_id, user_id=user_id), "state"
+        )
+
+    clock.now = 120
+    await storage.set_state(KEY, "state")
+    assert len(storage) == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_clear_removes_record() -> None:
+    storage = MemoryFSMStorage()
+    await storage.set_state(KEY, "state")
+    await storage.set_data(KEY, {"a": 1})
+
+    await storage.set_state(KEY, None)
+    await storage.set_data(KEY, {})
+    assert len(storage) == 0
+
+
+def test_fsm_key_is_compact() -> None:
+    assert build_fsm_key(KEY) == "f:1:10:20"
+    assert build_fsm_key(StorageKey(bot_id=1, chat_id=10, user_id=20, thread_id=5)) == (
+        "f:1:10:20:t5"
+    )
@@ -0,0 +1,220 @@
+"""
+Тесты для очереди заданий LLM (`src.bot.services.llm_queue`).
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.config import BotConfig
+from src.bot.llm_worker import LLMJobHandler
+from src.bot.services.history import HistorySettings, InMemoryChatHistoryRepository
+from src.bot.services.llm_consumer import LLMJobConsumer
+from src.bot.services.llm_queue import LLMJob
+from src.bot.services.text import make_delivery_error_message
+from src.bot.services.usage import MemoryUsageBackend, UsageAccounting
+
+
+class FakeQueue:
+    """Очередь в памяти с тем же контрактом, что и LLMJobQueue."""
+
+    def __init__(self, jobs: list[LLMJob], max_attempts: int = 2) -> None:
+        self.pending = [(str(i), job) for i, job in enumerate(jobs)]
+        self.max_attempts = max_attempts
+        self.acked: list[str] = []
+        self.dead: list[LLMJob] = []
+
+    async def ensure_group(self) -> None:
+        return
+
+    async def claim_stale(self, consumer: str, min_idle_ms: int, count: int):
+        return []
+
+    async def read(self, consumer: str, count: int, block_ms: int = 0):
+        jobs, self.pending = self.pending[:count], self.pending[count:]
+        if not jobs:
+            await asyncio.sleep(0.01)
+        return jobs
+
+    async def ack(self, entry_id: str) -> None:
+        self.acked.append(entry_id)
+
+    async def retry(self, entry_id: str, job: LLMJob, error: Exception) -> bool:
+        job.attempts += 1
+        if job.attempts >= self.max_attempts:
+            self.dead.append(job)
+            return True
+        self.pending.append((f"{entry_id}r", job))
+        return False
+
+
+async def consume_until(queue: FakeQueue, handler, done, on_dead_letter=None) -> None:
+    """Крутит потребителя, пока не выполнится условие done()."""
+    consumer = LLMJobConsumer(
+        queue,  # type: ignore[arg-type]
+        handler,
+        consumer="test",
+        concurrency=2,
+        claim_idle_seconds=60,
+        on_dead_letter=on_dead_letter,
+    )
+    task = asyncio.create_task(consumer.run(drain_timeout=1))
+    for _ in range(100):
+        if done():
+            break
+        await asyncio.sleep(0.01)
+    consumer.stop()
+    await asyncio.wait_for(task, 1)
+
+
+def test_job_fields_roundtrip() -> None:
+    job = LLMJob(user_id=1, chat_id=-100, text="привет", attempts=2)
+
+    assert LLMJob.from_fields(job.to_fields()) == job
+
+
+@pytest.mark.asyncio
+async def test_successful_jobs_are_acknowledged() -> None:
+    queue = FakeQueue([LLMJob(user_id=1, chat_id=1), LLMJob(user_id=2, chat_id=2)])
+    handled: list[int] = []
+
+    async def handler(job: LLMJob) -> None:
+        handled.append(job.user_id)
+
+    await consume_until(queue, handler, lambda: len(queue.acked) == 2)
+
+    assert sorted(handled) == [1, 2]
+    assert sorted(queue.acked) == ["0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_failing_job_is_retried_then_dead_lettered() -> None:
+    queue = FakeQueue([LLMJob(user_id=1, chat_id=1)], max_attempts=2)
+    attempts = 0
+    dead_letters: list[tuple[LLMJob, Exception]] = []
+
+    async def handler(job: LLMJob) -> None:
+        nonlocal attempts
+        attempts += 1
+        raise TimeoutError("provider")
+
+    async def on_dead_letter(job: LLMJob, error: Exception) -> None:
+        dead_letters.append((job, error))
+
+    await consume_until(queue, handler, lambda: dead_letters, on_dead_letter)
+
+    assert attempts == 2
+    assert queue.acked == []
+    assert [job.user_id for job, _ in dead_letters] == [1]
+    assert isinstance(dead_letters[0][1], TimeoutError)
+
+
+def test_job_with_response_roundtrip() -> None:
+    job = LLMJob(
+        user_id=1, chat_id=1, text="привет", response="готовый ответ", usage_day="2026-10-19"
+    )
+
+    assert LLMJob.from_fields(job.to_fields()) == job
+
+
+class FlakyBot:
+    """Первая отправка падает, следующие проходят."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.failures = 1
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("telegram down")
+        self.sent.append(text)
+
+
+class CountingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_response(self, api_key: str, messages: list, model: str) -> str:
+        self.calls += 1
+        return "ответ"
+
+
+@pytest.mark.asyncio
+async def test_retry_after_failed_send_does_not_call_llm_again() -> None:
+    history_repo = InMemoryChatHistoryRepository(HistorySettings())
+    await history_repo.start_session(1)
+    await history_repo.add_user_message(1, "вопрос")
+    bot, llm = FlakyBot(), CountingLLM()
+    # Вместо Bot и LLMClient — заглушки с теми же методами
+    handler = LLMJobHandler(
+        bot, BotConfig(bot_token="x"), history_repo, llm  # type: ignore[arg-type]
+    )
+    queue = FakeQueue([LLMJob(user_id=1, chat_id=1)], max_attempts=3)
+
+    await consume_until(queue, handler, lambda: bool(bot.sent))
+
+    assert bot.sent == ["ответ"]
+    assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_dead_lettered_job_is_refunded() -> None:
+    usage = UsageAccounting(MemoryUsageBackend())
+    day = await usage.reserve(1)
+    handler = LLMJobHandler(
+        FlakyBot(),  # type: ignore[arg-type]  # заглушка вместо Bot
+        BotConfig(bot_token="x"),
+        InMemoryChatHistoryRepository(HistorySettings()),
+        CountingLLM(),  # type: ignore[arg-type]  # заглушка вместо LLMClient
+        usage=usage,
+    )
+
+    await handler.on_dead_letter(
+        LLMJob(user_id=1, chat_id=1, usage_day=day or ""), TimeoutError("provider")
+    )
+
+    assert (await usage.usage(1)).requests == 0
+
+
+@pytest.mark.asyncio
+async def test_dead_lettered_job_with_response_keeps_quota() -> None:
+    usage = UsageAccounting(MemoryUsageBackend())
+    day = await usage.reserve(1)
+    bot = FlakyBot()
+    bot.failures = 0
+    handler = LLMJobHandler(
+        bot,  # type: ignore[arg-type]  # заглушка вместо Bot
+        BotConfig(bot_token="x"),
+        InMemoryChatHistoryRepository(HistorySettings()),
+        CountingLLM(),  # type: ignore[arg-type]  # заглушка вместо LLMClient
+        usage=usage,
+    )
+
+    await handler.on_dead_letter(
+        LLMJob(user_id=1, chat_id=1, response="ответ", usage_day=day or ""),
+        ConnectionError("telegram down"),
+    )
+
+    # Модель ответила, не удалась только доставка: квота израсходована
+    assert (await usage.usage(1)).requests == 1
+    assert bot.sent == [make_delivery_error_message()]
+
+
+@pytest.mark.asyncio
+async def test_job_of_user_who_left_mode_is_refunded() -> None:
+    usage = UsageAccounting(MemoryUsageBackend())
+    day = await usage.reserve(1)
+    llm = CountingLLM()
+    handler = LLMJobHandler(
+        FlakyBot(),  # type: ignore[arg-type]  # заглушка вместо Bot
+        BotConfig(bot_token="x"),
+        InMemoryChatHistoryRepository(HistorySettings()),
+        llm,  # type: ignore[arg-type]  # заглушка вместо LLMClient
+        usage=usage,
+    )
+
+    await handler(LLMJob(user_id=1, chat_id=1, usage_day=day or ""))
+
+    assert llm.calls == 0
+    assert (await usage.usage(1)).requests == 0
@@ -0,0 +1,93 @@
+"""
+Тесты для отмены запросов к LLM (`src.bot.services.llm_requests`, `src.bot.middlewares.supersede`).
+"""
+
+import asyncio
+
+import pytest
+from aiogram.types import Chat, Message, Update, User
+
+from src.bot.middlewares.supersede import SupersedeMiddleware, is_stop_command
+from src.bot.services.llm_requests import InFlightRequests, RequestSupersededError
+from src.bot.utils.metrics import MetricsRegistry
+
+USER = User(id=1, is_bot=False, first_name="Test")
+
+
+def make_update(text: str) -> Update:
+    message = Message(
+        message_id=1,
+        date=0,
+        chat=Chat(id=1, type="private"),
+        from_user=USER,
+        text=text,
+    )
+    return Update(update_id=1, message=message)
+
+
+async def start_slow_request(requests: InFlightRequests) -> asyncio.Task:
+    task = asyncio.create_task(requests.run(USER.id, asyncio.sleep(10, result="late")))
+    await asyncio.sleep(0)
+    assert USER.id in requests
+    return task
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_forgets_request() -> None:
+    requests = InFlightRequests()
+
+    result = await requests.run(USER.id, asyncio.sleep(0, result="ok"))
+
+    assert result == "ok"
+    assert USER.id not in requests
+    assert requests.cancel(USER.id) is False
+
+
+@pytest.mark.asyncio
+async def test_cancel_raises_superseded_in_waiting_handler() -> None:
+    metrics = MetricsRegistry()
+    requests = InFlightRequests(metrics)
+    task = await start_slow_request(requests)
+
+    assert requests.cancel(USER.id) is True
+
+    with pytest.raises(RequestSupersededError):
+        await task
+    assert metrics.snapshot()["llm_requests_superseded"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("text", "latest_wins", "cancelled"),
+    [
+        ("/stop", False, True),
+        ("уточнение", True, True),
+        ("уточнение", False, False),
+        ("/help", True, False),
+    ],
+)
+async def test_middleware_supersedes_by_policy(
+    text: str, latest_wins: bool, cancelled: bool
+) -> None:
+    requests = InFlightRequests()
+    task = await start_slow_request(requests)
+    middleware = SupersedeMiddleware(requests, latest_wins=latest_wins)
+
+    async def handler(event, data) -> str:  # type: ignore[no-untyped-def]
+        return "handled"
+
+    result = await middleware(handler, make_update(text), {"event_from_user": USER})
+
+    assert result == "handled"
+    assert (USER.id not in requests) is cancelled
+    task.cancel()
+    with pytest.raises((asyncio.CancelledError, RequestSupersededError)):
+        await task
+
+
+def test_is_stop_command() -> None:
+    assert is_stop_command("/stop")
+    assert is_stop_command("/stop@my_bot")
+    assert not is_stop_command("/stopwatch")
+    assert not is_stop_command("stop")
+    assert not is_stop_command("")
@@ -0,0 +1,176 @@
+"""
+Тесты для планировщика запросов к LLM (`src.bot.services.llm_scheduler`).
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+from src.bot.services.llm_scheduler import LLMRequestScheduler
+from src.bot.utils.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def fill_and_drain(scheduler: LLMRequestScheduler, arrivals: list[str]) -> list[str]:
+    """Занимает единственное место, ставит заявки в очередь и отпускает по одной."""
+    order: list[str] = []
+    gate = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot(TIER_PREMIUM):
+            await gate.wait()
+
+    async def request(tier: str) -> None:
+        async with scheduler.slot(tier):
+            order.append(tier)
+
+    first = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(request(tier)) for tier in arrivals]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(first, *tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_in_flight_never_exceeds_limit() -> None:
+    scheduler = LLMRequestScheduler(max_in_flight=2, premium_reserve=0)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot(TIER_FREE):
+            await release.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    assert scheduler.in_flight == 2
+    assert scheduler.waiting == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.in_flight == 0
+    assert scheduler.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_premium_gets_weighted_share() -> None:
+    scheduler = LLMRequestScheduler(max_in_flight=1, premium_reserve=0, clock=FakeClock())
+    order = await fill_and_drain(scheduler, [TIER_FREE] * 10 + [TIER_PREMIUM] * 10)
+
+    # При весах 4:1 из первых пяти мест Premium получает четыре, обычный — одно
+    assert order[:5].count(TIER_PREMIUM) == 4
+    assert order[:5].count(TIER_FREE) == 1
+    assert len(order) == 20
+
+
+@pytest.mark.asyncio
+async def test_aged_request_jumps_queue() -> None:
+    clock = FakeClock()
+    scheduler = LLMRequestScheduler(max_in_flight=1, premium_reserve=0, aging_seconds=5, clock=clock)
+    order: list[str] = []
+    gate = asyncio.Event()
+
+    async def request(name: str, tier: str) -> None:
+        async with scheduler.slot(tier):
+            order.append(name)
+            if name == "blocker":
+                await gate.wait()
+
+    blocker = asyncio.create_task(request("blocker", TIER_PREMIUM))
+    await asyncio.sleep(0)
+    old_free = asyncio.create_task(request("old-free", TIER_FREE))
+    await asyncio.sleep(0)
+    clock.now = 10
+    premium = [asyncio.create_task(request(f"premium-{i}", TIER_PREMIUM)) for i in range(3)]
+    await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(blocker, old_free, *premium)
+    assert order[1] == "old-free"
+
+
+@pytest.mark.asyncio
+async def test_premium_uses_reserve_while_free_wait() -> None:
+    scheduler = LLMRequestScheduler(max_in_flight=2, premium_reserve=0.5)
+    release = asyncio.Event()
+    order: list[str] = []
+
+    async def track(name: str, tier: str) -> None:
+        async with scheduler.slot(tier):
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.create_task(track("free-1", TIER_FREE))
+    await asyncio.sleep(0.01)
+    waiting_free = asyncio.create_task(track("free-2", TIER_FREE))
+    await asyncio.sleep(0.01)
+    premium = asyncio.create_task(track("premium", TIER_PREMIUM))
+    await asyncio.sleep(0.01)
+
+    # Обычным пользователям доступно одно место, второе — резерв Premium
+    assert order == ["free-1", "premium"]
+
+    release.set()
+    await asyncio.gather(first, waiting_free, premium)
+    assert order[-1] == "free-2"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue() -> None:
+    scheduler = LLMRequestScheduler(max_in_flight=1, premium_reserve=0)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot(TIER_FREE):
+            await release.wait()
+
+    running = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert scheduler.waiting == 0
+
+    release.set()
+    await running
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_reports_wait_percentiles_per_tier() -> None:
+    clock = FakeClock()
+    metrics = MetricsRegistry()
+    scheduler = LLMRequestScheduler(max_in_flight=1, premium_reserve=0, metrics=metrics, clock=clock)
+    gate = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot(TIER_PREMIUM):
+            await gate.wait()
+
+    async def request() -> None:
+        async with scheduler.slot(TIER_FREE):
+            pass
+
+    first = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(request())
+    await asyncio.sleep(0)
+    clock.now = 3
+    gate.set()
+    await asyncio.gather(first, waiting)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["llm_wait_seconds_premium_p50"] == 0
+    assert snapshot["llm_wait_seconds_free_count"] == 1
+    assert snapshot["llm_wait_seconds_free_p99"] == 3
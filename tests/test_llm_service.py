@@ -13,6 +13,7 @@ from src.bot.services.llm import (
     RateLimitError,
     UpstreamError,
 )
+from src.bot.services.model_router import ModelRouter, parse_model_rule
 
 
 class DummyResponse:
@@ -169,3 +170,26 @@ async def test_get_llm_response_strips_whitespace() -> None:
 
     assert result == "Ответ с пробелами"
 
+
+
+@pytest.mark.asyncio
+async def test_get_llm_response_uses_routed_model() -> None:
+    router = ModelRouter([parse_model_rule("small/model=chars:20")])
+    session = DummySession(
+        [
+            DummyResponse(status=200, json_data={"choices": [{"message": {"content": "Ок"}}]}),
+            DummyResponse(status=404),
+        ]
+    )
+    client = LLMClient(session=session, router=router, retries=0)
+
+    await client.get_response("key", [{"role": "user", "content": "Привет"}])
+    assert session.last_json is not None
+    assert session.last_json["model"] == "small/model"
+
+    with pytest.raises(ModelNotFoundError):
+        await client.get_response("key", [{"role": "user", "content": "Привет"}])
+    stats = router.stats("small/model")
+    assert stats is not None
+    assert stats.samples == 2
+    assert stats.error_rate > 0
@@ -0,0 +1,86 @@
+"""
+Тесты для выбора модели под запрос (`src.bot.services.model_router`).
+"""
+
+import math
+
+import pytest
+
+from src.bot.services.model_router import (
+    MIN_SAMPLES,
+    PROBE_EVERY,
+    ModelRouter,
+    build_model_router,
+    parse_model_rule,
+)
+
+DEFAULT = "big/model"
+
+
+def chat(text: str, history: int = 0) -> list[dict[str, str]]:
+    messages = [{"role": "assistant", "content": "..."} for _ in range(history)]
+    return messages + [{"role": "user", "content": text}]
+
+
+def test_parse_model_rule() -> None:
+    rule = parse_model_rule("mistralai/mistral-7b-instruct:free=chars:200, messages:6,latency:3")
+
+    assert rule.model == "mistralai/mistral-7b-instruct:free"
+    assert rule.max_chars == 200
+    assert rule.max_messages == 6
+    assert rule.max_latency == 3
+    assert parse_model_rule("any/model").max_chars == math.inf
+
+
+@pytest.mark.parametrize("spec", ["model=tokens:5", "=chars:5", "model=chars:many"])
+def test_parse_model_rule_rejects_invalid(spec: str) -> None:
+    with pytest.raises(ValueError):
+        parse_model_rule(spec)
+
+
+def test_routes_by_prompt_length_and_history() -> None:
+    router = ModelRouter([parse_model_rule("small/model=chars:50,messages:4")])
+
+    assert router.choose(chat("Привет!"), DEFAULT) == "small/model"
+    assert router.choose(chat("x" * 500), DEFAULT) == DEFAULT
+    assert router.choose(chat("Привет!", history=10), DEFAULT) == DEFAULT
+
+
+def test_skips_unhealthy_model_until_it_recovers() -> None:
+    router = ModelRouter(
+        [
+            parse_model_rule("small/model=chars:50,latency:2"),
+            parse_model_rule("medium/model=chars:50"),
+        ]
+    )
+    for _ in range(MIN_SAMPLES):
+        router.observe("small/model", 10.0, ok=True)
+    assert router.choose(chat("Привет!"), DEFAULT) == "medium/model"
+
+    for _ in range(MIN_SAMPLES):
+        router.observe("medium/model", 1.0, ok=False)
+    assert router.choose(chat("Привет!"), DEFAULT) == DEFAULT
+
+    # Изредка "нездоровая" модель получает пробный запрос
+    chosen = [router.choose(chat("Привет!"), DEFAULT) for _ in range(PROBE_EVERY)]
+    assert chosen.count("small/model") == 1
+
+    for _ in range(30):
+        router.observe("small/model", 0.5, ok=True)
+    assert router.choose(chat("Привет!"), DEFAULT) == "small/model"
+
+
+def test_shadow_mode_keeps_default_model(caplog: pytest.LogCaptureFixture) -> None:
+    router = build_model_router("shadow", ("small/model=chars:50",))
+
+    with caplog.at_level("INFO", logger="bot"):
+        assert router.choose(chat("Привет!"), DEFAULT) == DEFAULT
+
+    assert "small/model" in caplog.text
+
+
+def test_build_model_router_off_or_without_rules() -> None:
+    assert build_model_router("off", ("small/model",)) is None
+    assert build_model_router("on", ()) is None
+    with pytest.raises(ValueError):
+        build_model_router("sometimes", ("small/model",))
@@ -0,0 +1,144 @@
+"""
+Тесты для нескольких ботов в одном процессе (`src.bot.application`
+и связанные с ним сервисы).
+"""
+
+import pytest
+from aiogram import Bot
+
+from src.bot.config import BotConfig
+from src.bot.middlewares.bot_context import BotContextMiddleware
+from src.bot.services.history import HistorySettings, RedisChatHistoryRepository
+from src.bot.utils.metrics import MetricsRegistry
+from src.bot.webhook import webhook_path_for
+
+
+class FakePipeline:
+    """Команды копятся и выполняются по execute(), как в транзакции Redis."""
+
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._commands: list = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self._commands.append((name, args, kwargs))
+
+    async def execute(self) -> None:
+        for name, args, kwargs in self._commands:
+            await getattr(self._redis, name)(*args, **kwargs)
+
+
+class FakeRedis:
+    """Строки и списки поверх словаря — ровно то, что нужно репозиторию истории."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+        self.closed = False
+
+    async def set(self, key: str, value) -> None:
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.data)
+
+    async def rpush(self, key: str, value: str) -> None:
+        self.data.setdefault(key, []).append(value)  # type: ignore[union-attr]
+
+    async def lrange(self, key: str, start: int, end: int) -> list[str]:
+        return list(self.data.get(key, []))  # type: ignore[call-overload]
+
+    async def ltrim(self, key: str, start: int, end: int) -> None:
+        return None
+
+    async def expire(self, key: str, ttl: int) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_scoped_metrics_share_registry_with_prefix() -> None:
+    metrics = MetricsRegistry()
+    metrics.scoped("bot_brand2_").counter("updates").inc()
+    metrics.counter("updates").inc(2)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["bot_brand2_updates"] == 1
+    assert snapshot["updates"] == 2
+
+
+@pytest.mark.asyncio
+async def test_history_namespaces_do_not_mix() -> None:
+    redis = FakeRedis()
+    primary = RedisChatHistoryRepository(redis, HistorySettings())  # type: ignore[arg-type]
+    brand = RedisChatHistoryRepository(
+        redis, HistorySettings(), namespace="brand2", owns_redis=False  # type: ignore[arg-type]
+    )
+
+    await brand.start_session(1)
+    await brand.add_user_message(1, "привет")
+
+    assert await brand.is_active(1)
+    assert not await primary.is_active(1)
+    assert await primary.get_history(1) == []
+    assert "chat_history:brand2:1" in redis.data
+
+
+@pytest.mark.asyncio
+async def test_shared_redis_is_not_closed_by_repository() -> None:
+    redis = FakeRedis()
+    repo = RedisChatHistoryRepository(
+        redis, HistorySettings(), namespace="brand2", owns_redis=False  # type: ignore[arg-type]
+    )
+
+    await repo.aclose()
+
+    assert not redis.closed
+
+
+@pytest.mark.asyncio
+async def test_bot_context_middleware_injects_data_of_receiving_bot() -> None:
+    first, second = Bot(token="1:AAA"), Bot(token="2:BBB")
+    middleware = BotContextMiddleware(
+        {first.id: {"history_repo": "first"}, second.id: {"history_repo": "second"}}
+    )
+    seen: list[str] = []
+
+    async def handler(event, data):  # type: ignore[no-untyped-def]
+        seen.append(data["history_repo"])
+
+    await middleware(handler, object(), {"bot": second, "history_repo": "first"})  # type: ignore[arg-type]
+
+    assert seen == ["second"]
+
+
+def test_extra_bots_get_own_webhook_path() -> None:
+    config = BotConfig(bot_token="1:AAA", webhook_path="/webhook")
+
+    assert webhook_path_for(config) == "/webhook"
+    assert webhook_path_for(config, "brand2") == "/webhook/brand2"
+
+
+@pytest.mark.asyncio
+async def test_late_answer_does_not_reopen_stopped_session() -> None:
+    repo = RedisChatHistoryRepository(FakeRedis(), HistorySettings())  # type: ignore[arg-type]
+    await repo.start_session(1)
+    await repo.stop_session(1)
+
+    # Ответ модели пришёл уже после /stop
+    await repo.add_assistant_message(1, "поздний ответ")
+
+    assert not await repo.is_active(1)
@@ -0,0 +1,70 @@
+"""
+Тесты для планировщика апдейтов (`src.bot.middlewares.ordering`).
+"""
+
+import asyncio
+
+import pytest
+from aiogram.types import Chat
+
+from src.bot.middlewares.ordering import ChatOrderingMiddleware
+from src.bot.utils.metrics import MetricsRegistry
+
+
+def chat_data(chat_id: int) -> dict:
+    return {"event_chat": Chat(id=chat_id, type="private")}
+
+
+@pytest.mark.asyncio
+async def test_same_chat_processed_in_order() -> None:
+    middleware = ChatOrderingMiddleware()
+    log: list[str] = []
+
+    async def handler(event, data) -> None:  # type: ignore[no-untyped-def]
+        log.append(f"start {event}")
+        await asyncio.sleep(0.01)
+        log.append(f"end {event}")
+
+    await asyncio.gather(
+        middleware(handler, "a", chat_data(1)),
+        middleware(handler, "b", chat_data(1)),
+    )
+
+    assert log == ["start a", "end a", "start b", "end b"]
+    assert middleware.active_queues == 0
+
+
+@pytest.mark.asyncio
+async def test_different_chats_run_concurrently_up_to_limit() -> None:
+    metrics = MetricsRegistry()
+    middleware = ChatOrderingMiddleware(max_concurrency=2, metrics=metrics)
+    running = 0
+    peak = 0
+
+    async def handler(event, data) -> None:  # type: ignore[no-untyped-def]
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*(middleware(handler, i, chat_data(i)) for i in range(5)))
+
+    assert peak == 2
+    snapshot = metrics.snapshot()
+    assert snapshot["scheduler_wait_seconds_count"] == 5
+    assert snapshot["scheduler_queue_depth"] == 0
+    assert snapshot["scheduler_chat_queues"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_released_after_handler_error() -> None:
+    middleware = ChatOrderingMiddleware()
+
+    async def handler(event, data) -> None:  # type: ignore[no-untyped-def]
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await middleware(handler, "a", chat_data(1))
+
+    assert middleware.active_queues == 0
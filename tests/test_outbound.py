@@ -0,0 +1,181 @@
+"""
+Тесты для очереди исходящих запросов (`src.bot.services.outbound`).
+"""
+
+import asyncio
+
+import pytest
+
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from src.bot.middlewares.outbound import OutboundRequestMiddleware
+from src.bot.services.outbound import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    OutboundQueue,
+    RetryLater,
+)
+from src.bot.utils.metrics import MetricsRegistry
+
+
+async def _occupy_chat(queue: OutboundQueue, chat_id: int) -> tuple[asyncio.Event, asyncio.Task]:
+    """Занимает чат долгим запросом, чтобы следующие ждали в очереди."""
+    release = asyncio.Event()
+    task = asyncio.create_task(queue.submit(chat_id, release.wait))
+    await asyncio.sleep(0.01)
+    return release, task
+
+
+@pytest.mark.asyncio
+async def test_replies_go_before_chat_actions() -> None:
+    queue = OutboundQueue(chat_burst=10)
+    sent: list[str] = []
+
+    def send(name: str):
+        async def call() -> str:
+            sent.append(name)
+            return name
+
+        return call
+
+    release, first = await _occupy_chat(queue, 1)
+    action = asyncio.create_task(queue.submit(1, send("typing"), priority=PRIORITY_LOW))
+    reply = asyncio.create_task(queue.submit(1, send("reply"), priority=PRIORITY_HIGH))
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(first, action, reply)
+
+    assert sent == ["reply", "typing"]
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pending_chat_actions_are_coalesced() -> None:
+    metrics = MetricsRegistry()
+    queue = OutboundQueue(chat_burst=10, metrics=metrics)
+    calls = 0
+
+    async def typing() -> bool:
+        nonlocal calls
+        calls += 1
+        return True
+
+    release, first = await _occupy_chat(queue, 1)
+    actions = [
+        asyncio.create_task(
+            queue.submit(1, typing, priority=PRIORITY_LOW, coalesce_key=(1, "typing"))
+        )
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(*actions) == [True, True, True]
+    assert calls == 1
+    assert metrics.snapshot()["outbound_coalesced"] == 2
+    await first
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_and_resends() -> None:
+    metrics = MetricsRegistry()
+    queue = OutboundQueue(metrics=metrics)
+    attempts = 0
+
+    async def send() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RetryLater(0.05)
+        return "ok"
+
+    assert await queue.submit(1, send) == "ok"
+    assert attempts == 2
+    assert metrics.snapshot()["outbound_retry_after"] == 1
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries() -> None:
+    queue = OutboundQueue(chat_burst=10)
+
+    async def send() -> None:
+        try:
+            raise ValueError("flood")
+        except ValueError as e:
+            raise RetryLater(0) from e
+
+    with pytest.raises(ValueError):
+        await queue.submit(1, send)
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_middleware_queues_only_chat_sends() -> None:
+    metrics = MetricsRegistry()
+    queue = OutboundQueue(metrics=metrics)
+    middleware = OutboundRequestMiddleware(queue)
+    calls: list[str] = []
+
+    async def make_request(bot, method):
+        calls.append(method.__api_method__)
+        return True
+
+    await middleware(make_request, None, SendMessage(chat_id=1, text="hi"))
+    await middleware(make_request, None, AnswerCallbackQuery(callback_query_id="1"))
+
+    assert calls == ["sendMessage", "answerCallbackQuery"]
+    assert metrics.snapshot()["outbound_wait_seconds_count"] == 1
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_is_withdrawn_before_sending() -> None:
+    queue = OutboundQueue(chat_burst=10)
+    sent: list[str] = []
+
+    async def typing() -> None:
+        sent.append("typing")
+
+    release, first = await _occupy_chat(queue, 1)
+    action = asyncio.create_task(queue.submit(1, typing, priority=PRIORITY_LOW))
+    await asyncio.sleep(0.01)
+    action.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+    await first
+    await asyncio.sleep(0.01)
+
+    assert sent == []
+    assert len(queue) == 0
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_queued_sends() -> None:
+    queue = OutboundQueue(chat_burst=10)
+    release, first = await _occupy_chat(queue, 1)
+
+    async def reply() -> str:
+        return "sent"
+
+    second = asyncio.create_task(queue.submit(1, reply))
+    await asyncio.sleep(0.01)
+    asyncio.get_running_loop().call_later(0.02, release.set)
+
+    assert await queue.drain(timeout=1) == 0
+    assert await second == "sent"
+    await first
+    await queue.aclose()
+
+
+@pytest.mark.asyncio
+async def test_drain_gives_up_after_timeout_and_aclose_cancels_stuck_send() -> None:
+    queue = OutboundQueue()
+    _, stuck = await _occupy_chat(queue, 1)
+
+    assert await queue.drain(timeout=0.01) == 1
+    await asyncio.wait_for(queue.aclose(), timeout=1)
+    with pytest.raises(asyncio.CancelledError):
+        await stuck
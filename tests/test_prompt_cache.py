@@ -0,0 +1,89 @@
+"""
+Тесты для приблизительного кэша ответов (`src.bot.services.prompt_cache`).
+"""
+
+from src.bot.services.prompt_cache import (
+    PromptCache,
+    normalize_prompt,
+    similarity,
+    simhash,
+)
+from src.bot.utils.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fingerprint(text: str) -> int:
+    return simhash(normalize_prompt(text))
+
+
+def test_normalize_prompt() -> None:
+    assert normalize_prompt("  Что такое ИИ?! ") == "что такое ии"
+    assert normalize_prompt("Ёлка,   ёж") == "елка еж"
+
+
+def test_similar_prompts_have_close_fingerprints() -> None:
+    base = fingerprint("Расскажи анекдот про программиста")
+
+    assert similarity(base, fingerprint("расскажи анекдот про программистов")) >= 0.9
+    assert similarity(base, fingerprint("Как приготовить борщ?")) < 0.8
+
+
+def test_returns_answer_for_near_duplicate() -> None:
+    metrics = MetricsRegistry()
+    cache = PromptCache(metrics=metrics)
+    cache.put("что такое ИИ?", "Искусственный интеллект — это...")
+
+    assert cache.get("Что такое ИИ") == "Искусственный интеллект — это..."
+    assert cache.get("Как приготовить борщ?") is None
+    snapshot = metrics.snapshot()
+    assert snapshot["prompt_cache_hits"] == 1
+    assert snapshot["prompt_cache_misses"] == 1
+
+
+def test_threshold_controls_matching() -> None:
+    cache = PromptCache(min_similarity=1.0)
+    cache.put("Расскажи анекдот про программиста", "ответ")
+
+    assert cache.get("расскажи анекдот про программиста!") == "ответ"
+    assert cache.get("расскажи анекдот про программистов") is None
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = PromptCache(max_entries=2)
+    cache.put("первый вопрос про погоду", "1")
+    cache.put("второй вопрос про курсы валют", "2")
+    assert cache.get("первый вопрос про погоду") == "1"
+
+    cache.put("третий вопрос про рецепты", "3")
+
+    assert len(cache) == 2
+    assert cache.get("второй вопрос про курсы валют") is None
+    assert cache.get("первый вопрос про погоду") == "1"
+
+
+def test_entries_expire() -> None:
+    clock = FakeClock()
+    cache = PromptCache(ttl_seconds=60, clock=clock)
+    cache.put("что такое ИИ", "ответ")
+
+    clock.now = 61
+
+    assert cache.get("что такое ИИ") is None
+    assert len(cache) == 0
+
+
+def test_negation_and_numbers_must_match_exactly() -> None:
+    cache = PromptCache(min_similarity=0.5)
+    cache.put("переведи на английский: я люблю свою маму и папу", "I love my mom and dad")
+    cache.put("сколько будет 12345 умножить на 6789", "83810205")
+
+    assert cache.get("переведи на английский: я не люблю свою маму и папу") is None
+    assert cache.get("сколько будет 12345 умножить на 6788") is None
+    assert cache.get("Сколько будет 12345 умножить на 6789?") == "83810205"
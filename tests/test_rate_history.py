@@ -0,0 +1,80 @@
+"""
+Тесты для хранилища истории курсов (`src.bot.services.rate_history`).
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.bot.services.rate_history import TIMESTAMPS_FILE, RateHistoryStore
+from src.bot.services.rate_table import RateTable
+
+
+def make_table(fetched_at: float, **rates: float) -> RateTable:
+    return RateTable(base="USD", rates={"USD": 1.0, **rates}, fetched_at=fetched_at)
+
+
+def test_window_stats_for_base_pair(tmp_path: Path) -> None:
+    store = RateHistoryStore(tmp_path)
+    store.append(make_table(100, RUB=90.0))
+    store.append(make_table(200, RUB=95.0))
+    store.append(make_table(300, RUB=85.0))
+
+    stats = store.window_stats("USD", "RUB", since=0)
+
+    assert stats is not None
+    assert stats.points == 3
+    assert (stats.min_rate, stats.max_rate) == (85.0, 95.0)
+    assert stats.change == -5.0
+    assert stats.first_at == 100 and stats.last_at == 300
+
+
+def test_window_stats_cross_pair_and_window(tmp_path: Path) -> None:
+    store = RateHistoryStore(tmp_path)
+    store.append(make_table(100, EUR=0.5, RUB=100.0))
+    store.append(make_table(200, EUR=0.8, RUB=96.0))
+
+    stats = store.window_stats("EUR", "RUB", since=150)
+
+    assert stats is not None
+    assert stats.points == 1
+    assert stats.last_rate == pytest.approx(120.0)
+
+
+def test_append_skips_unchanged_or_older_tables(tmp_path: Path) -> None:
+    store = RateHistoryStore(tmp_path)
+
+    assert store.append(make_table(100, RUB=90.0))
+    assert not store.append(make_table(200, RUB=90.0))
+    assert not store.append(make_table(50, RUB=91.0))
+
+
+def test_new_currency_is_padded_with_gaps(tmp_path: Path) -> None:
+    store = RateHistoryStore(tmp_path)
+    store.append(make_table(100, RUB=90.0))
+    store.append(make_table(200, RUB=90.0, KZT=500.0))
+
+    stats = store.window_stats("USD", "KZT", since=0)
+
+    assert stats is not None
+    assert stats.points == 1
+    assert stats.first_at == 200
+
+
+def test_uncommitted_tail_is_ignored_and_truncated(tmp_path: Path) -> None:
+    store = RateHistoryStore(tmp_path)
+    store.append(make_table(100, RUB=90.0))
+    # Имитируем сбой: колонка дописана, а время — нет
+    (tmp_path / "RUB.f64").write_bytes((tmp_path / "RUB.f64").read_bytes() * 2)
+
+    assert store.window_stats("USD", "RUB", since=0).points == 1  # type: ignore[union-attr]
+
+    store.append(make_table(200, RUB=95.0))
+    stats = store.window_stats("USD", "RUB", since=0)
+    assert stats is not None
+    assert stats.last_rate == 95.0
+    assert (tmp_path / "RUB.f64").stat().st_size == (tmp_path / TIMESTAMPS_FILE).stat().st_size
+
+
+def test_window_stats_without_history(tmp_path: Path) -> None:
+    assert RateHistoryStore(tmp_path).window_stats("USD", "RUB", since=0) is None
@@ -0,0 +1,105 @@
+"""
+Тесты для провайдеров курсов валют (`src.bot.services.rate_providers`).
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from src.bot.services.rate_providers import (
+    FailoverRateProvider,
+    FileRateProvider,
+    RateProviderError,
+    build_rate_provider,
+)
+from src.bot.services.rate_table import RateTable
+
+
+class StubProvider:
+    """Провайдер с заранее заданным поведением."""
+
+    def __init__(self, name: str, rates: dict[str, float] | None = None, delay: float = 0.0) -> None:
+        self.name = name
+        self.rates = rates
+        self.delay = delay
+        self.calls = 0
+
+    async def fetch_table(self, base_currency: str) -> RateTable:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.rates is None:
+            raise RateProviderError("недоступен")
+        return RateTable(base=base_currency, rates=self.rates, fetched_at=0.0)
+
+    async def aclose(self) -> None:
+        return
+
+
+@pytest.mark.asyncio
+async def test_failover_uses_next_provider_on_error() -> None:
+    broken = StubProvider("broken")
+    backup = StubProvider("backup", rates={"USD": 1.0, "EUR": 0.9})
+    chain = FailoverRateProvider([broken, backup])
+
+    table = await chain.fetch_table("USD")
+
+    assert table.rates["EUR"] == 0.9
+    stats = chain.stats()
+    assert stats["broken"].failures == 1
+    assert stats["backup"].successes == 1
+    assert stats["backup"].latency_ewma_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_failover_skips_slow_provider() -> None:
+    slow = StubProvider("slow", rates={"USD": 1.0}, delay=1.0)
+    fast = StubProvider("fast", rates={"USD": 1.0, "RUB": 90.0})
+    chain = FailoverRateProvider([slow, fast], timeout_seconds=0.05)
+
+    table = await chain.fetch_table("USD")
+
+    assert table.rates["RUB"] == 90.0
+    assert chain.stats()["slow"].last_error == "TimeoutError"
+
+
+@pytest.mark.asyncio
+async def test_failover_moves_failing_provider_to_cooldown() -> None:
+    broken = StubProvider("broken")
+    backup = StubProvider("backup", rates={"USD": 1.0})
+    chain = FailoverRateProvider([broken, backup])
+
+    for _ in range(4):
+        await chain.fetch_table("USD")
+
+    # После трёх ошибок подряд сломанный провайдер больше не опрашивается первым
+    assert broken.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_failover_raises_when_all_fail() -> None:
+    chain = FailoverRateProvider([StubProvider("a"), StubProvider("b")])
+
+    with pytest.raises(RateProviderError):
+        await chain.fetch_table("USD")
+
+
+@pytest.mark.asyncio
+async def test_file_provider_reads_open_er_api_format(tmp_path: Path) -> None:
+    path = tmp_path / "rates.json"
+    path.write_text(
+        json.dumps({"result": "success", "base_code": "USD", "rates": {"USD": 1, "EUR": 0.5}}),
+        encoding="utf-8",
+    )
+
+    table = await FileRateProvider(path).fetch_table("USD")
+
+    assert table.base == "USD"
+    assert table.cross_rate("EUR", "USD") == 2.0
+
+
+def test_build_rate_provider_rejects_unknown_spec() -> None:
+    with pytest.raises(ValueError):
+        build_rate_provider(["ftp://nope"])
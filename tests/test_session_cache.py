@@ -0,0 +1,88 @@
+"""
+Тесты для локального кэша сессий (`src.bot.services.session_cache`).
+"""
+
+import pytest
+
+from src.bot.services.history import HistorySettings, InMemoryChatHistoryRepository
+from src.bot.services.session_cache import ActiveSessionCache, CachedSessionRepository
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingRepo(InMemoryChatHistoryRepository):
+    def __init__(self) -> None:
+        super().__init__(HistorySettings())
+        self.is_active_calls = 0
+
+    async def is_active(self, user_id: int) -> bool:
+        self.is_active_calls += 1
+        return await super().is_active(user_id)
+
+
+def test_cache_entries_expire() -> None:
+    clock = FakeClock()
+    cache = ActiveSessionCache(negative_ttl_seconds=10, clock=clock)
+
+    cache.mark_active(1, ttl_seconds=5)
+    cache.mark_inactive(2)
+    assert cache.get(1) is True
+    assert cache.get(2) is False
+    assert cache.get(3) is None
+
+    clock.now = 6
+    assert cache.get(1) is None
+    assert cache.get(2) is False
+
+    clock.now = 11
+    assert cache.get(2) is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_checks_served_from_cache() -> None:
+    inner = CountingRepo()
+    repo = CachedSessionRepository(inner, ActiveSessionCache(), session_ttl_seconds=60)
+
+    assert not await repo.is_active(1)
+    assert not await repo.is_active(1)
+    assert inner.is_active_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop_invalidate_cache() -> None:
+    inner = CountingRepo()
+    repo = CachedSessionRepository(inner, ActiveSessionCache(), session_ttl_seconds=60)
+    assert not await repo.is_active(1)
+
+    await repo.start_session(1)
+    assert await repo.is_active(1)
+
+    await repo.stop_session(1)
+    assert not await repo.is_active(1)
+    assert inner.is_active_calls == 1
+
+
+class LateAnswerRepo(CountingRepo):
+    """Как Redis-репозиторий: запись в историю не открывает сессию заново."""
+
+    async def add_assistant_message(self, user_id: int, content: str) -> None:
+        return
+
+
+@pytest.mark.asyncio
+async def test_late_answer_does_not_reactivate_session() -> None:
+    inner = LateAnswerRepo()
+    repo = CachedSessionRepository(inner, ActiveSessionCache(), session_ttl_seconds=60)
+    await repo.start_session(1)
+    await repo.stop_session(1)
+
+    await repo.add_assistant_message(1, "ответ после /stop")
+
+    assert not await repo.is_active(1)
+    assert inner.is_active_calls == 0
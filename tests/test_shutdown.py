@@ -0,0 +1,79 @@
+"""
+Тесты для корректной остановки (`src.bot.services.shutdown`).
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.middlewares.shutdown import InFlightUpdatesMiddleware
+from src.bot.services.shutdown import InFlightTracker, ShutdownDeadline, drain_tasks
+
+
+@pytest.mark.asyncio
+async def test_drain_counts_finished_and_aborted_tasks() -> None:
+    quick = asyncio.create_task(asyncio.sleep(0.01))
+    stuck = asyncio.create_task(asyncio.sleep(10))
+
+    result = await drain_tasks([quick, stuck], timeout=0.05)
+
+    assert (result.drained, result.aborted) == (1, 1)
+    assert stuck.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_aborted_task_runs_its_cleanup() -> None:
+    cleaned: list[str] = []
+
+    async def turn() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # Так обработчик возвращает квоту при остановке
+            await asyncio.sleep(0)
+            cleaned.append("refund")
+            raise
+
+    task = asyncio.create_task(turn())
+    await asyncio.sleep(0)
+
+    await drain_tasks([task], timeout=0.01)
+
+    assert cleaned == ["refund"]
+
+
+@pytest.mark.asyncio
+async def test_middleware_waits_for_handlers_and_rejects_new_updates() -> None:
+    tracker = InFlightTracker()
+    middleware = InFlightUpdatesMiddleware(tracker)
+    release = asyncio.Event()
+    handled: list[str] = []
+
+    async def handler(event: str, data: dict) -> None:
+        await release.wait()
+        handled.append(event)
+
+    # Middleware не смотрит на тип события, вместо Update хватит строки
+    running = asyncio.create_task(middleware(handler, "first", {}))  # type: ignore[arg-type]
+    await asyncio.sleep(0)
+    assert len(tracker) == 1
+
+    asyncio.get_running_loop().call_later(0.01, release.set)
+    result = await tracker.drain(timeout=1)
+    await running
+
+    assert (result.drained, result.aborted) == (1, 0)
+    # Как и выше, строка вместо Update
+    assert await middleware(handler, "late", {}) is None  # type: ignore[arg-type]
+    assert handled == ["first"]
+
+
+def test_shutdown_stages_share_one_deadline() -> None:
+    now = [0.0]
+    deadline = ShutdownDeadline(10, clock=lambda: now[0])
+
+    assert deadline.remaining() == 10
+    now[0] = 7
+    assert deadline.remaining() == 3
+    now[0] = 12
+    assert deadline.remaining() == 0
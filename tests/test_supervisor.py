@@ -0,0 +1,99 @@
+"""
+Тесты для супервизора webhook-воркеров (`src.bot.supervisor`).
+"""
+
+from src.bot.config import BotConfig
+from src.bot.supervisor import (
+    WorkerSupervisor,
+    per_worker_limitations,
+    shared_state_problems,
+)
+
+
+class FakeProcess:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.pid = 1000 + index
+        self.exitcode: int | None = None
+        self.alive = False
+        self.terminated = False
+
+    def start(self) -> None:
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def terminate(self) -> None:
+        self.terminated = True
+        self.alive = False
+        self.exitcode = 0
+
+    def join(self, timeout: float | None = None) -> None:
+        pass
+
+    def kill(self) -> None:
+        self.alive = False
+
+
+def make_supervisor(workers: int = 2) -> tuple[WorkerSupervisor, list[FakeProcess]]:
+    spawned: list[FakeProcess] = []
+
+    def spawn(index: int) -> FakeProcess:
+        process = FakeProcess(index)
+        spawned.append(process)
+        return process
+
+    return WorkerSupervisor(workers=workers, spawn=spawn, stop_timeout=1), spawned
+
+
+def test_shared_state_requires_redis_for_several_workers() -> None:
+    config = BotConfig(bot_token="x", webhook_workers=2, chat_history_backend="memory")
+    assert shared_state_problems(config)
+
+    config.chat_history_backend = "Redis"
+    config.throttle_backend = "REDIS"
+    config.fsm_storage_backend = "redis"
+    config.usage_backend = "redis"
+    assert any("REDIS_URL" in problem for problem in shared_state_problems(config))
+
+    config.redis_url = "redis://localhost:6379/0"
+    assert shared_state_problems(config) == []
+
+    single = BotConfig(bot_token="x", webhook_workers=1)
+    assert shared_state_problems(single) == []
+
+
+def test_per_worker_limitations_reported_only_for_several_workers() -> None:
+    limitations = per_worker_limitations(BotConfig(bot_token="x", webhook_workers=2))
+
+    assert any("порядок апдейтов" in limitation for limitation in limitations)
+    assert any("/stop" in limitation for limitation in limitations)
+    assert any("CHAT_DEBOUNCE_MS" in limitation for limitation in limitations)
+    assert per_worker_limitations(BotConfig(bot_token="x", webhook_workers=1)) == []
+
+
+def test_crashed_worker_restarted_with_backoff() -> None:
+    supervisor, spawned = make_supervisor()
+    supervisor.check_workers(now=0)
+    assert len(spawned) == 2
+
+    spawned[0].alive = False
+    spawned[0].exitcode = 1
+    supervisor.check_workers(now=1)
+    # Первый перезапуск — через секунду, а не сразу
+    assert len(spawned) == 2
+    assert supervisor.slots[0].process is None
+
+    supervisor.check_workers(now=2)
+    assert len(spawned) == 3
+    assert supervisor.slots[0].process is spawned[2]
+
+
+def test_stop_all_terminates_workers() -> None:
+    supervisor, spawned = make_supervisor()
+    supervisor.check_workers(now=0)
+
+    supervisor.stop_all()
+
+    assert all(process.terminated for process in spawned)
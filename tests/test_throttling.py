@@ -0,0 +1,158 @@
+"""
+Тесты для ограничения частоты запросов (`src.bot.services.throttling`).
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from aiogram.types import Update
+
+from src.bot.middlewares.throttling import ALL_BUCKETS, ThrottlingMiddleware
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM, Entitlements
+from src.bot.services.history import HistorySettings, InMemoryChatHistoryRepository
+from src.bot.services.throttling import (
+    BUCKET_CONVERT,
+    BUCKET_LLM,
+    MemoryThrottleBackend,
+    ThrottleRule,
+    Throttler,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenBackend:
+    async def consume(self, key: str, rule: ThrottleRule, cost: float = 1) -> float:
+        raise ConnectionError("redis down")
+
+    async def aclose(self) -> None:
+        return
+
+
+TIERS = {
+    TIER_FREE: {BUCKET_LLM: ThrottleRule(capacity=2, refill_per_second=1)},
+    TIER_PREMIUM: {BUCKET_LLM: ThrottleRule(capacity=4, refill_per_second=1)},
+}
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_refills() -> None:
+    clock = FakeClock()
+    backend = MemoryThrottleBackend(clock=clock)
+    rule = ThrottleRule(capacity=2, refill_per_second=0.5)
+
+    assert await backend.consume("u", rule) == 0
+    assert await backend.consume("u", rule) == 0
+    assert await backend.consume("u", rule) == pytest.approx(2.0)
+
+    clock.now = 2.0
+    assert await backend.consume("u", rule) == 0
+
+
+@pytest.mark.asyncio
+async def test_premium_tier_has_larger_bucket() -> None:
+    throttler = Throttler(MemoryThrottleBackend(), notice_cooldown_seconds=10, tiers=TIERS)
+
+    free = [await throttler.check(1, BUCKET_LLM, TIER_FREE) for _ in range(4)]
+    premium = [await throttler.check(2, BUCKET_LLM, TIER_PREMIUM) for _ in range(4)]
+
+    assert [delay == 0 for delay in free] == [True, True, False, False]
+    assert all(delay == 0 for delay in premium)
+
+
+@pytest.mark.asyncio
+async def test_notice_sent_once_per_cooldown() -> None:
+    throttler = Throttler(MemoryThrottleBackend(), notice_cooldown_seconds=60, tiers=TIERS)
+
+    assert await throttler.should_notify(1, BUCKET_LLM)
+    assert not await throttler.should_notify(1, BUCKET_LLM)
+
+
+@pytest.mark.asyncio
+async def test_backend_failure_does_not_block_users() -> None:
+    throttler = Throttler(BrokenBackend(), notice_cooldown_seconds=10, tiers=TIERS)
+
+    assert await throttler.check(1, BUCKET_LLM) == 0
+
+
+def test_entitlements_tier() -> None:
+    entitlements = Entitlements([42])
+
+    assert entitlements.tier(42) == TIER_PREMIUM
+    assert entitlements.tier(7) == TIER_FREE
+
+
+@pytest.mark.asyncio
+async def test_llm_bucket_can_be_left_to_instance_after_burst_merge() -> None:
+    throttler = Throttler(
+        MemoryThrottleBackend(),
+        notice_cooldown_seconds=10,
+        tiers={TIER_FREE: {BUCKET_LLM: ThrottleRule(capacity=1, refill_per_second=0.001)}},
+    )
+    history_repo = InMemoryChatHistoryRepository(HistorySettings())
+    await history_repo.start_session(1)
+    before_merge = ThrottlingMiddleware(
+        throttler, Entitlements([]), history_repo, buckets=ALL_BUCKETS - {BUCKET_LLM}
+    )
+    update = Update.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 1, "type": "private"},
+                "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+                "text": "фрагмент",
+            },
+        }
+    )
+    handled: list[int] = []
+
+    async def handler(event: Update, data: dict) -> None:
+        handled.append(event.update_id)
+
+    # Фрагменты серии не тратят токен LLM до склейки
+    for _ in range(3):
+        await before_merge(handler, update, {"event_from_user": SimpleNamespace(id=1)})
+
+    assert handled == [1, 1, 1]
+    assert await throttler.check(1, BUCKET_LLM) == 0
+
+
+@pytest.mark.asyncio
+async def test_inline_queries_are_not_throttled() -> None:
+    throttler = Throttler(
+        MemoryThrottleBackend(),
+        notice_cooldown_seconds=10,
+        tiers={TIER_FREE: {BUCKET_CONVERT: ThrottleRule(capacity=1, refill_per_second=0.001)}},
+    )
+    middleware = ThrottlingMiddleware(
+        throttler, Entitlements([]), InMemoryChatHistoryRepository(HistorySettings())
+    )
+    handled: list[str] = []
+
+    async def handler(event: Update, data: dict) -> None:
+        handled.append(event.inline_query.query)
+
+    # Запрос набирается по символу: каждый символ — отдельный апдейт
+    for i, query in enumerate(["1", "10", "100", "100 usd"]):
+        update = Update.model_validate(
+            {
+                "update_id": i,
+                "inline_query": {
+                    "id": str(i),
+                    "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+                    "query": query,
+                    "offset": "",
+                },
+            }
+        )
+        await middleware(handler, update, {"event_from_user": SimpleNamespace(id=1)})
+
+    assert handled == ["1", "10", "100", "100 usd"]
@@ -0,0 +1,101 @@
+"""
+Тесты для общего планировщика индикатора "печатает" (`src.bot.services.typing`).
+"""
+
+import asyncio
+
+import pytest
+
+from src.bot.services.typing import TypingTicker
+from src.bot.utils.metrics import MetricsRegistry
+
+
+class FakeSender:
+    def __init__(self) -> None:
+        self.chats: list[int] = []
+
+    async def __call__(self, chat_id: int) -> None:
+        self.chats.append(chat_id)
+
+
+@pytest.mark.asyncio
+async def test_fast_reply_skips_typing() -> None:
+    metrics = MetricsRegistry()
+    sender = FakeSender()
+    ticker = TypingTicker(sender, grace_seconds=0.2, metrics=metrics)
+
+    ticker.start(1)
+    await asyncio.sleep(0.05)
+    ticker.stop(1)
+    await asyncio.sleep(0.3)
+
+    assert sender.chats == []
+    assert metrics.snapshot()["typing_skipped_fast_replies"] == 1
+    await ticker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_typing_starts_only_after_grace_period() -> None:
+    sender = FakeSender()
+    ticker = TypingTicker(sender, grace_seconds=0.1, interval_seconds=10)
+
+    ticker.start(1)
+    await asyncio.sleep(0.05)
+    assert sender.chats == []
+    await asyncio.sleep(0.1)
+    assert sender.chats == [1]
+
+    ticker.stop(1)
+    await ticker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_replies_are_sent_in_one_batch_and_repeated() -> None:
+    sender = FakeSender()
+    ticker = TypingTicker(sender, grace_seconds=0.05, interval_seconds=0.1)
+
+    ticker.start(1)
+    ticker.start(2)
+    await asyncio.sleep(0.08)
+    assert sorted(sender.chats) == [1, 2]
+
+    await asyncio.sleep(0.1)
+    assert len(sender.chats) == 4
+
+    ticker.stop(1)
+    ticker.stop(2)
+    sent = len(sender.chats)
+    await asyncio.sleep(0.15)
+    assert len(sender.chats) == sent
+    await ticker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_chat_stays_waiting_until_all_requests_finish() -> None:
+    ticker = TypingTicker(FakeSender())
+
+    ticker.start(1)
+    ticker.start(1)
+    ticker.stop(1)
+    assert 1 in ticker
+
+    ticker.stop(1)
+    assert 1 not in ticker
+    await ticker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_errors_do_not_stop_ticker() -> None:
+    calls = 0
+
+    async def failing(chat_id: int) -> None:
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("network")
+
+    ticker = TypingTicker(failing, grace_seconds=0.01, interval_seconds=0.05)
+    ticker.start(1)
+    await asyncio.sleep(0.12)
+
+    assert calls >= 2
+    await ticker.aclose()
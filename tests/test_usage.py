@@ -0,0 +1,137 @@
+"""
+Тесты для учёта использования LLM и суточных квот (`src.bot.services.usage`).
+"""
+
+import pytest
+
+from src.bot.services.entitlements import TIER_FREE, TIER_PREMIUM
+from src.bot.services.usage import (
+    DailyUsage,
+    MemoryUsageBackend,
+    QuotaExceededError,
+    UsageAccounting,
+)
+from src.bot.utils.formatting import format_usage
+
+DAY = 60 * 60 * 24
+
+
+class FakeClock:
+    def __init__(self, now: float = 10 * DAY + 3600) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenBackend(MemoryUsageBackend):
+    async def reserve(self, key: str, limit: int) -> bool:
+        raise ConnectionError("redis down")
+
+
+def make_usage(clock: FakeClock | None = None) -> UsageAccounting:
+    return UsageAccounting(
+        MemoryUsageBackend(),
+        limits={TIER_FREE: 2, TIER_PREMIUM: 0},
+        clock=clock or FakeClock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_enforces_daily_limit_per_tier() -> None:
+    usage = make_usage()
+    await usage.reserve(1, TIER_FREE)
+    await usage.reserve(1, TIER_FREE)
+
+    with pytest.raises(QuotaExceededError) as error:
+        await usage.reserve(1, TIER_FREE)
+    assert error.value.limit == 2
+    # До полуночи UTC осталось 23 часа
+    assert error.value.retry_after == DAY - 3600
+
+    # Квоты разных пользователей независимы, у Premium предела нет
+    await usage.reserve(2, TIER_FREE)
+    for _ in range(10):
+        await usage.reserve(1, TIER_PREMIUM)
+
+
+@pytest.mark.asyncio
+async def test_quota_resets_next_day() -> None:
+    clock = FakeClock()
+    usage = make_usage(clock)
+    await usage.reserve(1)
+    await usage.reserve(1)
+
+    clock.now += DAY
+
+    await usage.reserve(1)
+    assert (await usage.usage(1)).requests == 1
+
+
+@pytest.mark.asyncio
+async def test_refund_returns_request_to_quota() -> None:
+    usage = make_usage()
+    await usage.reserve(1)
+    day = await usage.reserve(1)
+    await usage.refund(1, day)
+
+    await usage.reserve(1)
+    assert (await usage.usage(1)).requests == 2
+
+
+@pytest.mark.asyncio
+async def test_refund_after_midnight_does_not_touch_new_day() -> None:
+    clock = FakeClock()
+    usage = make_usage(clock)
+    day = await usage.reserve(1)
+
+    clock.now += DAY
+    await usage.reserve(1)
+    # Запрос вчерашних суток вернули уже после полуночи
+    await usage.refund(1, day)
+
+    assert (await usage.usage(1)).requests == 1
+
+
+@pytest.mark.asyncio
+async def test_records_prompt_and_response_volume() -> None:
+    usage = make_usage()
+    await usage.reserve(1)
+    await usage.record(1, [{"role": "user", "content": "Привет"}], "Здравствуйте!")
+
+    stats = await usage.usage(1)
+    assert stats.prompt_bytes == len("Привет".encode("utf-8"))
+    assert stats.response_bytes == len("Здравствуйте!".encode("utf-8"))
+    assert stats.prompt_tokens == 2
+    assert stats.response_tokens == 4
+
+
+@pytest.mark.asyncio
+async def test_record_after_midnight_goes_to_reserved_day() -> None:
+    clock = FakeClock()
+    usage = make_usage(clock)
+    day = await usage.reserve(1)
+
+    clock.now += DAY
+    # Ответ на вчерашний запрос пришёл уже после полуночи
+    await usage.record(1, [{"role": "user", "content": "Привет"}], "Здравствуйте!", day)
+
+    assert (await usage.usage(1)).response_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_fail_open() -> None:
+    usage = UsageAccounting(BrokenBackend(), limits={TIER_FREE: 1})
+
+    await usage.reserve(1)
+    # Запрос не списан — и возвращать нечего
+    assert await usage.reserve(1) is None
+
+
+def test_format_usage() -> None:
+    text = format_usage(DailyUsage(requests=3, prompt_tokens=120, response_tokens=80), 20)
+
+    assert "3 из 20" in text
+    assert "120" in text
+    assert "80" in text
+    assert "3 из" not in format_usage(DailyUsage(requests=3), 0)
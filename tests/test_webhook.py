@@ -0,0 +1,80 @@
+"""
+Тесты для webhook-режима (`src.bot.webhook`).
+"""
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot.config import BotConfig
+from src.bot.webhook import build_webhook_app
+
+SECRET = "test-secret"
+
+
+def make_update() -> dict:
+    return {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+            "text": "hi",
+        },
+    }
+
+
+async def make_client(dp: Dispatcher) -> TestClient:
+    config = BotConfig(bot_token="42:TEST", webhook_secret=SECRET)
+    app, _ = build_webhook_app(dp, Bot(token=config.bot_token), config)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret() -> None:
+    client = await make_client(Dispatcher())
+    try:
+        response = await client.post(
+            "/webhook",
+            json=make_update(),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+        )
+        assert response.status == 401
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_webhook_accepts_update_and_handles_in_background() -> None:
+    dp = Dispatcher()
+    received: list[str] = []
+
+    @dp.message()
+    async def handler(message) -> None:  # type: ignore[no-untyped-def]
+        received.append(message.text)
+
+    client = await make_client(dp)
+    try:
+        response = await client.post(
+            "/webhook",
+            json=make_update(),
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+        assert response.status == 200
+    finally:
+        await client.close()
+
+    assert received == ["hi"]
+
+
+@pytest.mark.asyncio
+async def test_healthcheck() -> None:
+    client = await make_client(Dispatcher())
+    try:
+        response = await client.get("/healthz")
+        assert response.status == 200
+    finally:
+        await client.close()